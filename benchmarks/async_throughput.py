@@ -0,0 +1,167 @@
+"""
+Throughput benchmark of the books-service bound routes served by the
+threaded WSGI server and by the ASGI application
+
+Usage:
+    python -m benchmarks.async_throughput --database-uri postgresql://... \
+        [--latency 0.2] [--threads 16] [--concurrency 200] [--requests 1000]
+
+Both servers run in subprocesses against the same database and a local
+books service stub delaying every response by --latency seconds. The
+load generator keeps --concurrency requests in flight, half of them are
+signups of new users (one remote lookup each) and half are first logins
+of remote authors (remote authentication and profile creation).
+The WSGI server handles requests with a pool of --threads threads.
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import httpx
+
+from benchmarks.books_stub import PASSWORD, start_books_stub
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(mode: str, port: int, threads: int, database_uri: str) -> None:
+    """
+    Runs the server in the current process, used by the subprocesses
+    """
+    from flask_app import create_app
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": database_uri} if database_uri else None)
+
+    if mode == "asgi":
+        import uvicorn
+
+        from flask_app.asgi import create_asgi_app
+
+        uvicorn.run(create_asgi_app(app), host="127.0.0.1", port=port, log_level="warning")
+        return
+
+    from werkzeug.serving import BaseWSGIServer
+
+    class PooledWSGIServer(BaseWSGIServer):
+        """
+        WSGI server handling requests in a bounded thread pool
+        """
+        executor = ThreadPoolExecutor(max_workers=threads)
+
+        def process_request(self, request, client_address):
+            self.executor.submit(self._handle, request, client_address)
+
+        def _handle(self, request, client_address):
+            try:
+                self.finish_request(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
+    PooledWSGIServer("127.0.0.1", port, app, request_queue_size=1024).serve_forever()
+
+
+def start_server(mode: str, threads: int, database_uri: str,
+                 env: Dict[str, str]) -> Tuple[subprocess.Popen, str]:
+    """
+    Starts the server subprocess and waits until it accepts connections
+    """
+    port = free_port()
+    process = subprocess.Popen([sys.executable, "-m", "benchmarks.async_throughput", "--serve", mode,
+                                "--port", str(port), "--threads", str(threads)] +
+                               (["--database-uri", database_uri] if database_uri else []), env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process, "http://127.0.0.1:{}".format(port)
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("{} server did not start".format(mode))
+
+
+async def run_load(base_url: str, run_id: str, concurrency: int, requests: int) -> Tuple[float, List, List]:
+    """
+    Sends the requests keeping the given amount in flight,
+    returns elapsed time, latencies and statuses
+    """
+    latencies, statuses = [], []
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        async def send(number: int) -> None:
+            if number % 2:
+                path, body = "/signup", {"username": "signup_{}_{}".format(run_id, number), "password": "secret"}
+            else:
+                path, body = "/login", {"username": "author_{}_{}".format(run_id, number), "password": PASSWORD}
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(path, json=body)
+                    status = response.status_code if response.status_code != 200 else \
+                        response.json().get("status", 200)
+                except httpx.HTTPError:
+                    status = 599
+                latencies.append(time.perf_counter() - started)
+                statuses.append(status)
+
+        started = time.perf_counter()
+        await asyncio.gather(*map(send, range(requests)))
+        return time.perf_counter() - started, latencies, statuses
+
+
+def report(mode: str, elapsed: float, latencies: List[float], statuses: List[int]) -> None:
+    latencies = sorted(latencies)
+    print("{:<5} {:>8.1f} rps  p50 {:>8.1f}ms  p99 {:>8.1f}ms  errors {}".format(
+        mode, len(latencies) / elapsed, latencies[len(latencies) // 2] * 1000,
+        latencies[int(0.99 * (len(latencies) - 1))] * 1000, sum(status != 200 for status in statuses)))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-uri", default=os.getenv("BENCH_DATABASE_URI"))
+    parser.add_argument("--latency", type=float, default=0.2, help="Books service delay in seconds")
+    parser.add_argument("--threads", type=int, default=16, help="Threads of the WSGI server")
+    parser.add_argument("--concurrency", type=int, default=200, help="Requests in flight")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per server")
+    parser.add_argument("--serve", choices=("wsgi", "asgi"), help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+
+    if arguments.serve:
+        serve(arguments.serve, arguments.port, arguments.threads, arguments.database_uri)
+        return 0
+
+    env = dict(os.environ)
+    env.setdefault("SECRET_KEY", "benchmark")
+    os.environ["SECRET_KEY"] = env["SECRET_KEY"]
+    stub = start_books_stub(latency=arguments.latency)
+    env["BOOKS_APP_URL"] = "http://127.0.0.1:{}".format(stub.server_port)
+
+    run_id = str(int(time.time()))
+    for mode in ("wsgi", "asgi"):
+        process, base_url = start_server(mode, arguments.threads, arguments.database_uri, env)
+        try:
+            elapsed, latencies, statuses = asyncio.run(run_load(
+                base_url, "{}_{}".format(mode, run_id), arguments.concurrency, arguments.requests))
+        finally:
+            process.terminate()
+            process.wait()
+        report(mode, elapsed, latencies, statuses)
+    stub.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
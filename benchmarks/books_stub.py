@@ -0,0 +1,87 @@
+"""
+Local stub of the books service for benchmarks
+
+Users whose username starts with "author" exist in the stub and have one book,
+their password is "password". Every response is delayed by the given latency.
+"""
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+
+PASSWORD = "password"
+
+
+def is_author(username: str) -> bool:
+    return username.startswith("author")
+
+
+class BooksStubHandler(BaseHTTPRequestHandler):
+    """
+    Handler of the books service API used by the application
+    """
+    latency = 0.0
+    protocol_version = "HTTP/1.1"
+
+    def send_json(self, status: int, data) -> None:
+        body = json.dumps(data).encode()
+        time.sleep(self.latency)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        prefix = "/api/user/"
+        username = self.path[len(prefix):].strip("/") if self.path.startswith(prefix) else ""
+        if is_author(username):
+            self.send_json(200, {"username": username, "books": [{"id": abs(hash(username)) % 100000}]})
+        else:
+            self.send_json(404, {"detail": "Not found"})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        secret = os.getenv("SECRET_KEY", "")
+        try:
+            credentials = jwt.decode(json.loads(body)["token"], secret, algorithms="HS256")
+        except (ValueError, KeyError, jwt.InvalidTokenError):
+            self.send_json(400, {"detail": "Invalid token"})
+            return
+
+        username = credentials.get("username", "")
+        if not (is_author(username) and credentials.get("password") == PASSWORD):
+            self.send_json(400, {"detail": "Invalid credentials"})
+            return
+
+        profile = {"username": username, "first_name": "Author", "last_name": username,
+                   "email": "{}@books.example.com".format(username), "is_admin": False}
+        self.send_json(200, {"jwt": jwt.encode(profile, secret, algorithm="HS256")})
+
+    def log_message(self, *args):
+        pass
+
+
+def start_books_stub(latency: float = 0.0, port: int = 0) -> ThreadingHTTPServer:
+    """Function for starting the stub in a background thread
+
+    Parameters
+    ----------
+    latency : float
+        Delay of every response in seconds
+    port : int
+        Port for listening, random free port by default
+
+    Returns
+    -------
+    ThreadingHTTPServer
+        Running server, its url is http://127.0.0.1:<server.server_port>
+    """
+    handler = type("BooksStub", (BooksStubHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
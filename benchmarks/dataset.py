@@ -0,0 +1,40 @@
+"""
+Deterministic large dataset for benchmarks
+"""
+from flask_app import db
+from flask_app.seed_db import SEED_PASSWORD, seed_bulk
+
+PASSWORD = SEED_PASSWORD
+
+
+def build_dataset(events: int = 100000, users: int = 50000,
+                  participants: int = 10, guests: int = 20,
+                  reserved: int = 1000, seed: int = 42, batch_size: int = 10000) -> None:
+    """Function for recreating database with generated data
+
+    Parameters
+    ----------
+    events : int
+        Amount of events
+    users : int
+        Amount of users, user1 is admin
+    participants : int
+        Participants per event
+    guests : int
+        Guests per event
+    reserved : int
+        Amount of users (user1 and the last ones) never registered for events,
+        benchmarks use them for registration requests
+    seed : int
+        Seed of the random generator
+    batch_size : int
+        Rows per batch
+    """
+    db.drop_all()
+    db.create_all()
+    seed_bulk(users=users, events=events, participants=participants, guests=guests,
+              reserved=reserved, seed=seed, batch_size=batch_size)
+
+    if db.engine.dialect.name == "postgresql":
+        db.session.execute("ANALYZE")
+        db.session.commit()
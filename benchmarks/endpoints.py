@@ -0,0 +1,316 @@
+"""
+Benchmark of every API route over a large seeded dataset
+
+Usage:
+    python -m benchmarks.endpoints --database-uri postgresql://... [--build]
+        [--requests 200] [--output bench.json] [--baseline old.json] [--threshold 0.2]
+
+The books service is replaced by a local stub. Results contain latency
+percentiles, throughput and SQL query counts per route. The run fails if
+any registered route has no scenario. With --baseline
+the run fails if p95 latency of any route grew by more than the threshold.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from statistics import mean
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from flask import Flask
+from sqlalchemy import event as sa_event
+
+from benchmarks.books_stub import start_books_stub
+from benchmarks.dataset import PASSWORD, build_dataset
+from flask_app import create_app, db
+from flask_app.models.event import EventModel
+from flask_app.models.user import UserModel
+
+Request = Tuple[str, str, Optional[Union[Dict, List[Dict]]]]
+
+
+class QueryCounter:
+    """
+    Counts SQL statements executed by the engine
+    """
+    def __init__(self, engine):
+        self.count = 0
+        sa_event.listen(engine, "before_cursor_execute", self._increment)
+
+    def _increment(self, *args, **kwargs):
+        self.count += 1
+
+
+class Context:
+    """
+    Shared state of the benchmark run
+    """
+    def __init__(self, app: Flask, rng: random.Random, run_id: str, users: int):
+        self.app = app
+        self.rng = rng
+        self.run_id = run_id
+        self.counter = itertools.count()
+        self.admin = app.test_client()
+        self.future_events = [event_id for event_id, in db.session.query(EventModel.id).
+                              filter(EventModel.status_filter("future")).limit(10000)]
+        # Last users of the dataset are reserved for registrations
+        self.free_usernames = ["user{}".format(number) for number in range(users - 499, users + 1)]
+        login(self.admin, "user1")
+
+    def event_id(self) -> int:
+        return self.rng.choice(self.future_events)
+
+    def unique(self, prefix: str) -> str:
+        return "{}_{}_{}".format(prefix, self.run_id, next(self.counter))
+
+
+def login(client, username: str) -> None:
+    response = client.post("/login", json={"username": username, "password": PASSWORD})
+    if response.get_json().get("status") != 200:
+        raise RuntimeError("Can not login as <{}>: {}".format(username, response.get_data(as_text=True)))
+
+
+def create_event(ctx: Context) -> int:
+    now = datetime.now()
+    event = EventModel(title=ctx.unique("bench event"), dt_start=now + timedelta(days=30),
+                       dt_end=now + timedelta(days=31), owner_id=1)
+    event.save_to_db()
+    return event.id
+
+
+def create_user(ctx: Context) -> str:
+    user = UserModel(username=ctx.unique("bench"))
+    user.save_to_db()
+    return user.username
+
+
+# Scenarios by route: name -> (client factory, request factory)
+Scenario = Tuple[str, Callable[[Context], Tuple[object, Request]]]
+
+
+def scenarios() -> Dict[str, List[Scenario]]:
+    """
+    Requests for every route registered in flask_app.urls
+    """
+    def admin(request_factory):
+        return lambda ctx: (ctx.admin, request_factory(ctx))
+
+    def anonymous_login(ctx):
+        return ctx.app.test_client(), ("POST", "/login", {"username": "user2", "password": PASSWORD})
+
+    def remote_login(ctx):
+        return ctx.app.test_client(), ("POST", "/login", {"username": ctx.unique("author"), "password": PASSWORD})
+
+    def logout(ctx):
+        client = ctx.app.test_client()
+        login(client, "user2")
+        return client, ("POST", "/logout", None)
+
+    def signup(ctx):
+        return ctx.app.test_client(), ("POST", "/signup", {"username": ctx.unique("signup"), "password": PASSWORD})
+
+    def membership(kind: str, method: str):
+        def factory(ctx):
+            event_id = ctx.event_id()
+            usernames = ctx.rng.sample(ctx.free_usernames, 5)
+            if method == "DELETE":
+                ctx.admin.post("/event/{}/{}".format(event_id, kind), json={kind: usernames})
+            return method, "/event/{}/{}".format(event_id, kind), {kind: usernames}
+        return factory
+
+    def me(kind: str, method: str):
+        def factory(ctx):
+            event_id = ctx.event_id()
+            if method == "DELETE":
+                ctx.admin.post("/event/{}/{}".format(event_id, kind))
+            return method, "/event/{}/{}".format(event_id, kind), None
+        return factory
+
+    def import_events(ctx):
+        dt_start = datetime.now() + timedelta(days=10)
+        return "POST", "/event/import", [{"title": ctx.unique("imported event"),
+                                          "dt_start": dt_start.isoformat(),
+                                          "dt_end": (dt_start + timedelta(days=1)).isoformat()}
+                                         for _ in range(50)]
+
+    def me_post(kind: str):
+        def factory(ctx):
+            event_id = ctx.event_id()
+            ctx.admin.delete("/event/{}/{}".format(event_id, kind))
+            return "POST", "/event/{}/{}".format(event_id, kind), None
+        return factory
+
+    return {
+        "/login": [("POST local", anonymous_login), ("POST remote", remote_login)],
+        "/signup": [("POST", signup)],
+        "/logout": [("POST", logout)],
+        "/user": [
+            ("GET", admin(lambda ctx: ("GET", "/user?page={}&limit=20".format(ctx.rng.randint(1, 100)), None))),
+            ("GET cursor", admin(lambda ctx: ("GET", "/user?pagination=cursor&limit=20", None))),
+        ],
+        "/user/<string:username>": [
+            ("GET", admin(lambda ctx: ("GET", "/user/user{}".format(ctx.rng.randint(2, 1000)), None))),
+            ("PATCH", admin(lambda ctx: ("PATCH", "/user/user{}".format(ctx.rng.randint(2, 1000)),
+                                         {"first_name": ctx.unique("name")}))),
+            ("DELETE", admin(lambda ctx: ("DELETE", "/user/{}".format(create_user(ctx)), None))),
+        ],
+        "/event": [
+            ("GET", admin(lambda ctx: ("GET", "/event?page={}&limit=20".format(ctx.rng.randint(1, 100)), None))),
+            ("GET deep", admin(lambda ctx: ("GET", "/event?page={}&limit=20".format(ctx.rng.randint(1000, 2000)),
+                                            None))),
+            ("GET cursor", admin(lambda ctx: ("GET", "/event?pagination=cursor&limit=20", None))),
+            ("POST", admin(lambda ctx: ("POST", "/event", {
+                "title": ctx.unique("new event"),
+                "dt_start": (datetime.now() + timedelta(days=10)).isoformat(),
+                "dt_end": (datetime.now() + timedelta(days=11)).isoformat()}))),
+        ],
+        "/event/import": [("POST", admin(import_events))],
+        "/event/<int:event_id>": [
+            ("GET", admin(lambda ctx: ("GET", "/event/{}".format(ctx.event_id()), None))),
+            ("PATCH", admin(lambda ctx: ("PATCH", "/event/{}".format(ctx.event_id()),
+                                         {"summary": ctx.unique("summary")}))),
+            ("DELETE", admin(lambda ctx: ("DELETE", "/event/{}".format(create_event(ctx)), None))),
+        ],
+        "/event/<int:event_id>/participants": [
+            ("GET", admin(lambda ctx: ("GET", "/event/{}/participants".format(ctx.event_id()), None))),
+            ("POST", admin(membership("participants", "POST"))),
+            ("DELETE", admin(membership("participants", "DELETE"))),
+        ],
+        "/event/<int:event_id>/guests": [
+            ("GET", admin(lambda ctx: ("GET", "/event/{}/guests".format(ctx.event_id()), None))),
+            ("POST", admin(membership("guests", "POST"))),
+            ("DELETE", admin(membership("guests", "DELETE"))),
+        ],
+        "/event/<int:event_id>/me_guest": [
+            ("GET", admin(me("me_guest", "GET"))),
+            ("POST", admin(me_post("me_guest"))),
+            ("DELETE", admin(me("me_guest", "DELETE"))),
+        ],
+        "/event/<int:event_id>/me_participant": [
+            ("GET", admin(me("me_participant", "GET"))),
+            ("POST", admin(me_post("me_participant"))),
+            ("DELETE", admin(me("me_participant", "DELETE"))),
+        ],
+        "/where_i_participant": [("GET", admin(lambda ctx: ("GET", "/where_i_participant", None)))],
+        "/where_i_guest": [("GET", admin(lambda ctx: ("GET", "/where_i_guest", None)))],
+        "/my_events": [("GET", admin(lambda ctx: ("GET", "/my_events", None)))],
+        "/export/<string:kind>": [
+            ("GET events", admin(lambda ctx: ("GET", "/export/events?status=current", None))),
+            ("GET participants", admin(lambda ctx: ("GET", "/export/participants?status=current&format=csv", None))),
+        ],
+    }
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def measure(ctx: Context, counter: QueryCounter, factory, requests: int) -> Dict:
+    latencies, queries, errors = [], [], 0
+    for _ in range(requests):
+        client, (method, url, body) = factory(ctx)
+        counter.count = 0
+        started = time.perf_counter()
+        # Streamed responses are read to the end
+        response = client.open(url, method=method, json=body, buffered=True)
+        latencies.append(time.perf_counter() - started)
+        queries.append(counter.count)
+        errors += response.status_code >= 500
+        db.session.remove()
+
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p95_ms": percentile(latencies, 0.95) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": mean(latencies) * 1000,
+        "throughput_rps": requests / sum(latencies),
+        "queries_mean": mean(queries),
+        "queries_max": max(queries),
+    }
+
+
+def compare(results: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """
+    Returns descriptions of routes with p95 latency regression over the threshold
+    """
+    regressions = []
+    for name, result in results["routes"].items():
+        old = baseline.get("routes", {}).get(name)
+        if old and result["p95_ms"] > old["p95_ms"] * (1 + threshold):
+            regressions.append("{}: p95 {:.1f}ms -> {:.1f}ms".format(name, old["p95_ms"], result["p95_ms"]))
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-uri", default=os.getenv("BENCH_DATABASE_URI"))
+    parser.add_argument("--build", action="store_true", help="Recreate the dataset before running")
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--participants", type=int, default=10)
+    parser.add_argument("--guests", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario")
+    parser.add_argument("--books-latency", type=float, default=0.0, help="Books stub delay in seconds")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_output.json")
+    parser.add_argument("--baseline", help="Results of a previous run for comparison")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed p95 growth, 0.2 is 20%%")
+    arguments = parser.parse_args()
+
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    app_config = {"SECRET_KEY": os.environ["SECRET_KEY"]}
+    if arguments.database_uri:
+        app_config["SQLALCHEMY_DATABASE_URI"] = arguments.database_uri
+    app = create_app(app_config)
+    stub = start_books_stub(arguments.books_latency)
+    os.environ["BOOKS_APP_URL"] = "http://127.0.0.1:{}".format(stub.server_port)
+
+    with app.app_context():
+        if arguments.build:
+            started = time.perf_counter()
+            build_dataset(events=arguments.events, users=arguments.users,
+                          participants=arguments.participants, guests=arguments.guests, seed=arguments.seed)
+            print("Dataset built in {:.1f}s".format(time.perf_counter() - started))
+
+        ctx = Context(app, random.Random(arguments.seed), run_id=str(int(time.time())), users=arguments.users)
+        counter = QueryCounter(db.engine)
+        all_scenarios = scenarios()
+
+        missing = {rule for _, urls, *rest in app.extensions["api"].resources for rule in urls} - set(all_scenarios)
+        if missing:
+            print("Routes without scenarios: {}".format(", ".join(sorted(missing))), file=sys.stderr)
+            return 1
+
+        results = {"meta": {"date": datetime.now().isoformat(), "requests": arguments.requests,
+                            "events": arguments.events, "users": arguments.users,
+                            "books_latency": arguments.books_latency,
+                            "database": db.engine.dialect.name}, "routes": {}}
+        for rule, cases in all_scenarios.items():
+            for case, factory in cases:
+                name = "{} {}".format(case, rule)
+                results["routes"][name] = result = measure(ctx, counter, factory, arguments.requests)
+                print("{:<50} p50 {:>8.1f}ms  p95 {:>8.1f}ms  p99 {:>8.1f}ms  {:>8.1f} rps  {:>5.1f} queries".format(
+                    name, result["p50_ms"], result["p95_ms"], result["p99_ms"],
+                    result["throughput_rps"], result["queries_mean"]))
+
+    with open(arguments.output, "w") as output:
+        json.dump(results, output, indent=2)
+
+    if arguments.baseline:
+        with open(arguments.baseline) as baseline:
+            regressions = compare(results, json.load(baseline), arguments.threshold)
+        for regression in regressions:
+            print("REGRESSION {}".format(regression), file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,126 @@
+"""
+Contention benchmark of registrations for a single event with limited capacity
+
+Usage:
+    python -m benchmarks.registration --database-uri postgresql://... \
+        [--workers 32] [--users 2000] [--capacity 500]
+
+Every worker thread registers its share of fresh users for the same event
+through POST /event/<id>/me_participant. The run fails if more users were
+admitted than the capacity allows or the participant counter differs
+from the amount of participant rows.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from flask import Flask
+
+from flask_app import create_app, db
+from flask_app.config import engine_options
+from flask_app.models.event import EventModel, EventParticipantModel
+from flask_app.models.user import UserModel
+
+
+def prepare(users: int, capacity: int) -> Tuple[int, List[int]]:
+    """
+    Creates the hot event and users for registration, returns their ids
+    """
+    run_id = int(time.time())
+    now = datetime.now()
+    owner = UserModel(username="registration_owner_{}".format(run_id))
+    owner.save_to_db()
+    event = EventModel(title="Registration benchmark {}".format(run_id), capacity=capacity,
+                       dt_start=now + timedelta(days=30), dt_end=now + timedelta(days=31), owner_id=owner.id)
+    event.save_to_db()
+
+    user_ids = [user.id for user in UserModel.create_many(
+        "registration_{}_{}".format(run_id, number) for number in range(users))]
+    db.session.commit()
+    return event.id, user_ids
+
+
+def worker(app: Flask, event_id: int, user_ids: List[int], barrier: threading.Barrier, results: Dict) -> None:
+    statuses, latencies = [], []
+    clients = []
+    for user_id in user_ids:
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session["_user_id"] = str(user_id)
+            session["_fresh"] = True
+        clients.append(client)
+
+    barrier.wait()
+    for client in clients:
+        started = time.perf_counter()
+        response = client.post("/event/{}/me_participant".format(event_id))
+        latencies.append(time.perf_counter() - started)
+        statuses.append(response.status_code if response.status_code >= 500 else response.get_json()["status"])
+
+    with results["lock"]:
+        results["statuses"].extend(statuses)
+        results["latencies"].extend(latencies)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-uri", default=os.getenv("BENCH_DATABASE_URI"))
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--users", type=int, default=2000, help="Registering users")
+    parser.add_argument("--capacity", type=int, default=500)
+    arguments = parser.parse_args()
+
+    app_config = {"SECRET_KEY": os.getenv("SECRET_KEY") or "benchmark"}
+    if arguments.database_uri:
+        app_config["SQLALCHEMY_DATABASE_URI"] = arguments.database_uri
+    app = create_app(app_config)
+    options = engine_options(app.config["SQLALCHEMY_DATABASE_URI"])
+    if options:
+        options.update(pool_size=arguments.workers, max_overflow=0)
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+    with app.app_context():
+        event_id, user_ids = prepare(arguments.users, arguments.capacity)
+        db.session.remove()
+
+        results = {"lock": threading.Lock(), "statuses": [], "latencies": []}
+        barrier = threading.Barrier(arguments.workers + 1)
+        threads = [threading.Thread(target=worker,
+                                    args=(app, event_id, user_ids[number::arguments.workers], barrier, results))
+                   for number in range(arguments.workers)]
+        for thread in threads:
+            thread.start()
+        barrier.wait()
+        started = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        event = EventModel.find_by_id(event_id)
+        capacity, participant_count = event.capacity, event.participant_count
+        rows = EventParticipantModel.query.filter_by(event_id=event_id).count()
+
+    statuses = results["statuses"]
+    latencies = sorted(results["latencies"])
+    admitted = statuses.count(200)
+    print("registrations: {}, admitted: {}, rejected: {}, errors: {}".format(
+        len(statuses), admitted, statuses.count(400), sum(status >= 500 for status in statuses)))
+    print("throughput: {:.1f} rps, p50 {:.1f}ms, p99 {:.1f}ms".format(
+        len(statuses) / elapsed, latencies[len(latencies) // 2] * 1000,
+        latencies[int(0.99 * (len(latencies) - 1))] * 1000))
+    print("capacity: {}, participant_count: {}, participant rows: {}".format(
+        capacity, participant_count, rows))
+
+    expected = min(arguments.capacity, arguments.users)
+    if not admitted == rows == participant_count == expected:
+        print("FAILED: expected exactly {} participants".format(expected), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+"""
+Benchmark of marshmallow dump against compiled schemas
+
+Usage: python -m benchmarks.serializers [--events 1000] [--members 20] [--repeat 5]
+"""
+import argparse
+import json
+import timeit
+from datetime import datetime, timedelta
+
+from flask_app.models.artifact import ArtifactModel
+from flask_app.models.event import EventModel
+from flask_app.models.user import UserModel
+from flask_app.schemas.event import event_full_list_schema, event_short_list_schema
+from flask_app.schemas.fast import compile_schema
+from flask_app.schemas.user import user_short_list_schema
+
+
+def make_events(count: int, members: int):
+    """
+    Builds transient events with owner, members and artifacts
+    """
+    users = [UserModel(id=number, username="user{}".format(number),
+                       first_name="First", last_name="Last", is_admin=False)
+             for number in range(members * 2 + 1)]
+    now = datetime.now()
+    events = []
+    for number in range(count):
+        events.append(EventModel(id=number, title="Event {}".format(number), summary="Summary " * 10,
+                                 dt_start=now + timedelta(days=number), dt_end=now + timedelta(days=number + 1),
+                                 owner=users[0],
+                                 participants=users[1:members + 1],
+                                 guests=users[members + 1:],
+                                 artifacts=[ArtifactModel(id=number, url="/books/{}/".format(number))]))
+    return events, users
+
+
+def run(events: int, members: int, repeat: int) -> None:
+    items, users = make_events(events, members)
+    cases = [
+        ("event_short_list", event_short_list_schema, items),
+        ("event_full_list", event_full_list_schema, items),
+        ("user_short_list", user_short_list_schema, users),
+    ]
+    print("{:<20}{:>14}{:>14}{:>10}".format("schema", "marshmallow", "compiled", "speedup"))
+    for name, schema, data in cases:
+        compiled = compile_schema(schema)
+        if json.dumps(schema.dump(data)) != json.dumps(compiled.dump(data)):
+            raise AssertionError("Compiled output of <{}> differs from marshmallow".format(name))
+
+        slow = min(timeit.repeat(lambda: schema.dump(data), number=1, repeat=repeat))
+        fast = min(timeit.repeat(lambda: compiled.dump(data), number=1, repeat=repeat))
+        print("{:<20}{:>12.1f}ms{:>12.1f}ms{:>9.1f}x".format(name, slow * 1000, fast * 1000, slow / fast))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=1000)
+    parser.add_argument("--members", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    arguments = parser.parse_args()
+    run(arguments.events, arguments.members, arguments.repeat)
@@ -0,0 +1,180 @@
+"""
+Load test of the development server and the production server configuration
+
+Usage:
+    python -m benchmarks.server_throughput --database-uri postgresql://... [--build]
+        [--concurrency 64] [--duration 20] [--workers 0] [--threads 0]
+
+The development server (Werkzeug, one process, a thread per request) and
+gunicorn with gunicorn.conf.py run in turn against the same database.
+The load generator keeps --concurrency requests in flight for --duration
+seconds per route and prints throughput and latency percentiles:
+
+    route                 server      rps    p50 ms   p99 ms  errors
+    GET /event            dev       ...
+    GET /event            gunicorn  ...
+
+Routes are the public event reads (list, search, retrieve, guests) and
+POST /login of seeded users, whose password hashing is CPU bound. The
+development server is limited to one CPU by the interpreter lock. The
+gunicorn workers scale with CPU count, up to the database connection budget.
+--workers and --threads override WEB_WORKERS and WEB_THREADS of the
+configuration, by default they are derived from CPU count and pool size.
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+
+from benchmarks.dataset import PASSWORD, build_dataset
+from flask_app import create_app, db
+from flask_app.models.event import EventModel
+
+Route = Tuple[str, Callable[[random.Random], Tuple[str, str, Dict]]]
+
+
+def configured_app():
+    """
+    Returns the application connected to BENCH_DATABASE_URI, used by the servers
+    """
+    app_config = {"SECRET_KEY": os.environ["SECRET_KEY"]}
+    if os.getenv("BENCH_DATABASE_URI"):
+        app_config["SQLALCHEMY_DATABASE_URI"] = os.environ["BENCH_DATABASE_URI"]
+    return create_app(app_config)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(server: str, env: Dict[str, str]) -> Tuple[subprocess.Popen, str]:
+    """
+    Starts the server subprocess and waits until it accepts connections
+    """
+    port = free_port()
+    if server == "gunicorn":
+        command = ["gunicorn", "-c", "gunicorn.conf.py", "--bind", "127.0.0.1:{}".format(port),
+                   "--access-logfile", "/dev/null", "benchmarks.server_throughput:configured_app()"]
+    else:
+        command = [sys.executable, "-m", "benchmarks.server_throughput", "--serve", "--port", str(port)]
+    process = subprocess.Popen(command, env=env)
+
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            return process, "http://127.0.0.1:{}".format(port)
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError("{} server did not start".format(server))
+
+
+def routes(event_ids: List[int], users: int) -> List[Route]:
+    return [
+        ("GET /event", lambda rng: ("GET", "/event?status=future&limit=20&page={}".format(
+            rng.randint(1, 50)), None)),
+        ("GET /event?q=", lambda rng: ("GET", "/event?q={}".format(rng.choice(["music", "art", "open"])), None)),
+        ("GET /event/<id>", lambda rng: ("GET", "/event/{}".format(rng.choice(event_ids)), None)),
+        ("GET /event/<id>/guests", lambda rng: ("GET", "/event/{}/guests".format(rng.choice(event_ids)), None)),
+        ("POST /login", lambda rng: ("POST", "/login", {"username": "user{}".format(rng.randint(2, users)),
+                                                         "password": PASSWORD})),
+    ]
+
+
+async def run_route(base_url: str, route: Route, concurrency: int, duration: float, seed: int) -> Dict:
+    """
+    Sends requests of the route from concurrent clients until the duration is over
+    """
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+
+        async def user(number: int) -> None:
+            nonlocal errors
+            rng = random.Random(seed + number)
+            while time.perf_counter() < deadline:
+                method, url, body = route[1](rng)
+                started = time.perf_counter()
+                try:
+                    # Every request is anonymous, login cookies are not kept
+                    client.cookies.clear()
+                    response = await client.request(method, url, json=body)
+                    errors += response.status_code >= 500
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*map(user, range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {"rps": len(latencies) / elapsed, "errors": errors,
+            "p50_ms": latencies[len(latencies) // 2] * 1000,
+            "p99_ms": latencies[int(0.99 * (len(latencies) - 1))] * 1000}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-uri", default=os.getenv("BENCH_DATABASE_URI"))
+    parser.add_argument("--build", action="store_true", help="Recreate the dataset before running")
+    parser.add_argument("--events", type=int, default=100000)
+    parser.add_argument("--users", type=int, default=50000)
+    parser.add_argument("--concurrency", type=int, default=64, help="Requests in flight")
+    parser.add_argument("--duration", type=float, default=20, help="Seconds per route and server")
+    parser.add_argument("--workers", type=int, default=0, help="Gunicorn workers, derived by default")
+    parser.add_argument("--threads", type=int, default=0, help="Gunicorn threads, derived by default")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    arguments = parser.parse_args()
+
+    if arguments.serve:
+        configured_app().run(host="127.0.0.1", port=arguments.port, threaded=True)
+        return 0
+
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    if arguments.database_uri:
+        os.environ["BENCH_DATABASE_URI"] = arguments.database_uri
+    env = dict(os.environ)
+    if arguments.workers:
+        env["WEB_WORKERS"] = str(arguments.workers)
+    if arguments.threads:
+        env["WEB_THREADS"] = str(arguments.threads)
+
+    with configured_app().app_context():
+        if arguments.build:
+            build_dataset(events=arguments.events, users=arguments.users, seed=arguments.seed)
+        event_ids = [event_id for event_id, in db.session.query(EventModel.id).limit(10000)]
+        db.session.remove()
+        db.engine.dispose()
+
+    print("{:<22} {:<9} {:>9} {:>9} {:>9} {:>7}".format("route", "server", "rps", "p50 ms", "p99 ms", "errors"))
+    for route in routes(event_ids, arguments.users):
+        for server in ("dev", "gunicorn"):
+            process, base_url = start_server(server, env)
+            try:
+                result = asyncio.run(run_route(base_url, route, arguments.concurrency,
+                                               arguments.duration, arguments.seed))
+            finally:
+                process.terminate()
+                process.wait()
+            print("{:<22} {:<9} {:>9.1f} {:>9.1f} {:>9.1f} {:>7}".format(
+                route[0], server, result["rps"], result["p50_ms"], result["p99_ms"], result["errors"]))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,50 +1,107 @@
-import os
+"""
+Module with the application factory. Extensions are created unbound,
+so importing models or the package does not build an application.
+"""
+import threading
+from typing import Mapping, Optional, Union
 
 from flask import Flask, jsonify
 from flask_babel import Babel
 from flask_migrate import Migrate
-from flask_restx import Api
-from flask_sqlalchemy import SQLAlchemy
-from marshmallow import ValidationError
 from sqlalchemy.exc import InvalidRequestError, IntegrityError
+
 from . import config
+from .metrics.instrumentation import init_metrics
+from .routing import RoutingSQLAlchemy, init_routing
+
+# database connection, read-only requests use replicas if configured
+db = RoutingSQLAlchemy()
+
+# database migration
+migrate = Migrate()
+
+babel = Babel()
+
+_default_app: Optional[Flask] = None
+_default_app_lock = threading.Lock()
+
+
+def create_app(app_config: Union[type, Mapping, None] = None, resources: bool = True) -> Flask:
+    """Function for creating the application, every call returns
+    a new instance with its own configuration, engines and API
+
+    Parameters
+    ----------
+    app_config : Union[type, Mapping, None]
+        Configuration object or mapping applied over config.Config.
+        Engine options are derived from SQLALCHEMY_DATABASE_URI if not provided
+    resources : bool
+        Whether to import and register the API resources, management
+        commands which do not serve requests skip them
 
-# create Flask application
-app = Flask(__name__)
-app.secret_key = os.getenv("SECRET_KEY")
+    Returns
+    -------
+    Flask
+        Application
+    """
+    app = Flask(__name__)
 
-# create babel
-babel = Babel(app)
+    # Environment Configuration
+    app.config.from_object(config.Config)
+    if isinstance(app_config, Mapping):
+        app.config.from_mapping(app_config)
+    elif app_config is not None:
+        app.config.from_object(app_config)
+    if app.config["SQLALCHEMY_DATABASE_URI"] != config.Config.SQLALCHEMY_DATABASE_URI and \
+            app.config["SQLALCHEMY_ENGINE_OPTIONS"] is config.Config.SQLALCHEMY_ENGINE_OPTIONS:
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = config.engine_options(app.config["SQLALCHEMY_DATABASE_URI"])
 
-# Environment Configuration
-app.config.from_object(config.Config)
+    babel.init_app(app)
+    db.init_app(app)
+    init_routing(app)
+    migrate.init_app(app, db)
 
-# initialize the database connection
-db = SQLAlchemy(app)
+    # models are registered in the metadata for migrations and create_all
+    from flask_app.models.event import EventModel
+    from flask_app.models.user import UserModel
+    from flask_app.models.artifact import ArtifactModel
 
-# initialize the database migration
-migrate = Migrate(app, db)
+    if resources:
+        from flask_restx import Api
+        from marshmallow import ValidationError
 
-# initialize api
-api = Api(app, title='Flask Events')
+        from flask_app.auth.login import login_manager
+        from flask_app.urls import register_resources
 
+        login_manager.init_app(app)
+        api = Api(app, title='Flask Events')
+        register_resources(api)
+        app.extensions["api"] = api
 
-from flask_app.models.event import EventModel
-from flask_app.models.user import UserModel
-from flask_app.models.artifact import ArtifactModel
-from flask_app import urls
+        @app.errorhandler(ValidationError)
+        def handle_marshmallow_validation(err: ValidationError):
+            return jsonify(err.messages), 400
 
+    # initialize request instrumentation and /metrics endpoint
+    init_metrics(app)
 
-@app.errorhandler(ValidationError)
-def handle_marshmallow_validation(err: ValidationError):
-    return jsonify(err.messages), 400
+    @app.errorhandler(IntegrityError)
+    def handle_integrity_error(err: IntegrityError):
+        return {"ERROR": str(err)}, 404
 
+    @app.errorhandler(InvalidRequestError)
+    def handle_invalid_request_error(err: InvalidRequestError):
+        return {"ERROR": str(err)}, 404
 
-@app.errorhandler(IntegrityError)
-def handle_marshmallow_validation(err: IntegrityError):
-    return {"ERROR": str(err)}, 404
+    return app
 
 
-@app.errorhandler(InvalidRequestError)
-def handle_marshmallow_validation(err: InvalidRequestError):
-    return {"ERROR": str(err)}, 404
+def __getattr__(name: str):
+    # Default application is created on the first access of flask_app.app
+    if name == "app":
+        global _default_app
+        with _default_app_lock:
+            if _default_app is None:
+                _default_app = create_app()
+        return _default_app
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -0,0 +1,412 @@
+"""
+Module with the ASGI application. Endpoints waiting on the books service
+(/login, /signup and the membership posts) are served by async handlers
+with the asyncpg driver, so one process keeps hundreds of slow remote
+calls in flight. All other routes are served by the Flask application.
+
+Usage:
+    python manage.py run_asgi
+    uvicorn --factory flask_app.asgi:create_asgi_app
+"""
+import asyncio
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from flask import Flask
+from itsdangerous import BadSignature
+from sqlalchemy import exc, insert, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, create_async_engine
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.wsgi import WSGIMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from flask_app import create_app
+from flask_app.auth.login import credentials_key, decode_token, encode_token, remote_identities
+from flask_app.books.async_client import async_books_client
+from flask_app.models.event import EventModel
+from flask_app.models.user import UserModel
+from flask_app.routing import STICKY_SESSION_KEY, replica_keys
+from flask_app.schemas.fast import compile_schema
+from flask_app.schemas.user import user_full_schema
+
+users = UserModel.__table__
+events = EventModel.__table__
+
+
+class Rejected(Exception):
+    """
+    Raised inside a transaction to roll it back and answer with the response
+    """
+    def __init__(self, response: Response):
+        super().__init__()
+        self.response = response
+
+
+def message(status: int, text: str, **extra) -> JSONResponse:
+    """
+    Returns JSON message in the format of the Flask endpoints
+    """
+    return JSONResponse({"status": status, "message": text, **extra})
+
+
+def async_database_uri(database_uri: str) -> str:
+    """
+    Converts PostgreSQL url to the asyncpg dialect
+    """
+    scheme, rest = database_uri.split("://", 1)
+    return "postgresql+asyncpg://{}".format(rest) if scheme.startswith("postgresql") else database_uri
+
+
+def create_engine(database_uri: str) -> AsyncEngine:
+    """Function for creating async engine with the same limits as the sync pool
+
+    Parameters
+    ----------
+    database_uri : str
+        Database url of the Flask application
+
+    Returns
+    -------
+    AsyncEngine
+        Engine using asyncpg
+    """
+    return create_async_engine(
+        async_database_uri(database_uri),
+        pool_size=int(os.getenv("DB_POOL_SIZE", 5)),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", 5)),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", 10)),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", 1800)),
+        connect_args={"timeout": int(os.getenv("DB_CONNECT_TIMEOUT", 5)),
+                      "server_settings": {
+                          "statement_timeout": os.getenv("DB_STATEMENT_TIMEOUT_MS", "30000"),
+                          "idle_in_transaction_session_timeout": os.getenv("DB_IDLE_IN_TRANSACTION_TIMEOUT_MS",
+                                                                           "60000")}})
+
+
+def load_session(request: Request) -> Dict:
+    """
+    Returns Flask session stored in the request cookie, empty if missing or invalid
+    """
+    app = request.app.state.flask_app
+    serializer = app.session_interface.get_signing_serializer(app)
+    cookie = request.cookies.get(app.config["SESSION_COOKIE_NAME"])
+    if serializer is None or not cookie:
+        return {}
+    try:
+        return dict(serializer.loads(cookie, max_age=int(app.permanent_session_lifetime.total_seconds())))
+    except BadSignature:
+        return {}
+
+
+def save_session(request: Request, response: Response, session: Dict) -> None:
+    """
+    Stores Flask session in the response cookie, readable by Flask-Login
+    """
+    app = request.app.state.flask_app
+    serializer = app.session_interface.get_signing_serializer(app)
+    response.set_cookie(app.config["SESSION_COOKIE_NAME"], serializer.dumps(session),
+                        path=app.config["SESSION_COOKIE_PATH"] or "/",
+                        domain=app.config["SESSION_COOKIE_DOMAIN"],
+                        secure=app.config["SESSION_COOKIE_SECURE"],
+                        httponly=app.config["SESSION_COOKIE_HTTPONLY"],
+                        samesite=app.config["SESSION_COOKIE_SAMESITE"])
+
+
+def sticky_session(app: Flask) -> Dict:
+    """
+    Returns session keys sending reads of the user to the primary database
+    after a successful write, empty without replicas, as flask_app.routing.init_routing does
+    """
+    if not replica_keys(app):
+        return {}
+    return {STICKY_SESSION_KEY: time.time() + app.config["DB_REPLICA_STICKY_SECONDS"]}
+
+
+def stick_to_primary(request: Request, response: Response) -> Response:
+    """
+    Stores the sticky session keys in the response cookie after a successful write
+    """
+    sticky = sticky_session(request.app.state.flask_app)
+    if sticky:
+        save_session(request, response, {**load_session(request), **sticky})
+    return response
+
+
+async def find_user(conn: AsyncConnection, **filters) -> Optional[Row]:
+    return (await conn.execute(select(users).filter_by(**filters))).first()
+
+
+async def current_user(engine: AsyncEngine, request: Request) -> Optional[Row]:
+    """
+    Returns user logged in by Flask-Login, None for anonymous requests
+    """
+    user_id = load_session(request).get("_user_id")
+    if user_id is None:
+        return None
+    async with engine.connect() as conn:
+        return await find_user(conn, id=int(user_id))
+
+
+def profile(user: Row) -> Dict:
+    return compile_schema(user_full_schema).dump_one(user)
+
+
+async def remote_login(username: str, password: str) -> Optional[Dict]:
+    """
+    Async version of flask_app.auth.login.jwt_login sharing its cache
+    """
+    key = credentials_key(username, password)
+    jwt_data = remote_identities.get(key)
+    if jwt_data is not None:
+        return jwt_data
+
+    token = await async_books_client.jwt_auth(encode_token(username, password))
+    if token is None:
+        return None
+
+    jwt_data = decode_token(token)
+    remote_identities.set(key, jwt_data)
+    return jwt_data
+
+
+async def sync_remote_profile(engine: AsyncEngine, user: Optional[Row], username: str, jwt_data: Dict) -> Row:
+    """
+    Async version of flask_app.auth.login.sync_profile creating the user if needed
+    """
+    async with engine.begin() as conn:
+        if user is None:
+            await conn.execute(insert(users).values(username=username))
+            user = await find_user(conn, username=username)
+
+        data = {field: jwt_data[field] for field in ("first_name", "last_name", "email", "is_admin")
+                if field in jwt_data and getattr(user, field) != jwt_data[field]}
+        if UserModel.EVENT_DOCUMENT_FIELDS.intersection(data):
+            event_ids = (await conn.execute(EventModel.related_to_statement(user.id))).scalars().all()
+            if event_ids:
+                await conn.execute(EventModel.touch_statement(event_ids))
+
+        if data:
+            await conn.execute(update(users).where(users.c.id == user.id).values(**data))
+            user = await find_user(conn, id=user.id)
+    return user
+
+
+async def login(request: Request) -> Response:
+    engine = request.app.state.engine
+    session = load_session(request)
+
+    if session.get("_user_id") is not None:
+        user = await current_user(engine, request)
+        if user is not None:
+            return JSONResponse({"status": 403, "massage": "Already logged in as <{}>".format(user.username)})
+
+    user_data = await request.json()
+    username = user_data.get("username")
+    password = user_data.get("password")
+
+    if username is None or password is None:
+        return JSONResponse({"status": 400, "massage": "Username or password wasn`t provided"})
+
+    async with engine.connect() as conn:
+        user = await find_user(conn, username=username)
+
+    password_hash = user._mapping["_password"] if user is not None else None
+    if not password_hash or not await run_in_threadpool(check_password_hash, password_hash, password):
+        jwt_data = await remote_login(username, password)
+
+        if jwt_data is None:
+            if user is None and not await async_books_client.user_exists(username):
+                return JSONResponse({"status": 404,
+                                     "massage": "No user founded with username <{}>".format(username)})
+            return JSONResponse({"status": 401, "massage": "Invalid password"})
+
+        user = await sync_remote_profile(engine, user, username, jwt_data)
+
+    response = message(200, "Successfully logged in as <{}>".format(username), profile=profile(user))
+    save_session(request, response, {**session, "_user_id": str(user.id), "_fresh": True,
+                                     **sticky_session(request.app.state.flask_app)})
+    return response
+
+
+async def signup(request: Request) -> Response:
+    engine = request.app.state.engine
+    user_json = await request.json()
+    username = user_json.get("username")
+    password = user_json.get("password")
+
+    if username is None or password is None:
+        return JSONResponse({"status": 400, "massage": "Username or password wasn`t provided"})
+
+    async with engine.connect() as conn:
+        if await find_user(conn, username=username) is not None:
+            return JSONResponse({"status": 401, "message": "User already exists"})
+    if await async_books_client.user_exists(username):
+        return JSONResponse({"status": 401, "message": "User already exists in remote service"})
+
+    password_hash = await run_in_threadpool(generate_password_hash, password)
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(insert(users).values(username=username, _password=password_hash,
+                                                    first_name=user_json.get("first_name"),
+                                                    last_name=user_json.get("last_name"),
+                                                    email=user_json.get("email")))
+            user = await find_user(conn, username=username)
+    except exc.IntegrityError as error:
+        return JSONResponse({"ERROR": str(error)}, status_code=404)
+    return JSONResponse(profile(user))
+
+
+async def load_event(conn: AsyncConnection, event_id: int) -> Row:
+    """
+    Returns event open for changes, raises Rejected in the Flask endpoints format otherwise
+    """
+    event = (await conn.execute(select(events.c.id, events.c.owner_id, events.c.dt_end).
+                                where(events.c.id == event_id))).first()
+    if event is None:
+        raise Rejected(message(404, "Event not found"))
+    if event.dt_end < datetime.now():
+        raise Rejected(message(404, "You can not apply changes to past event"))
+    return event
+
+
+async def register(conn: AsyncConnection, event_id: int, user_ids: List[int], role: str) -> bool:
+    """
+    Takes places and registers users, returns False if the event is full
+    """
+    counters = {"{}s".format(role): len(user_ids)}
+    if (await conn.execute(EventModel.counters_statement(event_id, **counters))).rowcount != 1:
+        return False
+    for statement, rows in EventModel.registration_statements(event_id, user_ids, role):
+        await conn.execute(statement, rows)
+    return True
+
+
+def register_me(role: str):
+    """
+    Builds handler registering the current user as a guest or a participant
+    """
+    async def handler(request: Request) -> Response:
+        engine = request.app.state.engine
+        user = await current_user(engine, request)
+        if user is None:
+            return Response("Authorization required", status_code=403)
+
+        event_id = request.path_params["event_id"]
+        try:
+            async with engine.begin() as conn:
+                await load_event(conn, event_id)
+                registered = dict((await conn.execute(EventModel.roles_statement(event_id, [user.id]))).all())
+                if user.id in registered:
+                    raise Rejected(message(404, "You already registered as a {}".format(registered[user.id])))
+                if not await register(conn, event_id, [user.id], role):
+                    raise Rejected(message(400, "Event is full"))
+        except Rejected as rejected:
+            return rejected.response
+        except exc.IntegrityError:
+            # Concurrent request registered the user first
+            return message(404, "You already registered for event")
+
+        return stick_to_primary(request, message(200, "Successfully register as a {}".format(role)))
+    return handler
+
+
+def register_many(role: str):
+    """
+    Builds handler registering users by the event owner or admin
+    """
+    field = "{}s".format(role)
+
+    async def handler(request: Request) -> Response:
+        engine = request.app.state.engine
+        user = await current_user(engine, request)
+        if user is None:
+            return Response("Authorization required", status_code=403)
+
+        event_id = request.path_params["event_id"]
+        body = await request.json()
+        usernames = list(dict.fromkeys(body.get(field) or []))
+        if not usernames:
+            return message(404, "Empty or unprovided {} list".format(field))
+
+        try:
+            async with engine.connect() as conn:
+                event = await load_event(conn, event_id)
+                local = set((await conn.execute(select(users.c.username).
+                                                where(users.c.username.in_(usernames)))).scalars())
+        except Rejected as rejected:
+            return rejected.response
+        if not user.is_admin and user.id != event.owner_id:
+            return Response("Admin or Owner account required", status_code=403)
+
+        # Users missing locally are checked in the books service concurrently
+        remote = [username for username in usernames if username not in local]
+        for username, exists in zip(remote, await asyncio.gather(*map(async_books_client.user_exists, remote))):
+            if not exists:
+                return message(404, "User <{}> not found".format(username))
+
+        try:
+            async with engine.begin() as conn:
+                if remote:
+                    await conn.execute(insert(users), [{"username": username} for username in remote])
+                ids = dict((await conn.execute(select(users.c.username, users.c.id).
+                                               where(users.c.username.in_(usernames)))).all())
+                user_ids = [ids[username] for username in usernames]
+
+                registered = dict((await conn.execute(EventModel.roles_statement(event_id, user_ids))).all())
+                for username, user_id in zip(usernames, user_ids):
+                    if user_id in registered:
+                        raise Rejected(message(400, "<{}> already registered for event as {}".format(
+                            username, registered[user_id])))
+                if not await register(conn, event_id, user_ids, role):
+                    raise Rejected(message(400, "Event has not enough free places"))
+        except Rejected as rejected:
+            return rejected.response
+        except exc.IntegrityError as error:
+            return JSONResponse({"ERROR": str(error)}, status_code=404)
+
+        response = message(200, "All users were successfully registered for event {}".format(field))
+        return stick_to_primary(request, response)
+    return handler
+
+
+def create_asgi_app(app: Optional[Flask] = None) -> Starlette:
+    """Function for creating ASGI application serving the Flask application
+    with async handlers of the remote-call-heavy endpoints
+
+    Parameters
+    ----------
+    app : Optional[Flask]
+        Application serving the rest of the routes and providing the configuration,
+        created by create_app if not provided
+
+    Returns
+    -------
+    Starlette
+        ASGI application
+    """
+    app = app or create_app()
+    routes = [
+        Route("/login", login, methods=["POST"]),
+        Route("/signup", signup, methods=["POST"]),
+        Route("/event/{event_id:int}/me_participant", register_me("participant"), methods=["POST"]),
+        Route("/event/{event_id:int}/me_guest", register_me("guest"), methods=["POST"]),
+        Route("/event/{event_id:int}/participants", register_many("participant"), methods=["POST"]),
+        Route("/event/{event_id:int}/guests", register_many("guest"), methods=["POST"]),
+        Mount("/", app=WSGIMiddleware(app)),
+    ]
+
+    async def shutdown():
+        await application.state.engine.dispose()
+        await async_books_client.close()
+
+    application = Starlette(routes=routes, on_shutdown=[shutdown])
+    application.state.flask_app = app
+    application.state.engine = create_engine(app.config["SQLALCHEMY_DATABASE_URI"])
+    return application
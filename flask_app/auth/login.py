@@ -1,8 +1,10 @@
+import hashlib
+import hmac
 import json
 import os
+from typing import Dict, Optional
 
 import jwt
-import requests
 from flask import request, jsonify, Response
 from flask_login import (
     LoginManager,
@@ -13,12 +15,17 @@ from flask_login import (
 )
 from flask_restx import Resource
 
-from flask_app import app, db
+from flask_app import db
+from flask_app.books.client import books_client
+from flask_app.cache.backends import TTLCache
 from flask_app.models.user import UserModel
 from flask_app.schemas.user import user_full_schema
 
+# bound to the application by create_app
 login_manager = LoginManager()
-login_manager.init_app(app)
+
+remote_identities = TTLCache(max_size=int(os.getenv('REMOTE_LOGIN_CACHE_SIZE', 4096)),
+                             ttl=float(os.getenv('REMOTE_LOGIN_TTL', 300)))
 
 
 @login_manager.unauthorized_handler
@@ -39,26 +46,76 @@ def encode_token(username: str, password: str):
     return jwt.encode({"username": username, "password": password}, os.getenv('SECRET_KEY'), algorithm='HS256')
 
 
-def jwt_login(username: str, password: str) -> bool:
-    jwt_token = encode_token(username, password)
-    response = requests.post('{}/api/jwt-auth/'.format(os.getenv('BOOKS_APP_URL')),
-                             headers={'Content-Type': 'application/json'},
-                             data=json.dumps({"token": jwt_token}))
-
-    if response.status_code == 200:
-        jwt_data = decode_token(json.loads(response.text)["jwt"])
-
-        user = UserModel.get_or_create(username)
-        user.password = password
-        user.first_name = jwt_data["first_name"]
-        user.first_name = jwt_data["first_name"]
-        user.email = jwt_data["email"]
-        user.is_admin = jwt_data["is_admin"]
-        db.session.commit()
+def credentials_key(username: str, password: str) -> str:
+    """Function for building cache key of the credentials,
+    plaintext password is never stored
+
+    Parameters
+    ----------
+    username : str
+        Username
+    password : str
+        Password as a plain text
+
+    Returns
+    -------
+    str
+        Salted hash of the credentials
+    """
+    message = "{}\0{}".format(username, password).encode()
+    return hmac.new(os.getenv('SECRET_KEY', '').encode(), message, hashlib.sha256).hexdigest()
+
+
+def jwt_login(username: str, password: str) -> Optional[Dict]:
+    """Function for authenticating user in the books service,
+    verified identities are cached for REMOTE_LOGIN_TTL seconds
+
+    Parameters
+    ----------
+    username : str
+        Username
+    password : str
+        Password as a plain text
+
+    Returns
+    -------
+    Optional[Dict]
+        User profile from the books service, None if credentials are invalid
+    """
+    key = credentials_key(username, password)
+    jwt_data = remote_identities.get(key)
+    if jwt_data is not None:
+        return jwt_data
 
-        return True
-    else:
-        return False
+    jwt_token = encode_token(username, password)
+    response = books_client.session.post(books_client.url('/api/jwt-auth/'),
+                                         headers={'Content-Type': 'application/json'},
+                                         data=json.dumps({"token": jwt_token}),
+                                         timeout=books_client.timeout)
+    if response.status_code != 200:
+        return None
+
+    jwt_data = decode_token(json.loads(response.text)["jwt"])
+    remote_identities.set(key, jwt_data)
+    return jwt_data
+
+
+def sync_profile(user: UserModel, jwt_data: Dict) -> None:
+    """Function for saving the books service profile of the user with a single update.
+    The password is not stored, remote logins are verified by the books service
+    and cached for REMOTE_LOGIN_TTL seconds only
+
+    Parameters
+    ----------
+    user : UserModel
+        Local user
+    jwt_data : Dict
+        User profile from the books service
+    """
+    data = {field: jwt_data[field] for field in ("first_name", "last_name", "email", "is_admin")
+            if field in jwt_data and getattr(user, field) != jwt_data[field]}
+    if data:
+        user.update_in_db(data)
 
 
 class Login(Resource):
@@ -80,19 +137,24 @@ class Login(Resource):
                 "massage": "Username or password wasn`t provided"
             })
 
-        if not UserModel.exists(username):
-            return jsonify({
-                "status": 404,
-                "massage": "No user founded with username <{}>".format(username)
-            })
+        user = UserModel.find_by_username(username)
 
-        user = UserModel.get_or_create(username)
+        if user is None or not user.check_password(password):
+            jwt_data = jwt_login(username, password)
 
-        if not jwt_login(username, password) and not user.check_password(password):
-            return jsonify({
-                "status": 401,
-                "massage": "Invalid password"
-            })
+            if jwt_data is None:
+                if user is None and not UserModel.exists_remote(username):
+                    return jsonify({
+                        "status": 404,
+                        "massage": "No user founded with username <{}>".format(username)
+                    })
+                return jsonify({
+                    "status": 401,
+                    "massage": "Invalid password"
+                })
+
+            user = user or UserModel.get_or_create(username)
+            sync_profile(user, jwt_data)
 
         login_user(user)
         db.session.commit()
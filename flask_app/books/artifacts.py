@@ -0,0 +1,218 @@
+"""
+Module with background resolution of participant books into event artifacts
+"""
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from flask import Flask, current_app
+
+from flask_app import db
+from flask_app.books.client import books_client
+from flask_app.models.artifact import ArtifactModel, ArtifactJobModel
+from flask_app.models.event import EventArtifactModel, EventModel
+from flask_app.models.user import UserModel
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+RETRY_DELAY = 10
+# Seconds a claimed job is hidden from other workers, jobs of a crashed worker are retried after it
+CLAIM_TIMEOUT = int(os.getenv("ARTIFACT_CLAIM_TIMEOUT", 300))
+
+
+def claim_jobs(batch_size: int) -> List[Tuple[int, str]]:
+    """Function for claiming a batch of due jobs for the current worker,
+    claimed jobs are postponed by CLAIM_TIMEOUT and the claim is committed
+
+    Parameters
+    ----------
+    batch_size : int
+        Maximal amount of jobs in batch
+
+    Returns
+    -------
+    List[Tuple[int, str]]
+        Ids of claimed jobs with usernames of their participants
+    """
+    jobs = ArtifactJobModel.query.\
+        filter(ArtifactJobModel.failed.is_(False),
+               ArtifactJobModel.dt_next_try <= datetime.utcnow()).\
+        order_by(ArtifactJobModel.dt_next_try).\
+        limit(batch_size).\
+        with_for_update(skip_locked=True).\
+        all()
+    if not jobs:
+        db.session.rollback()
+        return []
+
+    usernames = dict(db.session.query(UserModel.id, UserModel.username).
+                     filter(UserModel.id.in_({job.participant_id for job in jobs})))
+    claimed = [(job.id, usernames[job.participant_id]) for job in jobs]
+    for job in jobs:
+        job.dt_next_try = datetime.utcnow() + timedelta(seconds=CLAIM_TIMEOUT)
+    db.session.commit()
+    return claimed
+
+
+def first_book_url(username: str) -> Optional[str]:
+    """Function for getting url of the first author book
+
+    Parameters
+    ----------
+    username : str
+        Author username in the books service
+
+    Returns
+    -------
+    Optional[str]
+        Book url, None if user is not an author
+    """
+    json_data = books_client.get_user(username)
+    if json_data is None or not json_data["books"]:
+        return None
+    return books_client.book_url(json_data["books"][0]["id"])
+
+
+def get_or_create_artifacts(urls: List[str]) -> Dict[str, ArtifactModel]:
+    """Function for getting artifacts by urls, missing ones are created
+
+    Parameters
+    ----------
+    urls : List[str]
+        Artifact urls
+
+    Returns
+    -------
+    Dict[str, ArtifactModel]
+        Artifacts by url
+    """
+    artifacts = {artifact.url: artifact
+                 for artifact in ArtifactModel.query.filter(ArtifactModel.url.in_(urls))}
+    for url in set(urls) - set(artifacts):
+        artifacts[url] = ArtifactModel(url=url)
+        db.session.add(artifacts[url])
+    db.session.flush()
+    return artifacts
+
+
+def process_batch(batch_size: int = 50) -> int:
+    """Function for resolving one batch of pending jobs, the books service
+    is called between two short transactions claiming jobs and saving results
+
+    Parameters
+    ----------
+    batch_size : int
+        Maximal amount of jobs in batch
+
+    Returns
+    -------
+    int
+        Amount of processed jobs
+    """
+    claimed = claim_jobs(batch_size)
+    if not claimed:
+        return 0
+
+    resolved, errors = {}, {}
+    for job_id, username in claimed:
+        try:
+            resolved[job_id] = first_book_url(username)
+        except Exception as error:
+            errors[job_id] = error
+
+    # Jobs of deleted events or participants are gone with them
+    jobs = {job.id: job for job in ArtifactJobModel.query.
+            filter(ArtifactJobModel.id.in_([job_id for job_id, _ in claimed])).
+            with_for_update()}
+
+    for job_id, error in errors.items():
+        job = jobs.get(job_id)
+        if job is not None:
+            job.attempts += 1
+            job.last_error = str(error)[:256]
+            job.failed = job.attempts >= MAX_ATTEMPTS
+            job.dt_next_try = datetime.utcnow() + timedelta(seconds=RETRY_DELAY * 2 ** job.attempts)
+            logger.warning("Artifact job %s failed (attempt %s): %s", job.id, job.attempts, error)
+
+    resolved = {jobs[job_id]: url for job_id, url in resolved.items() if job_id in jobs}
+    artifacts = get_or_create_artifacts([url for url in resolved.values() if url])
+    linked = {(link.event_id, link.artifact_id) for link in EventArtifactModel.query.filter(
+        EventArtifactModel.event_id.in_({job.event_id for job in resolved}),
+        EventArtifactModel.artifact_id.in_({artifact.id for artifact in artifacts.values()}))}
+
+    changed_events = set()
+    for job, url in resolved.items():
+        if url is not None:
+            key = (job.event_id, artifacts[url].id)
+            if key not in linked:
+                db.session.add(EventArtifactModel(event_id=key[0], artifact_id=key[1]))
+                linked.add(key)
+                changed_events.add(job.event_id)
+        db.session.delete(job)
+
+    EventModel.touch(changed_events)
+    db.session.commit()
+    return len(claimed)
+
+
+def work(app: Flask, stop: threading.Event, batch_size: int = 50, poll_interval: float = 1) -> None:
+    """Function for processing jobs until stopped
+
+    Parameters
+    ----------
+    app : Flask
+        Application providing the database configuration
+    stop : threading.Event
+        Event for stopping the worker
+    batch_size : int
+        Maximal amount of jobs in batch
+    poll_interval : float
+        Seconds to wait when there are no pending jobs
+    """
+    with app.app_context():
+        while not stop.is_set():
+            try:
+                processed = process_batch(batch_size)
+            except Exception:
+                db.session.rollback()
+                logger.exception("Artifact worker batch failed")
+                processed = 0
+            finally:
+                db.session.remove()
+
+            if not processed:
+                stop.wait(poll_interval)
+
+
+def run_workers(workers: int = 4, batch_size: int = 50, poll_interval: float = 1) -> None:
+    """Function for running a pool of artifact workers of the current
+    application until interrupted
+
+    Parameters
+    ----------
+    workers : int
+        Amount of worker threads
+    batch_size : int
+        Maximal amount of jobs in batch
+    poll_interval : float
+        Seconds to wait when there are no pending jobs
+    """
+    stop = threading.Event()
+    app = current_app._get_current_object()
+    threads = [threading.Thread(target=work, args=(app, stop, batch_size, poll_interval),
+                                name="artifact-worker-{}".format(number), daemon=True)
+               for number in range(workers)]
+    for thread in threads:
+        thread.start()
+
+    try:
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=1)
+    except KeyboardInterrupt:
+        stop.set()
+        for thread in threads:
+            thread.join()
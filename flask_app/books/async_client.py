@@ -0,0 +1,164 @@
+"""
+Module with the asyncio client of the books service
+"""
+import asyncio
+import json
+import os
+from typing import Dict, Optional
+
+import httpx
+
+from flask_app.books.client import books_client
+from flask_app.cache.backends import TTLCache
+
+
+class AsyncBooksClient:
+    """
+    Client for the books service for the async handlers, one event loop
+    keeps many slow calls in flight. Lookups share the cache with the sync client
+    and concurrent lookups of the same user are coalesced
+    """
+    _MISSING = object()
+
+    def __init__(self, cache: TTLCache, timeout: float = 5, negative_ttl: float = 30,
+                 max_connections: int = 100, base_url: Optional[str] = None):
+        """
+        Initializes client, the connection pool is created in the running event loop
+        """
+        self._base_url = base_url
+        self.cache = cache
+        self.timeout = timeout
+        self.negative_ttl = negative_ttl
+        self.max_connections = max_connections
+        self._client: Optional[httpx.AsyncClient] = None
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    @property
+    def base_url(self) -> str:
+        """
+        Books service url, taken from environment if not provided
+        """
+        return self._base_url or os.getenv("BOOKS_APP_URL")
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """
+        HTTP client with keep-alive connections
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self.timeout,
+                                             limits=httpx.Limits(max_connections=self.max_connections))
+        return self._client
+
+    async def close(self) -> None:
+        """
+        Closes connections of the client
+        """
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def url(self, path: str) -> str:
+        """
+        Builds absolute url for the given service path
+        """
+        return "{}{}".format(self.base_url, path)
+
+    async def get_user(self, username: str) -> Optional[Dict]:
+        """Method for getting user data from the books service
+
+        Parameters
+        ----------
+        username : str
+            Username for search
+
+        Returns
+        -------
+        Optional[Dict]
+            User data with books, None if user does not exist
+        """
+        cached = self.cache.get(username, self._MISSING)
+        if cached is not self._MISSING:
+            return cached
+
+        call = self._in_flight.get(username)
+        if call is not None:
+            try:
+                return await asyncio.shield(call)
+            except asyncio.CancelledError:
+                if not call.cancelled():
+                    raise
+            # Request of the leading lookup was cancelled, the lookup is repeated
+            return await self.get_user(username)
+
+        call = self._in_flight[username] = asyncio.get_running_loop().create_future()
+        try:
+            result = await self._fetch_user(username)
+        except Exception as error:
+            call.set_exception(error)
+            # Waiters get the error, the leader raises it
+            call.exception()
+            raise
+        else:
+            call.set_result(result)
+            return result
+        finally:
+            # Cancelled request of the leader must not leave waiters pending forever
+            if not call.done():
+                call.cancel()
+            del self._in_flight[username]
+
+    async def _fetch_user(self, username: str) -> Optional[Dict]:
+        """
+        Requests user data and stores the result in cache
+        """
+        response = await self.client.get(self.url("/api/user/{}".format(username)))
+        if response.is_success:
+            user_data = response.json()
+            self.cache.set(username, user_data)
+            return user_data
+        if response.status_code == 404:
+            self.cache.set(username, None, ttl=self.negative_ttl)
+        return None
+
+    async def user_exists(self, username: str) -> bool:
+        """Method for check if user with given username
+        exists in the books service
+
+        Parameters
+        ----------
+        username : str
+            Username for search
+
+        Returns
+        -------
+        bool
+            True if exists, False otherwise
+        """
+        return await self.get_user(username) is not None
+
+    async def jwt_auth(self, token: str) -> Optional[str]:
+        """Method for authenticating encoded credentials
+
+        Parameters
+        ----------
+        token : str
+            JWT with username and password
+
+        Returns
+        -------
+        Optional[str]
+            JWT with the user profile, None if credentials are invalid
+        """
+        response = await self.client.post(self.url("/api/jwt-auth/"),
+                                          headers={"Content-Type": "application/json"},
+                                          content=json.dumps({"token": token}))
+        if response.status_code != 200:
+            return None
+        return response.json()["jwt"]
+
+
+async_books_client = AsyncBooksClient(cache=books_client.cache,
+                                      timeout=books_client.timeout,
+                                      negative_ttl=books_client.negative_ttl,
+                                      max_connections=int(os.getenv("BOOKS_ASYNC_MAX_CONNECTIONS", 100)))
@@ -0,0 +1,166 @@
+"""
+Module with the books service client
+"""
+import os
+import threading
+from typing import Dict, Optional
+
+from flask_app.cache.backends import TTLCache
+from flask_app.metrics.instrumentation import books_response_hook
+
+
+class _InFlight:
+    """
+    Remote call shared by concurrent lookups of the same key
+    """
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class BooksClient:
+    """
+    Client for the books service with keep-alive connections,
+    cached user lookups and coalescing of concurrent requests
+    """
+    _MISSING = object()
+
+    def __init__(self, base_url: Optional[str] = None, timeout: float = 5,
+                 cache_size: int = 4096, ttl: float = 300, negative_ttl: float = 30,
+                 pool_size: int = 10):
+        """
+        Initializes client
+        """
+        self._base_url = base_url
+        self.timeout = timeout
+        self.negative_ttl = negative_ttl
+        self.cache = TTLCache(max_size=cache_size, ttl=ttl)
+        self.pool_size = pool_size
+
+        self._session = None
+        self._in_flight: Dict[str, _InFlight] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        """
+        HTTP session with keep-alive connections, requests is imported on first use
+        """
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.hooks["response"].append(books_response_hook)
+            with self._lock:
+                if self._session is None:
+                    self._session = session
+        return self._session
+
+    def close(self) -> None:
+        """
+        Closes connections of the session
+        """
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    @property
+    def base_url(self) -> str:
+        """
+        Books service url, taken from environment if not provided
+        """
+        return self._base_url or os.getenv("BOOKS_APP_URL")
+
+    def url(self, path: str) -> str:
+        """
+        Builds absolute url for the given service path
+        """
+        return "{}{}".format(self.base_url, path)
+
+    def get_user(self, username: str) -> Optional[Dict]:
+        """Method for getting user data from the books service
+
+        Parameters
+        ----------
+        username : str
+            Username for search
+
+        Returns
+        -------
+        Optional[Dict]
+            User data with books, None if user does not exist
+        """
+        cached = self.cache.get(username, self._MISSING)
+        if cached is not self._MISSING:
+            return cached
+
+        with self._lock:
+            call = self._in_flight.get(username)
+            leader = call is None
+            if leader:
+                call = self._in_flight[username] = _InFlight()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = self._fetch_user(username)
+        except Exception as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[username]
+            call.done.set()
+        return call.result
+
+    def _fetch_user(self, username: str) -> Optional[Dict]:
+        """
+        Requests user data and stores the result in cache
+        """
+        response = self.session.get(self.url("/api/user/{}".format(username)),
+                                    timeout=self.timeout)
+        if response.ok:
+            user_data = response.json()
+            self.cache.set(username, user_data)
+            return user_data
+        if response.status_code == 404:
+            self.cache.set(username, None, ttl=self.negative_ttl)
+        return None
+
+    def user_exists(self, username: str) -> bool:
+        """Method for check if user with given username
+        exists in the books service
+
+        Parameters
+        ----------
+        username : str
+            Username for search
+
+        Returns
+        -------
+        bool
+            True if exists, False otherwise
+        """
+        return self.get_user(username) is not None
+
+    def book_url(self, book_id: int) -> str:
+        """
+        Builds public url of the book
+        """
+        return self.url("/books/{}/".format(book_id))
+
+
+books_client = BooksClient(timeout=float(os.getenv("BOOKS_APP_TIMEOUT", 5)),
+                           cache_size=int(os.getenv("BOOKS_CACHE_SIZE", 4096)),
+                           ttl=float(os.getenv("BOOKS_CACHE_TTL", 300)),
+                           negative_ttl=float(os.getenv("BOOKS_CACHE_NEGATIVE_TTL", 30)),
+                           pool_size=int(os.getenv("BOOKS_POOL_SIZE", 10)))
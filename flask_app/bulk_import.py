@@ -0,0 +1,290 @@
+"""
+Module with streaming bulk import of events
+"""
+import codecs
+import json
+import os
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from marshmallow import ValidationError, fields, validate
+from sqlalchemy import exc
+
+from flask_app import db
+from flask_app.models.event import EventModel
+from flask_app.schemas.event import EventSchema
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 1000))
+
+# Bytes read from the request stream at once
+READ_SIZE = 64 * 1024
+
+# Parsed item or the reason why it could not be parsed
+ParsedItem = Tuple[Optional[Dict], Optional[str]]
+
+# Failed items are incomplete if they failed on the last characters of the buffer,
+# the longest truncated token is a literal, such as -Infinity
+TRUNCATED_TOKEN_SIZE = 9
+
+
+class EventImportSchema(EventSchema):
+    """
+    Event Schema of the bulk import, lengths are validated
+    so too long values are reported before the batch insert
+    """
+    title = fields.String(
+        required=True,
+        validate=validate.Length(max=128, error="Sorry, Title field must be at most {max} characters"),
+        error_messages={
+            'required': 'Sorry, Title field is required',
+            'null': 'Sorry, Title field cannot be null',
+            'invalid': 'Sorry, Title field must be a string'})
+
+    summary = fields.String(
+        allow_none=True,
+        validate=validate.Length(max=1028, error="Sorry, Summary field must be at most {max} characters"))
+
+
+event_import_schema = EventImportSchema(only=("title", "summary", "dt_start", "dt_end", "capacity"), many=True)
+
+
+def iter_ndjson(stream: IO[bytes]) -> Iterator[ParsedItem]:
+    """Function for parsing newline delimited JSON line by line,
+    malformed lines are reported without stopping the import
+
+    Parameters
+    ----------
+    stream : IO[bytes]
+        Request body
+
+    Returns
+    -------
+    Iterator[ParsedItem]
+        Parsed lines, blank lines are skipped
+    """
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line), None
+        except ValueError as error:
+            yield None, "Invalid JSON: {}".format(error)
+
+
+def iter_json_array(stream: IO[bytes]) -> Iterator[ParsedItem]:
+    """Function for parsing JSON array item by item
+    without reading the whole body into memory
+
+    Parameters
+    ----------
+    stream : IO[bytes]
+        Request body
+
+    Returns
+    -------
+    Iterator[ParsedItem]
+        Parsed array items
+
+    Raises
+    ------
+    ValueError
+        If the body is not a JSON array, with position of the invalid character
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer, position, offset, state = "", 0, 0, "start"
+
+    for chunk in iter(lambda: stream.read(READ_SIZE), b""):
+        buffer, offset = buffer[position:] + text_decoder.decode(chunk), offset + position
+        position = 0
+
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position == len(buffer):
+                break
+
+            char = buffer[position]
+            if state == "start":
+                if char != "[":
+                    raise ValueError("Expected JSON array")
+                position, state = position + 1, "first"
+            elif state == "first" and char == "]":
+                position, state = position + 1, "end"
+            elif state in ("first", "item"):
+                try:
+                    item, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError as error:
+                    if len(buffer) - error.pos <= TRUNCATED_TOKEN_SIZE or error.msg.startswith("Unterminated"):
+                        # The item continues in the next chunk
+                        break
+                    raise ValueError("Invalid JSON array item at character {}: {}".format(
+                        offset + error.pos, error.msg)) from error
+                if end == len(buffer) and not isinstance(item, (dict, list, str)):
+                    # Number or literal may continue in the next chunk
+                    break
+                position, state = end, "separator"
+                yield item, None
+            elif state == "separator" and char in ",]":
+                position, state = position + 1, "item" if char == "," else "end"
+            else:
+                raise ValueError("Invalid JSON array at character {}: {}".format(offset + position, char))
+
+    if state in ("first", "item") and buffer[position:].strip():
+        try:
+            decoder.raw_decode(buffer, len(buffer) - len(buffer[position:].lstrip()))
+        except json.JSONDecodeError as error:
+            raise ValueError("Invalid JSON array item at character {}: {}".format(
+                offset + error.pos, error.msg)) from error
+    if state != "end":
+        raise ValueError("Unexpected end of JSON array")
+
+
+def _batches(items: Iterable[ParsedItem], batch_size: int) -> Iterator[List[ParsedItem]]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _validate(batch: List[Dict]) -> Tuple[List[Optional[EventModel]], Dict[int, Dict]]:
+    """
+    Returns loaded events of the batch, None for invalid ones, and errors by position
+    """
+    try:
+        return event_import_schema.load(batch), {}
+    except ValidationError as error:
+        errors = error.messages
+    events = iter(event_import_schema.load([data for i, data in enumerate(batch) if i not in errors]))
+    return [None if i in errors else next(events) for i in range(len(batch))], errors
+
+
+def _row(event: EventModel, owner_id: int) -> Dict:
+    return {"title": event.title, "summary": event.summary, "dt_start": event.dt_start,
+            "dt_end": event.dt_end, "capacity": event.capacity, "owner_id": owner_id}
+
+
+def _insert(rows: List[Dict]) -> Dict[str, int]:
+    """
+    Inserts rows with one executemany and returns ids of the inserted titles
+    """
+    db.session.execute(EventModel.__table__.insert(), rows)
+    titles = [row["title"] for row in rows]
+    ids = dict(db.session.query(EventModel.title, EventModel.id).filter(EventModel.title.in_(titles)))
+    db.session.commit()
+    return ids
+
+
+def import_batch(batch: List[ParsedItem], owner_id: int, seen_titles: set) -> List[Dict]:
+    """Function for validating and inserting batch of events
+    with a single conflict query and a single insert
+
+    Parameters
+    ----------
+    batch : List[ParsedItem]
+        Parsed items
+    owner_id : int
+        Owner of the created events
+    seen_titles : set
+        Titles of the already imported items, updated in place
+
+    Returns
+    -------
+    List[Dict]
+        Result of every batch item in order
+    """
+    results: List[Optional[Dict]] = [None] * len(batch)
+    documents = []
+    for i, (data, error) in enumerate(batch):
+        if error is None and not isinstance(data, dict):
+            error = "Event must be a JSON object"
+        if error is None:
+            documents.append((i, data))
+        else:
+            results[i] = {"status": "invalid", "errors": error}
+
+    events, errors = _validate([data for _, data in documents])
+    candidates = []
+    for (i, _), event, error in zip(documents, events, [errors.get(j) for j in range(len(documents))]):
+        if event is None:
+            results[i] = {"status": "invalid", "errors": error}
+        elif event.dt_start > event.dt_end:
+            results[i] = {"status": "invalid", "errors": "Start datetime must be before end datetime"}
+        elif event.status == "past":
+            results[i] = {"status": "invalid", "errors": "You can not create past event"}
+        elif event.title in seen_titles:
+            results[i] = {"status": "conflict", "title": event.title}
+        else:
+            seen_titles.add(event.title)
+            candidates.append((i, event))
+
+    for _ in range(2):
+        titles = [event.title for _, event in candidates]
+        existing = {title for title, in db.session.query(EventModel.title).filter(EventModel.title.in_(titles))}
+        for i, event in candidates:
+            if event.title in existing:
+                results[i] = {"status": "conflict", "title": event.title}
+        candidates = [(i, event) for i, event in candidates if event.title not in existing]
+
+        rows = [_row(event, owner_id) for _, event in candidates]
+        try:
+            ids = _insert(rows) if rows else {}
+        except exc.IntegrityError:
+            # Concurrent request took some of the titles or a row violates
+            # other constraints, check conflicts again
+            db.session.rollback()
+            continue
+        for i, event in candidates:
+            results[i] = {"status": "created", "id": ids[event.title]}
+        return results
+
+    # Rows are inserted one by one, so a constraint violation is reported for the invalid row only
+    for i, event in candidates:
+        try:
+            results[i] = {"status": "created", "id": _insert([_row(event, owner_id)])[event.title]}
+        except exc.IntegrityError:
+            db.session.rollback()
+            if EventModel.find_by_title(event.title) is not None:
+                results[i] = {"status": "conflict", "title": event.title}
+            else:
+                results[i] = {"status": "error", "errors": "Could not insert event"}
+    return results
+
+
+def import_events(items: Iterable[ParsedItem], owner_id: int, batch_size: int = IMPORT_BATCH_SIZE) -> Dict:
+    """Function for importing events batch by batch, every batch is committed separately
+
+    Parameters
+    ----------
+    items : Iterable[ParsedItem]
+        Parsed request items
+    owner_id : int
+        Owner of the created events
+    batch_size : int
+        Maximal amount of events per validation, conflict query and insert
+
+    Returns
+    -------
+    Dict
+        Amount of created events, conflicts and invalid items,
+        result of every item and parsing error if the import was interrupted
+    """
+    report = {"created": 0, "conflict": 0, "invalid": 0, "error": 0, "rows": []}
+    seen_titles = set()
+
+    def parsed_items() -> Iterator[ParsedItem]:
+        # Items parsed before a parsing error are imported and reported as usual
+        try:
+            yield from items
+        except ValueError as error:
+            report["message"] = str(error)
+
+    for batch in _batches(parsed_items(), batch_size):
+        for result in import_batch(batch, owner_id, seen_titles):
+            result["row"] = len(report["rows"])
+            report[result["status"]] += 1
+            report["rows"].append(result)
+    return report
@@ -0,0 +1,166 @@
+"""
+Module with cache backends
+"""
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+try:
+    import redis
+except ImportError:  # pragma: no cover
+    redis = None
+
+
+class TTLCache:
+    """
+    Thread safe LRU cache with expiring entries
+    """
+    def __init__(self, max_size: int = 1024, ttl: float = 60):
+        """
+        Initializes cache
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default=None):
+        """Method for getting not expired value by key
+
+        Parameters
+        ----------
+        key : str
+            Cache key
+        default
+            Value returned on cache miss
+
+        Returns
+        -------
+        Cached value or default
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value, ttl: Optional[float] = None) -> None:
+        """Method for storing value, evicting the least recently used entries
+
+        Parameters
+        ----------
+        key : str
+            Cache key
+        value
+            Value for storing
+        ttl : Optional[float]
+            Time to live in seconds, cache default if not provided
+        """
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        """
+        Removes value from cache if exists
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Removes all values from cache
+        """
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache:
+    """
+    Cache shared between processes, values are stored as JSON
+    """
+    def __init__(self, url: str, ttl: float = 60, prefix: str = "flask_events:"):
+        """
+        Initializes cache
+        """
+        if redis is None:
+            raise RuntimeError("redis package is required for RedisCache")
+        self.ttl = ttl
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str, default=None):
+        """Method for getting not expired value by key
+
+        Parameters
+        ----------
+        key : str
+            Cache key
+        default
+            Value returned on cache miss
+
+        Returns
+        -------
+        Cached value or default
+        """
+        value = self._client.get(self.prefix + key)
+        return default if value is None else json.loads(value)
+
+    def set(self, key: str, value, ttl: Optional[float] = None) -> None:
+        """Method for storing value, eviction is done by the redis policy
+
+        Parameters
+        ----------
+        key : str
+            Cache key
+        value
+            JSON serializable value for storing
+        ttl : Optional[float]
+            Time to live in seconds, cache default if not provided
+        """
+        ttl = self.ttl if ttl is None else ttl
+        self._client.set(self.prefix + key, json.dumps(value), px=max(int(ttl * 1000), 1))
+
+    def pop(self, key: str) -> None:
+        """
+        Removes value from cache if exists
+        """
+        self._client.delete(self.prefix + key)
+
+    def clear(self) -> None:
+        """
+        Removes all values with the cache prefix
+        """
+        for key in self._client.scan_iter(match=self.prefix + "*"):
+            self._client.delete(key)
+
+
+def create_cache(url: Optional[str] = None, max_size: int = 1024, ttl: float = 60):
+    """Function for creating cache backend by url
+
+    Parameters
+    ----------
+    url : Optional[str]
+        Redis url for the shared cache, None for the in-process cache
+    max_size : int
+        Maximal amount of entries in the in-process cache
+    ttl : float
+        Default time to live in seconds
+
+    Returns
+    -------
+    TTLCache or RedisCache
+    """
+    if url:
+        return RedisCache(url, ttl=ttl)
+    return TTLCache(max_size=max_size, ttl=ttl)
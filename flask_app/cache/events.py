@@ -0,0 +1,59 @@
+"""
+Module with cache of serialized event documents. Documents are keyed by
+the event version, every change of the event bumps it, so workers
+with own caches never serve outdated documents and need no invalidation
+"""
+import os
+from datetime import datetime
+from typing import Dict, Optional
+
+from flask_app.cache.backends import create_cache
+
+event_cache = create_cache(os.getenv("EVENT_CACHE_URL"),
+                           max_size=int(os.getenv("EVENT_CACHE_SIZE", 1024)),
+                           ttl=float(os.getenv("EVENT_CACHE_TTL", 60)))
+
+
+def event_key(event_id: int, version: int) -> str:
+    """
+    Builds cache key of the event document version
+    """
+    return "event:{}:{}".format(int(event_id), int(version))
+
+
+def get_event_document(event_id: int, version: int) -> Optional[Dict]:
+    """Function for getting cached event document,
+    documents of other versions are never returned
+
+    Parameters
+    ----------
+    event_id : int
+        Event id
+    version : int
+        Current version of the event row
+
+    Returns
+    -------
+    Optional[Dict]
+        Serialized event, None if not cached
+    """
+    return event_cache.get(event_key(event_id, version))
+
+
+def cache_event_document(event, document: Dict) -> None:
+    """Function for caching event document of the event version
+    until the next status change of the event
+
+    Parameters
+    ----------
+    event : EventModel
+        Event of the document
+    document : Dict
+        Serialized event
+    """
+    ttl = event_cache.ttl
+    now = datetime.now()
+    for moment in (event.dt_start, event.dt_end):
+        if moment is not None and moment > now:
+            ttl = min(ttl, (moment - now).total_seconds())
+    event_cache.set(event_key(event.id, event.version), document, ttl=ttl)
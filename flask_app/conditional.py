@@ -0,0 +1,106 @@
+"""
+Module with conditional GET support by row versions
+"""
+from datetime import datetime
+from functools import wraps
+from typing import Callable, Dict, Optional
+
+from flask import Response, g, make_response, request
+from werkzeug.http import http_date, parse_date, quote_etag
+
+
+def validators(kind: str, iid: int, version: int, updated_at: datetime,
+               state: Optional[str] = None, changed_at: Optional[datetime] = None) -> Dict[str, str]:
+    """Function for building ETag and Last-Modified headers of the row version
+
+    Parameters
+    ----------
+    kind : str
+        Resource kind, part of the tag
+    iid : int
+        Row id
+    version : int
+        Row version
+    updated_at : datetime
+        Row modification time in UTC
+    state : Optional[str]
+        Part of the representation changing without row updates, e.g. event status
+    changed_at : Optional[datetime]
+        Time of the last state change in UTC
+
+    Returns
+    -------
+    Dict[str, str]
+        Response headers
+    """
+    tag = "{}-{}-{}".format(kind, iid, version)
+    if state is not None:
+        tag = "{}-{}".format(tag, state)
+    if changed_at is not None:
+        updated_at = max(updated_at, changed_at)
+    return {"ETag": quote_etag(tag), "Last-Modified": http_date(updated_at)}
+
+
+def is_not_modified(headers: Dict[str, str]) -> bool:
+    """Function for checking conditional headers of the current request,
+    If-Modified-Since is ignored when If-None-Match is present
+
+    Parameters
+    ----------
+    headers : Dict[str, str]
+        Validators of the current version
+
+    Returns
+    -------
+    bool
+        True if the client has the current version
+    """
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(headers["ETag"].strip('"'))
+    if request.if_modified_since is not None:
+        return request.if_modified_since >= parse_date(headers["Last-Modified"])
+    return False
+
+
+def not_modified(headers: Dict[str, str]) -> Response:
+    """
+    Returns empty 304 response with the validators
+    """
+    return Response(status=304, headers=headers)
+
+
+def conditional(kind: str, lookup: Callable[..., Optional[tuple]]) -> Callable:
+    """Decorator for GET handlers answering with 304 after the version lookup
+    and adding validators to successful responses
+
+    Parameters
+    ----------
+    kind : str
+        Resource kind, part of the tag
+    lookup : Callable[..., Optional[tuple]]
+        Function taking the view arguments and returning arguments
+        of validators after kind, None if not exists. The row is kept
+        in g.validated_row for the handler
+
+    Returns
+    -------
+    Callable
+        Decorator
+    """
+    def decorator(foo: Callable) -> Callable:
+        @wraps(foo)
+        def wrapper(*args, **kwargs):
+            row = g.validated_row = lookup(**kwargs) if request.method == "GET" else None
+            if row is None:
+                return foo(*args, **kwargs)
+
+            headers = validators(kind, *row)
+            if is_not_modified(headers):
+                return not_modified(headers)
+
+            response = make_response(foo(*args, **kwargs))
+            if response.status_code == 200:
+                response.headers.update(headers)
+            return response
+        return wrapper
+    return decorator
@@ -2,20 +2,74 @@
 Module Configuration
 """
 from os import getenv
+from typing import Dict
+
+from flask_app.metrics.pool import InstrumentedQueuePool
 
 POSTGRES_DB = getenv("POSTGRES_DB")
 APP_NAME = getenv("APP_NAME")
 POSTGRES_USER = getenv("POSTGRES_USER")
 POSTGRES_PASSWORD = getenv("POSTGRES_PASSWORD")
+DB_REPLICA_URIS = [uri.strip() for uri in getenv("DB_REPLICA_URIS", "").split(",") if uri.strip()]
+
+
+def getenv_bool(name: str, default: bool) -> bool:
+    """
+    Reads boolean flag from environment
+    """
+    value = getenv(name)
+    if value is None:
+        return default
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+def engine_options(database_uri: str) -> Dict:
+    """Function for building SQLAlchemy engine options from environment.
+    Every worker process has its own pool, so the database has to accept
+    workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections
+
+    Parameters
+    ----------
+    database_uri : str
+        Database connection url
+
+    Returns
+    -------
+    Dict
+        Options for SQLALCHEMY_ENGINE_OPTIONS
+    """
+    if not database_uri.startswith("postgresql"):
+        return {}
+
+    return {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": int(getenv("DB_POOL_SIZE", 5)),
+        "max_overflow": int(getenv("DB_MAX_OVERFLOW", 5)),
+        "pool_timeout": float(getenv("DB_POOL_TIMEOUT", 10)),
+        "pool_recycle": int(getenv("DB_POOL_RECYCLE", 1800)),
+        "pool_pre_ping": getenv_bool("DB_POOL_PRE_PING", True),
+        "connect_args": {
+            "connect_timeout": int(getenv("DB_CONNECT_TIMEOUT", 5)),
+            "options": "-c statement_timeout={} -c idle_in_transaction_session_timeout={}".format(
+                int(getenv("DB_STATEMENT_TIMEOUT_MS", 30000)),
+                int(getenv("DB_IDLE_IN_TRANSACTION_TIMEOUT_MS", 60000))),
+        },
+    }
 
 
 class Config:
     """
     Class default Configuration that all environments will default to
     """
+    SECRET_KEY = getenv("SECRET_KEY")
     SQLALCHEMY_DATABASE_URI = (
         f"postgresql://"
         f"{POSTGRES_USER}:{POSTGRES_PASSWORD}"
         f"@db_{APP_NAME}:5432/{POSTGRES_DB}"
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = getenv("SQLALCHEMY_TRACK_MODIFICATIONS")
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+
+    # Read-only requests are sent to replicas, see flask_app.routing
+    SQLALCHEMY_BINDS = {"replica_{}".format(number): uri for number, uri in enumerate(DB_REPLICA_URIS)}
+    DB_REPLICA_STICKY_SECONDS = float(getenv("DB_REPLICA_STICKY_SECONDS", 5))
@@ -0,0 +1,123 @@
+"""
+Module with streaming export of events, memberships and artifacts
+"""
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from flask_sqlalchemy import BaseQuery
+
+from flask_app import db
+from flask_app.models.artifact import ArtifactModel
+from flask_app.models.event import EventArtifactModel, EventGuestModel, EventModel, EventParticipantModel
+from flask_app.models.user import UserModel
+
+EXPORT_KINDS = ("events", "participants", "guests", "artifacts")
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Rows fetched from the server-side cursor at once
+YIELD_PER = 1000
+
+# Rows serialized into one chunk of the response
+CHUNK_SIZE = 500
+
+
+def _membership_query(model, user_column, events: BaseQuery) -> BaseQuery:
+    return db.session.query(model.event_id, UserModel.id.label("user_id"), UserModel.username).\
+        join(UserModel, UserModel.id == user_column).\
+        filter(model.event_id.in_(events.with_entities(EventModel.id).order_by(None))).\
+        order_by(model.event_id, UserModel.id)
+
+
+def export_query(kind: str, query_params: Optional[Dict] = None) -> Tuple[List[str], BaseQuery]:
+    """Function for building query of the exported rows,
+    events are selected by the same filters as EventModel.get_list
+
+    Parameters
+    ----------
+    kind : str
+        One of EXPORT_KINDS
+    query_params : Optional[Dict]
+        Event filters
+
+    Returns
+    -------
+    Tuple[List[str], BaseQuery]
+        Column names and query streaming rows through a server-side cursor
+    """
+    if kind not in EXPORT_KINDS:
+        raise ValueError("Unknown export kind: {}".format(kind))
+
+    events = EventModel.get_list(query_params=dict(query_params or {}))
+
+    if kind == "events":
+        query = events.with_entities(EventModel.id, EventModel.title, EventModel.summary,
+                                     EventModel.dt_start, EventModel.dt_end, EventModel.owner_id)
+    elif kind == "participants":
+        query = _membership_query(EventParticipantModel, EventParticipantModel.participant_id, events)
+    elif kind == "guests":
+        query = _membership_query(EventGuestModel, EventGuestModel.guest_id, events)
+    else:
+        query = db.session.query(EventArtifactModel.event_id, ArtifactModel.id.label("artifact_id"),
+                                 ArtifactModel.url).\
+            join(ArtifactModel, ArtifactModel.id == EventArtifactModel.artifact_id).\
+            filter(EventArtifactModel.event_id.in_(events.with_entities(EventModel.id).order_by(None))).\
+            order_by(EventArtifactModel.event_id, ArtifactModel.id)
+
+    columns = [column["name"] for column in query.column_descriptions]
+    return columns, query.yield_per(YIELD_PER)
+
+
+def _value(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _chunks(rows: Iterable[Tuple]) -> Iterator[List[Tuple]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == CHUNK_SIZE:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def stream_rows(columns: List[str], rows: Iterable[Tuple], export_format: str = "ndjson") -> Iterator[str]:
+    """Function for serializing rows chunk by chunk, so memory usage
+    does not depend on the amount of rows
+
+    Parameters
+    ----------
+    columns : List[str]
+        Column names
+    rows : Iterable[Tuple]
+        Rows in the column order
+    export_format : str
+        "ndjson" or "csv"
+
+    Returns
+    -------
+    Iterator[str]
+        Serialized chunks, csv starts with the header
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError("Unknown export format: {}".format(export_format))
+
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        yield buffer.getvalue()
+        for chunk in _chunks(rows):
+            buffer.seek(0)
+            buffer.truncate()
+            writer.writerows([_value(value) for value in row] for row in chunk)
+            yield buffer.getvalue()
+        return
+
+    for chunk in _chunks(rows):
+        yield "".join(json.dumps({column: _value(value) for column, value in zip(columns, row)}) + "\n"
+                      for row in chunk)
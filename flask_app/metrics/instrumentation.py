@@ -0,0 +1,185 @@
+"""
+Module with per-request instrumentation of SQL, books service and serialization time
+"""
+import json
+import logging
+import os
+import re
+import time
+from contextlib import contextmanager
+
+from flask import Flask, Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from flask_app.metrics import multiprocess
+from flask_app.metrics.prometheus import COUNT_BUCKETS, registry
+
+logger = logging.getLogger(__name__)
+
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_MS", 500)) / 1000
+
+request_duration = registry.histogram("flask_events_request_duration_seconds",
+                                      "Request latency")
+request_queries = registry.histogram("flask_events_request_queries",
+                                     "SQL statements per request", COUNT_BUCKETS)
+request_sql_time = registry.histogram("flask_events_request_sql_seconds",
+                                      "Time spent in SQL per request")
+request_books_time = registry.histogram("flask_events_request_books_seconds",
+                                        "Time spent in books service calls per request")
+request_serialization_time = registry.histogram("flask_events_request_serialization_seconds",
+                                                "Time spent in serialization per request")
+requests_total = registry.counter("flask_events_requests_total",
+                                  "Finished requests")
+
+_PLACEHOLDERS = re.compile(r"%\(\w+\)s|\?|:\w+|\b\d+\b|'(?:[^']|'')*'")
+_LISTS = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+_SPACES = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """Function for normalizing SQL statement, so statements
+    which differ only in parameters share the fingerprint
+
+    Parameters
+    ----------
+    statement : str
+        SQL statement
+
+    Returns
+    -------
+    str
+        Normalized statement, at most 200 characters
+    """
+    statement = _PLACEHOLDERS.sub("?", statement)
+    statement = _LISTS.sub("(?...)", statement)
+    return _SPACES.sub(" ", statement).strip()[:200]
+
+
+def _stats():
+    """
+    Returns stats of the current request, None outside of request
+    """
+    if not has_request_context():
+        return None
+    stats = getattr(g, "_instrumentation", None)
+    if stats is None:
+        stats = g._instrumentation = {"started": time.perf_counter(), "queries": 0, "sql": 0.0,
+                                      "slowest": (0.0, None), "books": 0.0, "serialization": 0.0}
+    return stats
+
+
+def record_time(kind: str, seconds: float) -> None:
+    """Function for adding time to the current request stats
+
+    Parameters
+    ----------
+    kind : str
+        "books" or "serialization"
+    seconds : float
+        Spent time
+    """
+    stats = _stats()
+    if stats is not None:
+        stats[kind] += seconds
+
+
+@contextmanager
+def timed(kind: str):
+    """
+    Context manager for measuring block time into the current request stats
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_time(kind, time.perf_counter() - started)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    stats = _stats()
+    if stats is None:
+        return
+    stats["queries"] += 1
+    stats["sql"] += elapsed
+    if elapsed > stats["slowest"][0]:
+        stats["slowest"] = (elapsed, statement)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    if exception_context.connection is not None and exception_context.connection.info.get("query_started"):
+        exception_context.connection.info["query_started"].pop()
+
+
+def books_response_hook(response, *args, **kwargs):
+    """
+    Requests hook adding books service response time to the request stats
+    """
+    record_time("books", response.elapsed.total_seconds())
+    return response
+
+
+def _before_request() -> None:
+    _stats()
+
+
+def _after_request(response: Response) -> Response:
+    stats = _stats()
+    duration = time.perf_counter() - stats["started"]
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    labels = {"endpoint": endpoint, "method": request.method}
+
+    request_duration.observe(duration, **labels)
+    request_queries.observe(stats["queries"], **labels)
+    request_sql_time.observe(stats["sql"], **labels)
+    request_books_time.observe(stats["books"], **labels)
+    request_serialization_time.observe(stats["serialization"], **labels)
+    requests_total.inc(status=str(response.status_code), **labels)
+    multiprocess.flush(force=False)
+
+    if duration >= SLOW_REQUEST_SECONDS:
+        slowest_time, slowest_statement = stats["slowest"]
+        logger.warning(json.dumps({
+            "event": "slow_request",
+            "method": request.method,
+            "endpoint": endpoint,
+            "path": request.path,
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 2),
+            "queries": stats["queries"],
+            "sql_ms": round(stats["sql"] * 1000, 2),
+            "slowest_sql_ms": round(slowest_time * 1000, 2),
+            "slowest_sql": fingerprint(slowest_statement) if slowest_statement else None,
+            "books_ms": round(stats["books"] * 1000, 2),
+            "serialization_ms": round(stats["serialization"] * 1000, 2),
+        }))
+    return response
+
+
+def metrics() -> Response:
+    """
+    Returns metrics of all worker processes in the Prometheus text format
+    """
+    return Response(multiprocess.render(), mimetype="text/plain; version=0.0.4")
+
+
+def init_metrics(app: Flask) -> None:
+    """Function for enabling instrumentation of the application requests
+    and registering the /metrics endpoint
+
+    Parameters
+    ----------
+    app : Flask
+        Application
+    """
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.add_url_rule("/metrics", "metrics", metrics)
@@ -0,0 +1,100 @@
+"""
+Module with metrics shared by the server worker processes. Every worker
+writes snapshots of its registry into METRICS_MULTIPROC_DIR and a scrape
+served by any worker renders the sum of all snapshots, so counters of the
+whole server never go backwards. Snapshots of exited workers are kept
+without their gauges. Without METRICS_MULTIPROC_DIR only the current
+process is rendered
+"""
+import json
+import os
+import threading
+import time
+from typing import Dict
+
+from flask_app.metrics.prometheus import Gauge, registry
+
+METRICS_DIR = os.getenv("METRICS_MULTIPROC_DIR")
+FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", 5))
+
+_lock = threading.Lock()
+_process = {"pid": None, "name": None, "flushed": 0.0}
+
+
+def _process_name() -> str:
+    """
+    Returns unique name of the current process, a reused pid gets a new name
+    """
+    if _process["pid"] != os.getpid():
+        _process.update(pid=os.getpid(), name="{}-{}".format(os.getpid(), int(time.time() * 1000)), flushed=0.0)
+    return _process["name"]
+
+
+def _write(path: str, snapshot: Dict) -> None:
+    temporary = "{}.{}.tmp".format(path, threading.get_ident())
+    with open(temporary, "w") as output:
+        json.dump(snapshot, output)
+    os.replace(temporary, path)
+
+
+def flush(force: bool = True) -> None:
+    """Function for writing the snapshot of the current process
+
+    Parameters
+    ----------
+    force : bool
+        Whether to write even if the last snapshot is younger than METRICS_FLUSH_SECONDS
+    """
+    if not METRICS_DIR:
+        return
+    with _lock:
+        name = _process_name()
+        if not force and time.monotonic() - _process["flushed"] < FLUSH_SECONDS:
+            return
+        _process["flushed"] = time.monotonic()
+        _write(os.path.join(METRICS_DIR, "{}.json".format(name)), registry.snapshot())
+
+
+def render() -> str:
+    """Function for rendering metrics of all worker processes,
+    the snapshot of the current process is written first
+
+    Returns
+    -------
+    str
+        Metrics in the Prometheus text format
+    """
+    if not METRICS_DIR:
+        return registry.render()
+
+    flush()
+    snapshots = {}
+    for file_name in os.listdir(METRICS_DIR):
+        if file_name.endswith(".json"):
+            try:
+                with open(os.path.join(METRICS_DIR, file_name)) as snapshot:
+                    snapshots[file_name[:-len(".json")]] = json.load(snapshot)
+            except (OSError, ValueError):
+                # Snapshot was removed meanwhile
+                continue
+    return registry.render(snapshots)
+
+
+def mark_process_dead(pid: int) -> None:
+    """Function for removing gauges of the exited worker,
+    its counters and histograms stay in the totals
+
+    Parameters
+    ----------
+    pid : int
+        Process id of the exited worker
+    """
+    if not METRICS_DIR:
+        return
+    gauges = {metric.name for metric in registry.metrics if isinstance(metric, Gauge)}
+    for file_name in os.listdir(METRICS_DIR):
+        if file_name.startswith("{}-".format(pid)) and file_name.endswith(".json"):
+            path = os.path.join(METRICS_DIR, file_name)
+            with open(path) as snapshot:
+                data = json.load(snapshot)
+            _write(path, {name: value for name, value in data.items() if name not in gauges})
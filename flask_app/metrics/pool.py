@@ -0,0 +1,46 @@
+"""
+Module with connection pool instrumented for metrics
+"""
+import time
+import weakref
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+from flask_app.metrics.prometheus import registry
+
+_pools = weakref.WeakSet()
+
+pool_wait_time = registry.histogram("flask_events_db_pool_wait_seconds",
+                                    "Time waiting for a connection from the pool")
+pool_checkouts = registry.counter("flask_events_db_pool_checkouts_total",
+                                  "Connections taken from the pool")
+pool_timeouts = registry.counter("flask_events_db_pool_timeouts_total",
+                                 "Connections not received within pool_timeout")
+registry.gauge("flask_events_db_pool_checked_out",
+               "Connections currently in use",
+               lambda: sum(pool.checkedout() for pool in list(_pools)))
+registry.gauge("flask_events_db_pool_overflow",
+               "Connections opened over pool_size",
+               lambda: sum(max(pool.overflow(), 0) for pool in list(_pools)))
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool measuring checkout wait time
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        _pools.add(self)
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            pool_timeouts.inc()
+            raise
+        finally:
+            pool_wait_time.observe(time.perf_counter() - started)
+        pool_checkouts.inc()
+        return connection
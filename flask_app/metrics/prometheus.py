@@ -0,0 +1,210 @@
+"""
+Module with minimal Prometheus metrics registry. Values of several
+processes are combined from their snapshots, see flask_app.metrics.multiprocess
+"""
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Labels = Tuple[Tuple[str, str], ...]
+
+# Snapshots of a metric by process name
+Snapshots = Dict[str, list]
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+def _format_labels(labels: Labels, extra: str = "") -> str:
+    parts = ['{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+             for name, value in labels]
+    if extra:
+        parts.append(extra)
+    return "{{{}}}".format(",".join(parts)) if parts else ""
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == float("inf") else repr(float(bound))
+
+
+class Counter:
+    """
+    Monotonic counter with labels
+    """
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [[labels, value] for labels, value in self._values.items()]
+
+    def render(self, snapshots: Optional[Snapshots] = None) -> List[str]:
+        """
+        Renders values of the process, or sums of the process snapshots if given
+        """
+        if snapshots is None:
+            snapshots = {"": self.snapshot()}
+        values: Dict[Labels, float] = {}
+        for snapshot in snapshots.values():
+            for labels, value in snapshot:
+                key = tuple(map(tuple, labels))
+                values[key] = values.get(key, 0) + value
+
+        lines = ["# HELP {} {}".format(self.name, self.documentation),
+                 "# TYPE {} counter".format(self.name)]
+        for labels, value in sorted(values.items()):
+            lines.append("{}{} {}".format(self.name, _format_labels(labels), repr(float(value))))
+        return lines
+
+
+class Gauge:
+    """
+    Gauge computed by a callback at render time
+    """
+    def __init__(self, name: str, documentation: str, function):
+        self.name = name
+        self.documentation = documentation
+        self.function = function
+
+    def reset(self) -> None:
+        pass
+
+    def snapshot(self) -> list:
+        return [float(self.function())]
+
+    def render(self, snapshots: Optional[Snapshots] = None) -> List[str]:
+        """
+        Renders value of the process, or value of every process labeled by worker if snapshots are given
+        """
+        lines = ["# HELP {} {}".format(self.name, self.documentation),
+                 "# TYPE {} gauge".format(self.name)]
+        if snapshots is None:
+            lines.append("{} {}".format(self.name, repr(float(self.function()))))
+        for process, (value, ) in sorted((snapshots or {}).items()):
+            lines.append("{}{} {}".format(self.name, _format_labels((("worker", process), )), repr(value)))
+        return lines
+
+
+class Histogram:
+    """
+    Histogram with cumulative buckets and labels
+    """
+    def __init__(self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._values: Dict[Labels, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * len(self.buckets), [0.0]))
+            counts[bisect_left(self.buckets, value)] += 1
+            total[0] += value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def snapshot(self) -> list:
+        with self._lock:
+            return [[labels, list(counts), total[0]] for labels, (counts, total) in self._values.items()]
+
+    def render(self, snapshots: Optional[Snapshots] = None) -> List[str]:
+        """
+        Renders values of the process, or sums of the process snapshots if given
+        """
+        if snapshots is None:
+            snapshots = {"": self.snapshot()}
+        values: Dict[Labels, Tuple[List[int], float]] = {}
+        for snapshot in snapshots.values():
+            for labels, counts, total in snapshot:
+                key = tuple(map(tuple, labels))
+                merged_counts, merged_total = values.get(key, ([0] * len(self.buckets), 0.0))
+                values[key] = [a + b for a, b in zip(merged_counts, counts)], merged_total + total
+
+        lines = ["# HELP {} {}".format(self.name, self.documentation),
+                 "# TYPE {} histogram".format(self.name)]
+        for labels, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append("{}_bucket{} {}".format(
+                    self.name, _format_labels(labels, 'le="{}"'.format(_format_bound(bound))), cumulative))
+            lines.append("{}_sum{} {}".format(self.name, _format_labels(labels), repr(total)))
+            lines.append("{}_count{} {}".format(self.name, _format_labels(labels), cumulative))
+        return lines
+
+
+class Registry:
+    """
+    Collection of metrics rendered in the Prometheus text format
+    """
+    def __init__(self):
+        self.metrics = []
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        metric = Counter(name, documentation)
+        self.metrics.append(metric)
+        return metric
+
+    def gauge(self, name: str, documentation: str, function) -> Gauge:
+        metric = Gauge(name, documentation, function)
+        self.metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, buckets)
+        self.metrics.append(metric)
+        return metric
+
+    def reset(self) -> None:
+        """
+        Clears values inherited from the parent process after fork
+        """
+        for metric in self.metrics:
+            metric.reset()
+
+    def snapshot(self) -> Dict[str, list]:
+        """
+        Returns JSON serializable values of all metrics by name
+        """
+        return {metric.name: metric.snapshot() for metric in self.metrics}
+
+    def render(self, snapshots: Optional[Dict[str, Dict[str, list]]] = None) -> str:
+        """Method for rendering metrics in the Prometheus text format
+
+        Parameters
+        ----------
+        snapshots : Optional[Dict[str, Dict[str, list]]]
+            Registry snapshots by process name, values of the current process if not given
+
+        Returns
+        -------
+        str
+            Metrics, counters and histograms are summed over the processes
+        """
+        lines = []
+        for metric in self.metrics:
+            if snapshots is None:
+                lines.extend(metric.render())
+            else:
+                lines.extend(metric.render({process: snapshot[metric.name]
+                                            for process, snapshot in snapshots.items() if metric.name in snapshot}))
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
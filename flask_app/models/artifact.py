@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import Optional
 
 from flask_app import db
@@ -35,3 +36,33 @@ class ArtifactModel(db.Model, EntityModel):
             Search result, None if not exists
         """
         return cls.query.filter_by(url=url).first()
+
+
+class ArtifactJobModel(db.Model, EntityModel):
+    """
+    Pending resolution of the participant books into event artifacts
+    """
+    __tablename__ = 'artifact_job'
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer,
+                         db.ForeignKey("event.id", ondelete="CASCADE"),
+                         nullable=False)
+    participant_id = db.Column(db.Integer,
+                               db.ForeignKey("user.id", ondelete="CASCADE"),
+                               nullable=False)
+
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    failed = db.Column(db.Boolean, nullable=False, default=False)
+    last_error = db.Column(db.String(256), nullable=True)
+    dt_next_try = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    event = db.relationship("EventModel")
+    participant = db.relationship("UserModel")
+
+    def __repr__(self) -> str:
+        """
+        Converts ArtifactJob to the string
+        """
+        return "<ArtifactJob (id = {}, event_id = {}, participant_id = {}>".\
+            format(self.id, self.event_id, self.participant_id)
@@ -1,3 +1,9 @@
+from datetime import datetime
+from typing import Iterable, List
+
+from sqlalchemy import literal_column, update
+from sqlalchemy.sql.expression import Update
+
 # from sqlalchemy import exc
 from flask_app import db
 
@@ -51,3 +57,48 @@ class EntityModel(RelationshipModel):
 
     def as_dict(self):
         return {col.name: getattr(self, col.name) for col in self.__table__.columns}
+
+
+class VersionedModel:
+    """
+    Class with version and modification time of the row,
+    both are bumped by every UPDATE statement of the row
+    """
+    # Columns maintained by the database, explicit values would roll the version back
+    VERSION_FIELDS = {"version", "updated_at"}
+
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1",
+                        onupdate=literal_column("version") + 1)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow,
+                           server_default=db.func.now(), onupdate=datetime.utcnow)
+
+    @classmethod
+    def touch(cls, ids: Iterable[int]) -> None:
+        """Method for bumping version of the rows changed outside of them,
+        e.g. by membership changes, without committing
+
+        Parameters
+        ----------
+        ids : Iterable[int]
+            Ids of the changed rows
+        """
+        ids = list(ids)
+        if ids:
+            db.session.execute(cls.touch_statement(ids))
+
+    @classmethod
+    def touch_statement(cls, ids: List[int]) -> Update:
+        """
+        Returns update bumping version of the rows with given ids
+        """
+        table = cls.__table__
+        return update(table).where(table.c.id.in_(ids)).\
+            values(version=table.c.version + 1, updated_at=datetime.utcnow())
+
+    @classmethod
+    def validators_of(cls, **filters):
+        """
+        Returns id, version and updated_at of the row found by filters
+        without loading the row, None if not exists
+        """
+        return cls.query.with_entities(cls.id, cls.version, cls.updated_at).filter_by(**filters).first()
@@ -1,22 +1,33 @@
 """
 The module is used to describe database Event model and its m2m relationships
 """
-import json
-import os
-from datetime import datetime
-from typing import Optional, Dict
+from datetime import datetime, timezone
+from typing import Optional, Dict, Iterable, List, Tuple
 
-import requests
 from flask_sqlalchemy import BaseQuery
-from sqlalchemy import exc
+from sqlalchemy import DDL, and_, event, exc, false, func, literal, literal_column, or_, select, union, union_all, update
 from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm.attributes import InstrumentedAttribute
 from sqlalchemy.sql import case
+from sqlalchemy.sql.expression import CompoundSelect, Insert, Update
+from sqlalchemy.sql.elements import ColumnElement
 
 from flask_app import db
-from flask_app.models.artifact import ArtifactModel
-from flask_app.models.base import EntityModel, RelationshipModel
+from flask_app.models.artifact import ArtifactJobModel
+from flask_app.models.base import EntityModel, RelationshipModel, VersionedModel
 from flask_app.models.user import UserModel
 
+SEARCH_CONFIG = "english"
+
+# Generated tsvector column of the event table, exists only in PostgreSQL
+SEARCH_VECTOR = literal_column("event.search_vector")
+
+
+class EventFullError(Exception):
+    """
+    Raised when registration would exceed the event capacity
+    """
+
 
 class EventGuestModel(db.Model, RelationshipModel):
     """
@@ -60,12 +71,18 @@ class EventArtifactModel(db.Model, RelationshipModel):
                             primary_key=True)
 
 
-class EventModel(db.Model, EntityModel):
+class EventModel(db.Model, EntityModel, VersionedModel):
     """
     Entity Event Model
     """
     __tablename__ = 'event'
 
+    # Columns read by the computed properties, loaded when the property is dumped
+    LOAD_DEPENDENCIES = {"status": ("dt_start", "dt_end")}
+
+    # Columns changed by PATCH, counters and row versions are maintained by the database
+    EDITABLE_FIELDS = {"title", "summary", "dt_start", "dt_end", "capacity", "owner_id"}
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(128), nullable=False, unique=True)
     summary = db.Column(db.String(1028), nullable=True)
@@ -73,6 +90,13 @@ class EventModel(db.Model, EntityModel):
     dt_start = db.Column(db.DateTime, default=datetime.utcnow)
     dt_end = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Denormalized sizes of the guests and participants lists
+    guest_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    participant_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    # Maximal amount of participants, unlimited if None
+    capacity = db.Column(db.Integer, nullable=True)
+
     owner_id = db.Column(db.Integer(),
                          db.ForeignKey('user.id', ondelete='CASCADE'))
     guests = db.relationship("UserModel",
@@ -87,6 +111,11 @@ class EventModel(db.Model, EntityModel):
 
     __table_args__ = (
         db.CheckConstraint("dt_start <= dt_end", name='start_before_end_constraint'),
+        db.CheckConstraint("capacity IS NULL OR capacity >= 0", name='capacity_not_negative_constraint'),
+        db.Index("ix_event_dt_start_id", "dt_start", "id"),
+        db.Index("ix_event_dt_end_id", "dt_end", "id"),
+        db.Index("ix_event_guest_count_id", "guest_count", "id"),
+        db.Index("ix_event_participant_count_id", "participant_count", "id"),
     )
 
     def __repr__(self) -> str:
@@ -103,33 +132,15 @@ class EventModel(db.Model, EntityModel):
         user : UserModel
             User to adding
         """
-        if user in self.guests:
+        role = self.role_of(user)
+        if role == "guest":
             raise exc.IntegrityError("User can not be guest and participant",
                                      params=None, orig=None)
-        if user in self.participants:
-            raise exc.IntegrityError("User already in guests list",
+        if role == "participant":
+            raise exc.IntegrityError("User already in participants list",
                                      params=None, orig=None)
 
-        self.participants.append(user)
-
-        # If user is an author
-        if UserModel.exists_remote(user.username):
-            response = requests.get("{}/api/user/{}".
-                                    format(os.getenv('BOOKS_APP_URL'), user.username))
-            json_data = json.loads(response.text)
-
-            if json_data["books"]:
-                book = json_data["books"][0]
-                url = "{}/books/{}/".format(os.getenv('BOOKS_APP_URL'), book['id'])
-                artifact = ArtifactModel.find_by_url(url)
-
-                # If it is new artifact
-                if artifact is None:
-                    artifact = ArtifactModel(url=url)
-                    artifact.save_to_db()
-
-                self.artifacts.append(artifact)
-        self.save_to_db()
+        self.add_participants([user])
 
     def add_guest(self, user: UserModel) -> None:
         """Add given user to the guests list
@@ -139,14 +150,317 @@ class EventModel(db.Model, EntityModel):
         user : UserModel
             User to adding
         """
-        if user in self.guests:
+        role = self.role_of(user)
+        if role == "participant":
             raise exc.IntegrityError("User can not be guest and participant",
                                      params=None, orig=None)
-        if user in self.participants:
-            raise exc.IntegrityError("User already in participant list",
+        if role == "guest":
+            raise exc.IntegrityError("User already in guests list",
                                      params=None, orig=None)
-        self.guests.append(user)
-        self.save_to_db()
+        self.add_guests([user])
+
+    def is_guest(self, user: UserModel) -> bool:
+        """Method for checking if user is in the guests list
+        by primary key lookup, without loading the list
+
+        Parameters
+        ----------
+        user : UserModel
+            User for checking
+
+        Returns
+        -------
+        bool
+            True if user is a guest, False otherwise
+        """
+        query = EventGuestModel.query.filter_by(event_id=self.id, guest_id=user.id)
+        return db.session.query(query.exists()).scalar()
+
+    def is_participant(self, user: UserModel) -> bool:
+        """Method for checking if user is in the participants list
+        by primary key lookup, without loading the list
+
+        Parameters
+        ----------
+        user : UserModel
+            User for checking
+
+        Returns
+        -------
+        bool
+            True if user is a participant, False otherwise
+        """
+        query = EventParticipantModel.query.filter_by(event_id=self.id, participant_id=user.id)
+        return db.session.query(query.exists()).scalar()
+
+    def role_of(self, user: UserModel) -> Optional[str]:
+        """Method for getting registration role of the user
+
+        Parameters
+        ----------
+        user : UserModel
+            User for checking
+
+        Returns
+        -------
+        Optional[str]
+            "guest" or "participant", None if user is not registered
+        """
+        return self.roles_of([user.id]).get(user.id)
+
+    def roles_of(self, user_ids: Iterable[int]) -> Dict[int, str]:
+        """Method for getting registration roles of the given users
+        with a single query over the membership tables
+
+        Parameters
+        ----------
+        user_ids : Iterable[int]
+            Ids of users for checking
+
+        Returns
+        -------
+        Dict[int, str]
+            Role ("guest" or "participant") by user id, only for registered users
+        """
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        return dict(db.session.execute(EventModel.roles_statement(self.id, user_ids)).all())
+
+    @staticmethod
+    def roles_statement(event_id: int, user_ids: List[int]) -> CompoundSelect:
+        """Method for building query of the registration roles,
+        shared by the sync models and the async handlers
+
+        Parameters
+        ----------
+        event_id : int
+            Event id
+        user_ids : List[int]
+            Ids of users for checking
+
+        Returns
+        -------
+        CompoundSelect
+            Query of (user id, role) rows
+        """
+        guests = select(EventGuestModel.guest_id, literal("guest")).\
+            where(EventGuestModel.event_id == event_id, EventGuestModel.guest_id.in_(user_ids))
+        participants = select(EventParticipantModel.participant_id, literal("participant")).\
+            where(EventParticipantModel.event_id == event_id, EventParticipantModel.participant_id.in_(user_ids))
+        return union_all(guests, participants)
+
+    def add_guests(self, users: List[UserModel]) -> None:
+        """Add given users to the guests list in a single statement and transaction.
+        Users must not be registered for the event yet
+
+        Parameters
+        ----------
+        users : List[UserModel]
+            Users to adding
+        """
+        if users:
+            for statement, rows in EventModel.registration_statements(self.id, [user.id for user in users], "guest"):
+                db.session.execute(statement, rows)
+            self.count_members(guests=len(users))
+        db.session.commit()
+
+    def add_participants(self, users: List[UserModel]) -> None:
+        """Add given users to the participants list in a single statement and transaction.
+        Users must not be registered for the event yet. Places are taken first
+        by one conditional update, which also locks the event row until commit,
+        so concurrent registrations never exceed the capacity
+
+        Parameters
+        ----------
+        users : List[UserModel]
+            Users to adding
+
+        Raises
+        ------
+        EventFullError
+            If there are not enough free places, nothing is saved
+        """
+        if users:
+            if not self.count_members(participants=len(users)):
+                db.session.rollback()
+                raise EventFullError("Event has no {} free places".format(len(users)))
+            for statement, rows in EventModel.registration_statements(self.id, [user.id for user in users],
+                                                                      "participant"):
+                db.session.execute(statement, rows)
+        db.session.commit()
+
+    @staticmethod
+    def registration_statements(event_id: int, user_ids: List[int], role: str) -> List[Tuple[Insert, List[Dict]]]:
+        """Method for building inserts registering users for the event,
+        shared by the sync models and the async handlers. Counters are not changed
+
+        Parameters
+        ----------
+        event_id : int
+            Event id
+        user_ids : List[int]
+            Ids of users for registering
+        role : str
+            "guest" or "participant"
+
+        Returns
+        -------
+        List[Tuple[Insert, List[Dict]]]
+            Statements with rows for executemany
+        """
+        if role == "guest":
+            return [(EventGuestModel.__table__.insert(),
+                     [{"event_id": event_id, "guest_id": user_id} for user_id in user_ids])]
+
+        now = datetime.utcnow()
+        return [(EventParticipantModel.__table__.insert(),
+                 [{"event_id": event_id, "participant_id": user_id} for user_id in user_ids]),
+                # Books of the authors are linked later by the artifact workers
+                (ArtifactJobModel.__table__.insert(),
+                 [{"event_id": event_id, "participant_id": user_id,
+                   "attempts": 0, "failed": False, "dt_next_try": now} for user_id in user_ids])]
+
+    def remove_guests(self, users: List[UserModel]) -> None:
+        """Remove given users from the guests list in a single statement and transaction
+
+        Parameters
+        ----------
+        users : List[UserModel]
+            Users to removing
+        """
+        removed = EventGuestModel.query.\
+            filter(EventGuestModel.event_id == self.id,
+                   EventGuestModel.guest_id.in_([user.id for user in users])).\
+            delete(synchronize_session=False)
+        if removed:
+            self.count_members(guests=-removed)
+        db.session.commit()
+
+    def remove_participants(self, users: List[UserModel]) -> None:
+        """Remove given users from the participants list in a single statement and transaction
+
+        Parameters
+        ----------
+        users : List[UserModel]
+            Users to removing
+        """
+        removed = EventParticipantModel.query.\
+            filter(EventParticipantModel.event_id == self.id,
+                   EventParticipantModel.participant_id.in_([user.id for user in users])).\
+            delete(synchronize_session=False)
+        if removed:
+            self.count_members(participants=-removed)
+        db.session.commit()
+
+    def count_members(self, guests: int = 0, participants: int = 0) -> bool:
+        """Method for changing the counters relatively in the database without committing,
+        so concurrent membership changes do not overwrite each other.
+        New participants are admitted only within the capacity.
+        The event version is bumped by the same statement
+
+        Parameters
+        ----------
+        guests : int
+            Change of the guests amount
+        participants : int
+            Change of the participants amount
+
+        Returns
+        -------
+        bool
+            False if new participants do not fit into the capacity and nothing was changed
+        """
+        return db.session.execute(EventModel.counters_statement(self.id, guests, participants)).rowcount == 1
+
+    @classmethod
+    def counters_statement(cls, event_id: int, guests: int = 0, participants: int = 0) -> Update:
+        """Method for building relative update of the counters guarded by the capacity,
+        shared by the sync models and the async handlers
+
+        Parameters
+        ----------
+        event_id : int
+            Event id
+        guests : int
+            Change of the guests amount
+        participants : int
+            Change of the participants amount
+
+        Returns
+        -------
+        Update
+            Statement updating one row if the change is admitted, no rows otherwise
+        """
+        table = cls.__table__
+        statement = update(table).where(table.c.id == event_id)
+        if participants > 0:
+            statement = statement.where(or_(table.c.capacity.is_(None),
+                                            table.c.participant_count + participants <= table.c.capacity))
+        return statement.values(guest_count=table.c.guest_count + guests,
+                                participant_count=table.c.participant_count + participants)
+
+    @classmethod
+    def uncount_member(cls, user_id: int) -> None:
+        """Method for decrementing counters of the events where the user is a guest
+        or a participant, before the user and the memberships are deleted, without committing
+
+        Parameters
+        ----------
+        user_id : int
+            User id
+        """
+        guests = db.session.query(EventGuestModel.event_id).filter(EventGuestModel.guest_id == user_id)
+        participants = db.session.query(EventParticipantModel.event_id).\
+            filter(EventParticipantModel.participant_id == user_id)
+        cls.query.filter(cls.id.in_(guests)).\
+            update({"guest_count": cls.guest_count - 1}, synchronize_session=False)
+        cls.query.filter(cls.id.in_(participants)).\
+            update({"participant_count": cls.participant_count - 1}, synchronize_session=False)
+
+    @classmethod
+    def rebuild_counters(cls) -> int:
+        """Method for recounting guests and participants of all events
+        where the counters differ from the membership tables, without committing
+
+        Returns
+        -------
+        int
+            Amount of fixed events
+        """
+        guests = select(func.count()).where(EventGuestModel.event_id == cls.id).\
+            correlate(cls).scalar_subquery()
+        participants = select(func.count()).where(EventParticipantModel.event_id == cls.id).\
+            correlate(cls).scalar_subquery()
+        return cls.query.filter(or_(cls.guest_count != guests, cls.participant_count != participants)).\
+            update({"guest_count": guests, "participant_count": participants}, synchronize_session=False)
+
+    @classmethod
+    def ids_related_to(cls, user_id: int) -> List[int]:
+        """Method for getting ids of events which documents include the user:
+        owned events and events where the user is a guest or a participant
+
+        Parameters
+        ----------
+        user_id : int
+            User id
+
+        Returns
+        -------
+        List[int]
+            Event ids
+        """
+        return [event_id for event_id, in db.session.execute(cls.related_to_statement(user_id))]
+
+    @classmethod
+    def related_to_statement(cls, user_id: int) -> CompoundSelect:
+        """
+        Returns query of ids of events which documents include the user
+        """
+        owned = select(cls.id).where(cls.owner_id == user_id)
+        guests = select(EventGuestModel.event_id).where(EventGuestModel.guest_id == user_id)
+        participants = select(EventParticipantModel.event_id).where(EventParticipantModel.participant_id == user_id)
+        return union(owned, guests, participants)
 
     @hybrid_property
     def status(self) -> str:
@@ -169,6 +483,48 @@ class EventModel(db.Model, EntityModel):
             (self.dt_start < datetime.now(), "current"),
         ], else_="future")
 
+    @staticmethod
+    def status_change(dt_start: datetime, dt_end: datetime) -> Tuple[str, Optional[datetime]]:
+        """Method for getting status of the event and the time it started
+
+        Parameters
+        ----------
+        dt_start : datetime
+            Local start time of the event
+        dt_end : datetime
+            Local end time of the event
+
+        Returns
+        -------
+        Tuple[str, Optional[datetime]]
+            Status and the last passed boundary in UTC, None for future events
+        """
+        now = datetime.now()
+        if dt_end < now:
+            status, changed_at = "past", dt_end
+        elif dt_start < now:
+            status, changed_at = "current", dt_start
+        else:
+            return "future", None
+        return status, changed_at.astimezone(timezone.utc).replace(tzinfo=None)
+
+    @classmethod
+    def document_validators_of(cls, **filters) -> Optional[tuple]:
+        """Method for getting validators of the event document, the status
+        is a part of the document and changes without row updates
+
+        Returns
+        -------
+        Optional[tuple]
+            Id, version, updated_at, status and the time of the last status change,
+            None if not exists
+        """
+        row = cls.query.with_entities(cls.id, cls.version, cls.updated_at, cls.dt_start, cls.dt_end).\
+            filter_by(**filters).first()
+        if row is None:
+            return None
+        return (row.id, row.version, row.updated_at) + cls.status_change(row.dt_start, row.dt_end)
+
     @classmethod
     def find_by_title(cls, title: str, queryset: Optional[BaseQuery] = None) \
             -> Optional['EventModel']:
@@ -189,6 +545,31 @@ class EventModel(db.Model, EntityModel):
         queryset = queryset or cls.query
         return queryset.filter_by(title=title).first()
 
+    @classmethod
+    def status_filter(cls, status: str, now: Optional[datetime] = None):
+        """Method for getting SQL condition equal to the status property,
+        expressed as plain ranges over dt_start and dt_end so indexes can be used
+
+        Parameters
+        ----------
+        status : str
+            Event status
+        now : Optional[datetime]
+            Moment for comparing, current time by default
+
+        Returns
+        -------
+        SQL expression, always false for unknown status
+        """
+        now = now or datetime.now()
+        if status == "past":
+            return cls.dt_end < now
+        if status == "current":
+            return and_(cls.dt_start < now, cls.dt_end >= now)
+        if status == "future":
+            return cls.dt_start >= now
+        return false()
+
     @classmethod
     def find_by_status(cls, status: str, queryset: Optional[BaseQuery] = None) \
             -> Optional['EventModel']:
@@ -207,7 +588,7 @@ class EventModel(db.Model, EntityModel):
             Search result, None if no events with given status exists
         """
         queryset = queryset or cls.query
-        return queryset.filter_by(status=status)
+        return queryset.filter(cls.status_filter(status))
 
     @classmethod
     def filter_by_participant(cls, user_id: int, queryset: Optional[BaseQuery] = None) \
@@ -271,6 +652,58 @@ class EventModel(db.Model, EntityModel):
         queryset = queryset or cls.query
         return queryset.filter_by(owner_id=user_id)
 
+    @classmethod
+    def sort_keys(cls, query_params: Optional[Dict] = None) -> List[Tuple[InstrumentedAttribute, bool]]:
+        """Method for getting unique sort key of the events list
+
+        Parameters
+        ----------
+        query_params : Optional[Dict]
+            Request parameters with optional "order_by" and "order",
+            these parameters are removed from the dict
+
+        Returns
+        -------
+        List[Tuple[InstrumentedAttribute, bool]]
+            Columns with descending flag, id is used as a tiebreaker
+        """
+        if query_params is None:
+            query_params = dict()
+
+        order_by = getattr(cls, query_params.pop("order_by", "dt_start"))
+        descending = query_params.pop("order", "asc") == "desc"
+        return [(order_by, descending), (cls.id, descending)]
+
+    @classmethod
+    def search(cls, text: str, queryset: Optional[BaseQuery] = None) \
+            -> Tuple[BaseQuery, Optional[ColumnElement]]:
+        """Method for full-text search over event title and summary.
+        PostgreSQL uses the indexed search_vector column, other databases
+        fall back to matching every word as a substring without ranking
+
+        Parameters
+        ----------
+        text : str
+            Search query in the web search syntax
+        queryset : Optional[BaseQuery]
+            Events for search in, None by default for searching in all
+
+        Returns
+        -------
+        Tuple[BaseQuery, Optional[ColumnElement]]
+            Search result and relevance expression, None if ranking is not supported
+        """
+        queryset = queryset or cls.query
+
+        if db.session.get_bind().dialect.name == "postgresql":
+            ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, text)
+            return queryset.filter(SEARCH_VECTOR.op("@@")(ts_query)), func.ts_rank_cd(SEARCH_VECTOR, ts_query)
+
+        for word in text.split():
+            pattern = "%{}%".format(word)
+            queryset = queryset.filter(or_(cls.title.ilike(pattern), cls.summary.ilike(pattern)))
+        return queryset, None
+
     @classmethod
     def get_list(cls, query_params: Optional[Dict] = None) -> Optional['EventModel']:
         """Method for getting events by specified filters
@@ -288,21 +721,45 @@ class EventModel(db.Model, EntityModel):
         if query_params is None:
             query_params = dict()
 
-        order_by = getattr(cls, query_params.pop("order_by", "dt_start"))
-        order = query_params.pop("order", "asc")
-        order_by = order_by.desc() if order == "desc" else order_by.asc()
+        sort_keys = cls.sort_keys(query_params)
+        order_by = [column.desc() if descending else column.asc() for column, descending in sort_keys]
 
         query = cls.query
         query = EventModel.find_by_status(query_params.get("status", "future"), query)
 
         if query_params.get("title"):
-            query = EventModel.find_by_title(query_params.get("title"), query)
+            query = query.filter_by(title=query_params.get("title"))
+
+        if query_params.get("q"):
+            query, rank = EventModel.search(query_params.get("q"), query)
+            if rank is not None:
+                order_by.insert(0, rank.desc())
 
-        return query.order_by(order_by)
+        return query.order_by(*order_by)
 
     def update_in_db(self, data):
         """
-        Update data in the database
+        Update data in the database, the capacity is not lowered below the amount
+        of participants by the same conditional update as registrations use
+
+        Raises
+        ------
+        EventFullError
+            If the new capacity is less than the amount of participants, nothing is saved
         """
-        EventModel.query.filter_by(id=self.id).update(data)
+        query = EventModel.query.filter_by(id=self.id)
+        if data.get("capacity") is not None:
+            query = query.filter(EventModel.participant_count <= data["capacity"])
+        if not query.update(data):
+            db.session.rollback()
+            raise EventFullError("Event has more participants than the capacity")
         db.session.commit()
+
+
+event.listen(
+    EventModel.__table__, "after_create",
+    DDL("ALTER TABLE event ADD COLUMN search_vector tsvector GENERATED ALWAYS AS "
+        "(to_tsvector('{0}', coalesce(title, '') || ' ' || coalesce(summary, ''))) STORED; "
+        "CREATE INDEX ix_event_search_vector ON event USING GIN (search_vector)".format(SEARCH_CONFIG)).
+    execute_if(dialect="postgresql")
+)
@@ -1,19 +1,21 @@
-import os
-from typing import Optional
+from typing import Iterable, List, Optional
 
-import requests
 from flask_login import UserMixin
 # from sqlalchemy import exc
 from sqlalchemy.ext.hybrid import hybrid_property
 from werkzeug.security import generate_password_hash, check_password_hash
 
 from flask_app import db
-from flask_app.models.base import EntityModel
+from flask_app.books.client import books_client
+from flask_app.models.base import EntityModel, VersionedModel
 
 
-class UserModel(UserMixin, db.Model, EntityModel):
+class UserModel(UserMixin, db.Model, EntityModel, VersionedModel):
     __tablename__ = 'user'
 
+    # Fields embedded into event documents
+    EVENT_DOCUMENT_FIELDS = {"username", "first_name", "last_name", "is_admin"}
+
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(128), unique=True, nullable=False)
     _password = db.Column(db.String(128), nullable=True)
@@ -83,6 +85,41 @@ class UserModel(UserMixin, db.Model, EntityModel):
         """
         return UserModel.query.filter_by(username=username).first()
 
+    @classmethod
+    def find_by_usernames(cls, usernames: Iterable[str]) -> List['UserModel']:
+        """Method for searching all users with given usernames by one query
+
+        Parameters
+        ----------
+        usernames : Iterable[str]
+            Usernames for search
+
+        Returns
+        -------
+        List['UserModel']
+            Found users, missing usernames are skipped
+        """
+        return UserModel.query.filter(UserModel.username.in_(list(usernames))).all()
+
+    @classmethod
+    def create_many(cls, usernames: Iterable[str]) -> List['UserModel']:
+        """Method for creating users with given usernames without committing
+
+        Parameters
+        ----------
+        usernames : Iterable[str]
+            Usernames of new users
+
+        Returns
+        -------
+        List['UserModel']
+            Created users with assigned ids
+        """
+        users = [UserModel(username=username) for username in usernames]
+        db.session.add_all(users)
+        db.session.flush()
+        return users
+
     @classmethod
     def exists_local(cls, username: str) -> bool:
         """Method for check if user with given username
@@ -115,7 +152,7 @@ class UserModel(UserMixin, db.Model, EntityModel):
         bool
             True if exists, False otherwise
         """
-        return bool(requests.get('{}/api/user/{}'.format(os.getenv('BOOKS_APP_URL'), username)))
+        return books_client.user_exists(username)
 
     @classmethod
     def exists(cls, username: str) -> bool:
@@ -156,7 +193,42 @@ class UserModel(UserMixin, db.Model, EntityModel):
 
     def update_in_db(self, data):
         """
-        Update data in the database
+        Update data in the database, events embedding the changed
+        fields of the user get new versions
         """
+        if self.EVENT_DOCUMENT_FIELDS.intersection(data):
+            self.touch_events()
         UserModel.query.filter_by(id=self.id).update(data)
         db.session.commit()
+
+    def delete_from_db(self):
+        """
+        Delete user from database, events which lose the user
+        as a guest or a participant get new versions
+        """
+        self.touch_events(leaving=True)
+        super().delete_from_db()
+
+    def touch_events(self, leaving: bool = False) -> List[int]:
+        """Method for bumping versions of the events including the user
+        without committing
+
+        Parameters
+        ----------
+        leaving : bool
+            Whether the user is deleted, so guests and participants counters
+            of the events are decremented
+
+        Returns
+        -------
+        List[int]
+            Ids of the touched events
+        """
+        # Event models depend on this module
+        from flask_app.models.event import EventModel
+
+        event_ids = EventModel.ids_related_to(self.id)
+        EventModel.touch(event_ids)
+        if leaving:
+            EventModel.uncount_member(self.id)
+        return event_ids
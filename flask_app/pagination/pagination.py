@@ -1,10 +1,18 @@
 """
-Module with pagination function
+Module with pagination functions
 """
-from typing import Dict, Optional
+import base64
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import quote
 
-from flask_sqlalchemy import Pagination
+from flask_sqlalchemy import BaseQuery, Pagination
 from marshmallow import Schema
+from sqlalchemy import and_, false, or_, tuple_
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+
+SortKeys = List[Tuple[InstrumentedAttribute, bool]]
 
 
 def create_pagination(*, items: Pagination, schema: Schema,
@@ -48,7 +56,7 @@ def create_pagination(*, items: Pagination, schema: Schema,
         query_params = dict()
 
     # Add query parameters
-    query_params = ''.join([f'&{key}={value}' for key, value in query_params.items()])
+    query_params = ''.join([f'&{key}={quote(str(value))}' for key, value in query_params.items()])
 
     # Add next page link if exists
     next_page_num = items.next_num
@@ -65,3 +73,238 @@ def create_pagination(*, items: Pagination, schema: Schema,
     response["results"] = schema.dump(items.items)
 
     return response
+
+
+def encode_cursor(values: List, direction: str) -> str:
+    """Function for encoding sort key values into an opaque cursor
+
+    Parameters
+    ----------
+    values : List
+        Sort key values of the boundary item
+    direction : str
+        "next" or "prev"
+
+    Returns
+    -------
+    str
+        Url safe cursor
+    """
+    values = [{"dt": value.isoformat()} if isinstance(value, datetime) else value for value in values]
+    data = json.dumps({"k": values, "d": direction}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[List, str]:
+    """Function for decoding cursor created by encode_cursor
+
+    Parameters
+    ----------
+    cursor : str
+        Url safe cursor
+
+    Returns
+    -------
+    Tuple[List, str]
+        Sort key values and direction
+
+    Raises
+    ------
+    ValueError
+        If cursor is malformed
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        values = [datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+                  for value in data["k"]]
+        direction = data["d"]
+    except (TypeError, KeyError, ValueError) as error:
+        raise ValueError("Invalid cursor") from error
+
+    if direction not in ("next", "prev"):
+        raise ValueError("Invalid cursor")
+    return values, direction
+
+
+def estimate_count(query: BaseQuery) -> int:
+    """Function for estimating amount of query rows by the planner
+    statistics, exact count is used for databases without estimates
+
+    Parameters
+    ----------
+    query : BaseQuery
+        Query for estimating
+
+    Returns
+    -------
+    int
+        Estimated amount of rows
+    """
+    session = query.session
+    if session.get_bind().dialect.name != "postgresql":
+        return query.order_by(None).count()
+
+    # Parameters are bound by the driver, literal rendering fails for dates and other types
+    compiled = query.order_by(None).statement.compile(dialect=session.get_bind().dialect,
+                                                      compile_kwargs={"render_postcompile": True})
+    plan = session.connection().exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled),
+                                                compiled.params).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def keyset_filter(columns: List[InstrumentedAttribute], values: List, descending: bool):
+    """Function for filtering items following the boundary item in the sort order,
+    NULL values of nullable columns are the greatest ones as in PostgreSQL
+
+    Parameters
+    ----------
+    columns : List[InstrumentedAttribute]
+        Sort key columns
+    values : List
+        Sort key values of the boundary item
+    descending : bool
+        Whether items are sorted in descending order
+
+    Returns
+    -------
+    ColumnElement
+        Filter condition
+    """
+    if not any(column.property.columns[0].nullable for column in columns):
+        keys, bounds = tuple_(*columns), tuple_(*values)
+        return keys < bounds if descending else keys > bounds
+
+    # Tuple comparison is unknown for NULL, the key is compared column by column from the last one
+    condition = false()
+    for column, value in reversed(list(zip(columns, values))):
+        if value is None:
+            following = column.isnot(None) if descending else false()
+            equal = column.is_(None)
+        else:
+            following = column < value if descending else column > value
+            if column.property.columns[0].nullable and not descending:
+                following = or_(following, column.is_(None))
+            equal = column == value
+        condition = or_(following, and_(equal, condition))
+    return condition
+
+
+def keyset_order(columns: List[InstrumentedAttribute], descending: bool) -> List:
+    """Function for ordering items by the sort key columns,
+    NULL values of nullable columns are the greatest ones as in PostgreSQL
+
+    Parameters
+    ----------
+    columns : List[InstrumentedAttribute]
+        Sort key columns
+    descending : bool
+        Whether items are sorted in descending order
+
+    Returns
+    -------
+    List
+        Order by clauses
+    """
+    order_by = []
+    for column in columns:
+        if not column.property.columns[0].nullable:
+            order_by.append(column.desc() if descending else column.asc())
+        else:
+            order_by.append(column.desc().nullsfirst() if descending else column.asc().nullslast())
+    return order_by
+
+
+def create_cursor_pagination(*, query: BaseQuery, schema: Schema, sort_keys: SortKeys,
+                             cursor: Optional[str] = None, limit: int = 20,
+                             total: Optional[str] = None,
+                             query_params: Optional[Dict] = None, base_url: str) -> Dict:
+    """Function for creating response with keyset paginated items,
+    pages are addressed by cursors instead of offsets, so deep pages
+    are as cheap as the first one and no count is required
+
+    Parameters
+    ----------
+    query : BaseQuery
+        Filtered set of data
+    schema : Schema
+        Marshmallow Schema for serialization
+    sort_keys : SortKeys
+        Unique sort key as columns with descending flag,
+        all columns must be sorted in the same direction, NULL values are the greatest ones
+    cursor : Optional[str]
+        Cursor of the current page, None for the first page
+    limit : int
+        Maximal amount of items on page
+    total : Optional[str]
+        "exact" or "estimate" for adding total number of items, None to skip
+    query_params: Dict
+        Request parameters, such as filters, etc.
+    base_url: str
+        Current page url
+
+    Returns
+    -------
+    Dict
+        Response
+    """
+    values, direction = [], "next"
+    if cursor:
+        try:
+            values, direction = decode_cursor(cursor)
+        except ValueError:
+            return {"message": "Invalid cursor", "status": 400}
+        if len(values) != len(sort_keys):
+            return {"message": "Invalid cursor", "status": 400}
+
+    # Walk backwards for the previous page
+    backwards = direction == "prev"
+    columns = [column for column, _ in sort_keys]
+    descending = sort_keys[0][1] != backwards
+
+    page_query = query.order_by(None)
+    if values:
+        page_query = page_query.filter(keyset_filter(columns, values, descending))
+    page_query = page_query.order_by(*keyset_order(columns, descending))
+
+    items = page_query.limit(limit + 1).all()
+    has_more = len(items) > limit
+    items = items[:limit]
+    if backwards:
+        items.reverse()
+
+    if not items and not cursor:
+        return {"message": "Nothing to show", "status": 200}
+
+    response = {"status": 200}
+
+    query_params = dict(query_params or {})
+    if total is not None:
+        query_params["total"] = total
+
+    # Add query parameters
+    query_params = ''.join([f'&{key}={quote(str(value))}' for key, value in query_params.items()])
+
+    def link(item, link_direction: str) -> str:
+        item_cursor = encode_cursor([getattr(item, column.key) for column in columns], link_direction)
+        return f"{base_url}?cursor={item_cursor}&limit={limit}{query_params}"
+
+    # Add next page link if exists
+    has_next = has_more if not backwards else bool(cursor)
+    response["next"] = link(items[-1], "next") if items and has_next else None
+
+    # Add prev page link if exists
+    has_prev = has_more if backwards else bool(cursor)
+    response["prev"] = link(items[0], "prev") if items and has_prev else None
+
+    # Add total number of items
+    if total == "exact":
+        response["total"] = query.order_by(None).count()
+    elif total == "estimate":
+        response["total"] = estimate_count(query)
+
+    # Add results
+    response["results"] = schema.dump(items)
+
+    return response
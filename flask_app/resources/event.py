@@ -2,23 +2,34 @@
 Module with Event Endpoints
 """
 from functools import wraps
-from typing import Callable, Dict, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 from flask import Response
-from flask import request, jsonify
+from flask import g, request, jsonify
 from flask_login import login_required, current_user
 from flask_restx import Resource
+from marshmallow import Schema
 
 from flask_app import db
-from flask_app.models.event import EventModel
-from flask_app.pagination.pagination import create_pagination
+from flask_app.bulk_import import import_events, iter_json_array, iter_ndjson
+from flask_app.cache.events import cache_event_document, get_event_document
+from flask_app.conditional import conditional
+from flask_app.models.event import EventFullError, EventModel
+from flask_app.models.user import UserModel
+from flask_app.pagination.pagination import create_pagination, create_cursor_pagination
 from flask_app.schemas.event import event_full_schema, event_short_list_schema
+from flask_app.schemas.fast import compile_schema
+from flask_app.schemas.loading import loader_options
+from flask_app.schemas.sparse import sparse_schema
 
 
 class EventResource(Resource):
     """
     Base resource class for Event model
     """
+    # Schemas dumped by the methods, their relationships are loaded with the event
+    dump_schemas: Dict[str, Schema] = {}
+
     def __init__(self, *args, **kwargs):
         """
         Initializes event
@@ -31,7 +42,12 @@ class EventResource(Resource):
         Checks if the event exists and has not passed,
         and if so, then initializes it
         """
-        event = EventModel.find_by_id(kwargs.get("event_id"))
+        query = EventModel.query
+        if request.method in self.dump_schemas:
+            # Version keys the cached documents
+            query = query.options(*loader_options(self.dump_schemas[request.method], EventModel.version))
+
+        event = query.filter_by(id=kwargs.get("event_id")).first()
         if event is None:
             return jsonify({
                 "status": 404,
@@ -45,6 +61,34 @@ class EventResource(Resource):
         self.event = event
         return super().dispatch_request(*args, **kwargs)
 
+    @staticmethod
+    def resolve_users(usernames: List[str]) -> Tuple[List[UserModel], Optional[str]]:
+        """Method for getting users by usernames with one query,
+        users existing only in the books service are created without committing
+
+        Parameters
+        ----------
+        usernames : List[str]
+            Usernames for search
+
+        Returns
+        -------
+        Tuple[List[UserModel], Optional[str]]
+            Found users and the first not found username, if any
+        """
+        usernames = list(dict.fromkeys(usernames))
+        users = {user.username: user for user in UserModel.find_by_usernames(usernames)}
+
+        remote = []
+        for username in usernames:
+            if username not in users:
+                if not UserModel.exists_remote(username):
+                    return [], username
+                remote.append(username)
+
+        users.update({user.username: user for user in UserModel.create_many(remote)})
+        return [users[username] for username in usernames], None
+
     @staticmethod
     def owner_required(foo: Callable) -> Callable:
         """
@@ -90,7 +134,13 @@ class UserEventsAsOwner(Resource):
         Tuple[Dict, int]
             Response message and status code
         """
-        return event_short_list_schema.dump(EventModel.filter_by_owner(user_id=current_user.id))
+        try:
+            schema = sparse_schema(event_short_list_schema, request.args.get("fields"))
+        except ValueError as error:
+            return {"message": str(error)}, 400
+
+        queryset = EventModel.filter_by_owner(user_id=current_user.id).options(*loader_options(schema))
+        return compile_schema(schema).dump(queryset)
 
 
 class EventList(Resource):
@@ -106,14 +156,39 @@ class EventList(Resource):
         Tuple[Dict, int]
             Response message and status code
         """
+        try:
+            schema = sparse_schema(event_short_list_schema, request.args.get("fields"))
+        except ValueError as error:
+            return {"message": str(error)}, 400
+
         filters = dict(request.args)
-        page = int(filters.pop("page", 1))
         limit = int(filters.pop("limit", 2))
 
-        queryset = EventModel.get_list(query_params=filters)
+        if filters.pop("pagination", None) == "cursor" or "cursor" in filters:
+            if filters.get("q"):
+                # Relevance is not a stable sort key for cursors
+                return {"message": "Search results can not be paginated with cursors, use pages"}, 400
+
+            cursor = filters.pop("cursor", None)
+            total = filters.pop("total", None)
+            sort_keys = EventModel.sort_keys(dict(filters))
+            queryset = EventModel.get_list(query_params=dict(filters)).\
+                options(*loader_options(schema, *[column for column, _ in sort_keys]))
+            response = create_cursor_pagination(query=queryset,
+                                                schema=compile_schema(schema),
+                                                sort_keys=sort_keys,
+                                                cursor=cursor,
+                                                limit=limit,
+                                                total=total,
+                                                query_params=filters,
+                                                base_url=request.base_url)
+            return response, 200
+
+        page = int(filters.pop("page", 1))
+        queryset = EventModel.get_list(query_params=filters).options(*loader_options(schema))
         paginated_events = queryset.paginate(page, limit, error_out=False)
         response = create_pagination(items=paginated_events,
-                                     schema=event_short_list_schema,
+                                     schema=compile_schema(schema),
                                      page=page,
                                      limit=limit,
                                      query_params=filters,
@@ -147,10 +222,50 @@ class EventList(Resource):
         return event_full_schema.dump(event), 200
 
 
+class EventImport(Resource):
+    """
+    Resource for creating many events at once
+    """
+    NDJSON_MIMETYPES = ("application/x-ndjson", "application/jsonl")
+
+    @classmethod
+    @login_required
+    def post(cls) -> Tuple[Dict, int]:
+        """Method for importing events from a JSON array or NDJSON body
+        owned by the current user, the body is parsed while it is received
+
+        Returns
+        -------
+        Tuple[Dict, int]
+            Report with result of every item and status code
+        """
+        if request.mimetype in cls.NDJSON_MIMETYPES:
+            items = iter_ndjson(request.stream)
+        else:
+            items = iter_json_array(request.stream)
+
+        report = import_events(items, owner_id=current_user.id)
+        return report, 400 if "message" in report else 200
+
+
 class RetrieveUpdateDestroyEvent(EventResource):
     """
     Resource for managing Event details
     """
+    dump_schemas = {"GET": event_full_schema}
+
+    @conditional("event", lambda event_id: EventModel.document_validators_of(id=event_id))
+    def dispatch_request(self, *args, **kwargs):
+        """
+        Returns cached document of the validated event version without loading the event
+        """
+        row = g.get("validated_row")
+        if row is not None:
+            document = get_event_document(*row[:2])
+            if document is not None:
+                return document, 200
+        return super().dispatch_request(*args, **kwargs)
+
     def get(self, event_id: int) -> Tuple[Dict, int]:
         """Method for retrieving details about the Event
 
@@ -164,7 +279,9 @@ class RetrieveUpdateDestroyEvent(EventResource):
         Tuple[Dict, int]
             Response message and status code
         """
-        return event_full_schema.dump(self.event), 200
+        document = compile_schema(event_full_schema).dump(self.event)
+        cache_event_document(self.event, document)
+        return document, 200
 
     @EventResource.admin_or_owner_required
     def patch(self, event_id: int) -> Tuple[Dict, int]:
@@ -186,8 +303,18 @@ class RetrieveUpdateDestroyEvent(EventResource):
         for key_name in event_json.keys():
             if key_name not in self.event.__table__.columns:
                 return {"message": "<{}> no such attribute in event".format(key_name)}, 404
-
-        self.event.update_in_db(data=event_json)
+            if key_name not in EventModel.EDITABLE_FIELDS:
+                return {"message": "<{}> attribute of event can not be changed".format(key_name)}, 400
+
+        if "capacity" in event_json:
+            errors = event_full_schema.validate({"capacity": event_json["capacity"]}, partial=True)
+            if errors:
+                return errors, 400
+
+        try:
+            self.event.update_in_db(data=event_json)
+        except EventFullError:
+            return {"message": "Capacity can not be less than the amount of participants"}, 400
         return event_full_schema.dump(self.event), 200
 
     @EventResource.admin_or_owner_required
@@ -0,0 +1,42 @@
+"""
+Module with Export Endpoints
+"""
+from flask import Response, request, stream_with_context
+from flask_restx import Resource
+
+from flask_app.auth.checkers import admin_required
+from flask_app.export import EXPORT_FORMATS, EXPORT_KINDS, export_query, stream_rows
+
+
+class EventExport(Resource):
+    """
+    Resource for streaming events, memberships or artifacts
+    of all events matching the filters
+    """
+    @staticmethod
+    @admin_required
+    def get(kind: str) -> Response:
+        """Method for exporting rows of the given kind as NDJSON or CSV,
+        the response is streamed without pagination and counting
+
+        Parameters
+        ----------
+        kind : str
+            One of "events", "participants", "guests", "artifacts"
+
+        Returns
+        -------
+        Response
+            Streamed response
+        """
+        filters = dict(request.args)
+        export_format = filters.pop("format", "ndjson")
+
+        if kind not in EXPORT_KINDS or export_format not in EXPORT_FORMATS:
+            return Response("Unknown export kind or format", status=400)
+
+        columns, rows = export_query(kind, filters)
+        response = Response(stream_with_context(stream_rows(columns, rows, export_format)),
+                            mimetype=EXPORT_FORMATS[export_format])
+        response.headers["Content-Disposition"] = "attachment; filename={}.{}".format(kind, export_format)
+        return response
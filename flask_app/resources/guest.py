@@ -7,11 +7,17 @@ from typing import Dict, Tuple
 from flask import request, Response, jsonify
 from flask_login import login_required, current_user
 from flask_restx import Resource
+from sqlalchemy import exc
 
+from flask_app import db
+from flask_app.conditional import conditional
 from flask_app.models.event import EventModel
 from flask_app.models.user import UserModel
 from flask_app.resources.event import EventResource
 from flask_app.schemas.event import event_short_list_schema
+from flask_app.schemas.fast import compile_schema
+from flask_app.schemas.loading import loader_options
+from flask_app.schemas.sparse import sparse_schema
 from flask_app.schemas.user import user_short_list_schema
 
 
@@ -31,7 +37,14 @@ class UserEventsAsGuest(Resource):
         Tuple[Dict, int]
             Response message and status code
         """
-        return event_short_list_schema.dump(EventModel.filter_by_guest(user_id=current_user.id))
+        try:
+            schema = sparse_schema(event_short_list_schema, request.args.get("fields"))
+        except ValueError as error:
+            return {"message": str(error)}, 400
+
+        queryset = EventModel.filter_by_guest(user_id=current_user.id).\
+            options(*loader_options(schema))
+        return compile_schema(schema).dump(queryset)
 
 
 class UserAsGuest(EventResource):
@@ -53,12 +66,13 @@ class UserAsGuest(EventResource):
         Response
             Response message with status code
         """
-        if current_user in self.event.guests:
+        role = self.event.role_of(current_user)
+        if role == "guest":
             return jsonify({
                 "status": 200,
                 "message": "You are registered as a guest"
             })
-        elif current_user in self.event.participants:
+        elif role == "participant":
             return jsonify({
                 "status": 200,
                 "message": "You are registered as a participant"
@@ -83,18 +97,28 @@ class UserAsGuest(EventResource):
         Response
             Response message with status code
         """
-        if current_user in self.event.participants:
+        role = self.event.role_of(current_user)
+        if role == "participant":
             return jsonify({
                 "status": 404,
                 "message": "You already registered as a participant"
             })
-        elif current_user in self.event.guests:
+        elif role == "guest":
             return jsonify({
                 "status": 404,
                 "message": "You already registered as a guest"
             })
         else:
-            self.event.add_guest(current_user)
+            try:
+                self.event.add_guests([current_user])
+            except exc.IntegrityError:
+                # Concurrent request registered the user first
+                db.session.rollback()
+                return jsonify({
+                    "status": 404,
+                    "message": "You already registered for event"
+                })
+
             return jsonify({
                 "status": 200,
                 "message": "Successfully register as a guest"
@@ -114,14 +138,13 @@ class UserAsGuest(EventResource):
         Response
             Response message with status code
         """
-        if current_user not in self.event.guests:
+        if not self.event.is_guest(current_user):
             return jsonify({
                 "status": 404,
                 "message": "You are not registered as a guest"
             })
         else:
-            self.event.guests.remove(current_user)
-            self.event.save_to_db()
+            self.event.remove_guests([current_user])
 
             return jsonify({
                 "status": 200,
@@ -133,6 +156,13 @@ class EventGuests(EventResource):
     """
     Resource for managing Event guests list
     """
+    @conditional("event-guests", lambda event_id: EventModel.validators_of(id=event_id))
+    def dispatch_request(self, *args, **kwargs):
+        """
+        Answers with 304 if the client has the current list
+        """
+        return super().dispatch_request(*args, **kwargs)
+
     def get(self, event_id: int) -> Response:
         """Method for retrieving a list of event guests
 
@@ -146,9 +176,15 @@ class EventGuests(EventResource):
         Response
             Response message with status code
         """
+        try:
+            schema = sparse_schema(user_short_list_schema, request.args.get("fields"))
+        except ValueError as error:
+            return {"message": str(error)}, 400
+
+        users = UserModel.query.with_parent(self.event, "guests").options(*loader_options(schema))
         return jsonify({
                 "status": 200,
-                "guests": user_short_list_schema.dump(self.event.guests)
+                "guests": compile_schema(schema).dump(users)
             })
 
     @EventResource.admin_or_owner_required
@@ -173,32 +209,31 @@ class EventGuests(EventResource):
                 "message": "Empty or unprovided guests list"
             })
 
-        for username in body.get("guests"):
-            guest = UserModel.find_by_username(username)
-
-            if guest is None:
-                if UserModel.exists_remote(username):
-                    guest = UserModel(username=username)
-                    guest.save_to_db()
-                else:
-                    return jsonify({
-                        "status": 404,
-                        "message": "User <{}> not found".format(username)
-                    })
-
-            if guest in self.event.participants:
-                return jsonify({
-                        "status": 400,
-                        "message": "<{}> already registered for event as participants".format(guest.username)
-                    })
+        guests, missing = self.resolve_users(body.get("guests"))
+        if missing is not None:
+            return jsonify({
+                "status": 404,
+                "message": "User <{}> not found".format(missing)
+            })
 
-            if guest in self.event.guests:
+        roles = self.event.roles_of(guest.id for guest in guests)
+        for guest in guests:
+            if guest.id in roles:
+                db.session.rollback()
                 return jsonify({
                         "status": 400,
-                        "message": "<{}> already registered for event as guest".format(guest.username)
+                        "message": "<{}> already registered for event as {}".format(guest.username, roles[guest.id])
                     })
 
-            self.event.add_guests(guest)
+        try:
+            self.event.add_guests(guests)
+        except exc.IntegrityError:
+            # Concurrent request registered some of the users first
+            db.session.rollback()
+            return jsonify({
+                "status": 404,
+                "message": "Some of the users already registered for event"
+            })
 
         return jsonify({
             "status": 200,
@@ -227,17 +262,18 @@ class EventGuests(EventResource):
                 "message": "Empty or unprovided guests list"
             })
 
-        for username in body.get('guests'):
-            guest = UserModel.find_by_username(username)
+        usernames = list(dict.fromkeys(body.get("guests")))
+        guests = {guest.username: guest for guest in UserModel.find_by_usernames(usernames)}
+        roles = self.event.roles_of(guest.id for guest in guests.values())
 
-            if (guest is None) or (guest not in self.event.guests):
+        for username in usernames:
+            if (username not in guests) or (roles.get(guests[username].id) != "guest"):
                 return jsonify({
                     "status": 404,
                     "message": "User <{}> not in guests list".format(username)
                 })
 
-            self.event.guests.remove(guest)
-            self.event.save_to_db()
+        self.event.remove_guests(list(guests.values()))
 
         return jsonify({
             "status": 200,
@@ -7,12 +7,18 @@ from typing import Dict, Tuple
 from flask import request, Response, jsonify
 from flask_login import login_required, current_user
 from flask_restx import Resource
+from sqlalchemy import exc
 
-from flask_app.models.event import EventModel
+from flask_app import db
+from flask_app.conditional import conditional
+from flask_app.models.event import EventFullError, EventModel
 from flask_app.models.user import UserModel
 from flask_app.pagination.pagination import create_pagination
 from flask_app.resources.event import EventResource
 from flask_app.schemas.event import event_short_list_schema
+from flask_app.schemas.fast import compile_schema
+from flask_app.schemas.loading import loader_options
+from flask_app.schemas.sparse import sparse_schema
 from flask_app.schemas.user import user_short_list_schema
 
 
@@ -28,14 +34,20 @@ class UserEventsAsParticipant(Resource):
         Tuple[Dict, int]
             Response message and status code
         """
+        try:
+            schema = sparse_schema(event_short_list_schema, request.args.get("fields"))
+        except ValueError as error:
+            return {"message": str(error)}, 400
+
         filters = dict(request.args)
         page = int(filters.pop("page", 1))
         limit = int(filters.pop("limit", 2))
 
-        queryset = EventModel.filter_by_participant(user_id=current_user.id)
+        queryset = EventModel.filter_by_participant(user_id=current_user.id).\
+            options(*loader_options(schema))
         paginated_events = queryset.paginate(page, limit, error_out=False)
         response = create_pagination(items=paginated_events,
-                                     schema=event_short_list_schema,
+                                     schema=compile_schema(schema),
                                      page=page,
                                      limit=limit,
                                      base_url=request.base_url)
@@ -61,12 +73,13 @@ class UserAsParticipant(EventResource):
         Response
             Response message with status code
         """
-        if current_user in self.event.participants:
+        role = self.event.role_of(current_user)
+        if role == "participant":
             return jsonify({
                 "status": 200,
                 "message": "You are registered as a participant"
             })
-        elif current_user in self.event.guests:
+        elif role == "guest":
             return jsonify({
                 "status": 200,
                 "message": "You are registered as a guest"
@@ -91,18 +104,32 @@ class UserAsParticipant(EventResource):
         Response
             Response message with status code
         """
-        if current_user in self.event.guests:
+        role = self.event.role_of(current_user)
+        if role == "guest":
             return jsonify({
                 "status": 404,
                 "message": "You already registered as a guest"
             })
-        elif current_user in self.event.participants:
+        elif role == "participant":
             return jsonify({
                 "status": 404,
                 "message": "You already registered as a participant"
             })
         else:
-            self.event.add_participant(current_user)
+            try:
+                self.event.add_participants([current_user])
+            except EventFullError:
+                return jsonify({
+                    "status": 400,
+                    "message": "Event is full"
+                })
+            except exc.IntegrityError:
+                # Concurrent request registered the user first
+                db.session.rollback()
+                return jsonify({
+                    "status": 404,
+                    "message": "You already registered for event"
+                })
 
             return jsonify({
                 "status": 200,
@@ -123,14 +150,13 @@ class UserAsParticipant(EventResource):
         Response
             Response message with status code
         """
-        if current_user not in self.event.participants:
+        if not self.event.is_participant(current_user):
             return jsonify({
                 "status": 404,
                 "message": "You are not registered as a participant"
             })
         else:
-            self.event.participants.remove(current_user)
-            self.event.save_to_db()
+            self.event.remove_participants([current_user])
 
             return jsonify({
                 "status": 200,
@@ -142,6 +168,13 @@ class EventParticipants(EventResource):
     """
     Resource for managing Event participants list
     """
+    @conditional("event-participants", lambda event_id: EventModel.validators_of(id=event_id))
+    def dispatch_request(self, *args, **kwargs):
+        """
+        Answers with 304 if the client has the current list
+        """
+        return super().dispatch_request(*args, **kwargs)
+
     def get(self, event_id: int) -> Response:
         """Method for retrieving a list of event participants
 
@@ -155,9 +188,15 @@ class EventParticipants(EventResource):
         Response
             Response message with status code
         """
+        try:
+            schema = sparse_schema(user_short_list_schema, request.args.get("fields"))
+        except ValueError as error:
+            return {"message": str(error)}, 400
+
+        users = UserModel.query.with_parent(self.event, "participants").options(*loader_options(schema))
         return jsonify({
             "status": 200,
-            "guests": user_short_list_schema.dump(self.event.participants)
+            "guests": compile_schema(schema).dump(users)
         })
 
     @EventResource.admin_or_owner_required
@@ -182,32 +221,37 @@ class EventParticipants(EventResource):
                 "message": "Empty or unprovided participants list"
             })
 
-        for username in body.get('participants'):
-            participant = UserModel.find_by_username(username)
-
-            if participant is None:
-                if UserModel.exists_remote(username):
-                    participant = UserModel(username=username)
-                    participant.save_to_db()
-                else:
-                    return jsonify({
-                        "status": 404,
-                        "message": "User <{}> not found".format(username)
-                    })
-
-            if participant in self.event.guests:
-                return jsonify({
-                        "status": 400,
-                        "message": "<{}> already registered for event as guest".format(participant.username)
-                    })
+        participants, missing = self.resolve_users(body.get('participants'))
+        if missing is not None:
+            return jsonify({
+                "status": 404,
+                "message": "User <{}> not found".format(missing)
+            })
 
-            if participant in self.event.participants:
+        roles = self.event.roles_of(participant.id for participant in participants)
+        for participant in participants:
+            if participant.id in roles:
+                db.session.rollback()
                 return jsonify({
                         "status": 400,
-                        "message": "<{}> already registered for event as participant".format(participant.username)
+                        "message": "<{}> already registered for event as {}".format(participant.username,
+                                                                                   roles[participant.id])
                     })
 
-            self.event.add_participant(participant)
+        try:
+            self.event.add_participants(participants)
+        except EventFullError:
+            return jsonify({
+                "status": 400,
+                "message": "Event has not enough free places"
+            })
+        except exc.IntegrityError:
+            # Concurrent request registered some of the users first
+            db.session.rollback()
+            return jsonify({
+                "status": 404,
+                "message": "Some of the users already registered for event"
+            })
 
         return jsonify({
             "status": 200,
@@ -236,17 +280,19 @@ class EventParticipants(EventResource):
                 "message": "Empty or unprovided participants list"
             })
 
-        for username in body.get('participants'):
-            participant = UserModel.find_by_username(username)
+        usernames = list(dict.fromkeys(body.get('participants')))
+        participants = {participant.username: participant
+                        for participant in UserModel.find_by_usernames(usernames)}
+        roles = self.event.roles_of(participant.id for participant in participants.values())
 
-            if (participant is None) or (participant not in self.event.participants):
+        for username in usernames:
+            if (username not in participants) or (roles.get(participants[username].id) != "participant"):
                 return jsonify({
                     "status": 404,
                     "message": "User <{}> not in participants list".format(username)
                 })
 
-            self.event.participants.remove(participant)
-            self.event.save_to_db()
+        self.event.remove_participants(list(participants.values()))
 
         return jsonify({
             "status": 200,
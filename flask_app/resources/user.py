@@ -10,8 +10,12 @@ from flask_login import current_user, login_required
 from flask_restx import Resource
 
 from flask_app.auth.checkers import admin_required
+from flask_app.conditional import is_not_modified, not_modified, validators
 from flask_app.models.user import UserModel
-from flask_app.pagination.pagination import create_pagination
+from flask_app.pagination.pagination import create_pagination, create_cursor_pagination
+from flask_app.schemas.fast import compile_schema
+from flask_app.schemas.loading import loader_options
+from flask_app.schemas.sparse import sparse_schema
 from flask_app.schemas.user import user_full_schema, user_short_list_schema
 
 
@@ -72,13 +76,29 @@ class UserList(Resource):
         Tuple[Dict, int]
             Response message and status code
         """
+        try:
+            schema = sparse_schema(user_short_list_schema, request.args.get("fields"))
+        except ValueError as error:
+            return {"message": str(error)}, 400
+
         filters = dict(request.args)
-        page = int(filters.pop("page", 1))
         limit = int(filters.pop("limit", 2))
 
-        paginated_users = UserModel.query.paginate(page, limit, error_out=False)
+        if filters.pop("pagination", None) == "cursor" or "cursor" in filters:
+            response = create_cursor_pagination(query=UserModel.query.options(*loader_options(schema)),
+                                                schema=compile_schema(schema),
+                                                sort_keys=[(UserModel.id, False)],
+                                                cursor=filters.pop("cursor", None),
+                                                limit=limit,
+                                                total=filters.pop("total", None),
+                                                query_params=filters,
+                                                base_url=request.base_url)
+            return response, 200
+
+        page = int(filters.pop("page", 1))
+        paginated_users = UserModel.query.options(*loader_options(schema)).paginate(page, limit, error_out=False)
         response = create_pagination(items=paginated_users,
-                                     schema=user_short_list_schema,
+                                     schema=compile_schema(schema),
                                      page=page,
                                      limit=limit,
                                      query_params=filters,
@@ -135,7 +155,10 @@ class RetrieveUpdateDestroyUser(UserResource):
         Tuple[Dict, int]
             Response message and status code
         """
-        return user_full_schema.dump(self.user), 200
+        headers = validators("user", self.user.id, self.user.version, self.user.updated_at)
+        if is_not_modified(headers):
+            return not_modified(headers)
+        return compile_schema(user_full_schema).dump(self.user), 200, headers
 
     @UserResource.admin_or_owner_required
     def patch(self, username: str) -> Tuple[Dict, int]:
@@ -165,6 +188,8 @@ class RetrieveUpdateDestroyUser(UserResource):
         for key_name in user_json.keys():
             if key_name not in self.user.__table__.columns:
                 return {"message": "<{}> no such attribute in user data".format(key_name)}, 404
+            if key_name in UserModel.VERSION_FIELDS:
+                return {"message": "<{}> attribute of user can not be changed".format(key_name)}, 400
 
         self.user.update_in_db(data=user_json)
         return user_full_schema.dump(self.user), 200
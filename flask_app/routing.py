@@ -0,0 +1,100 @@
+"""
+Module with routing of read-only requests to database replicas
+"""
+import random
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from flask import Flask, Response, g, has_request_context, request, session
+from flask_sqlalchemy import SignallingSession, SQLAlchemy
+from sqlalchemy import orm
+
+READ_METHODS = ("GET", "HEAD", "OPTIONS")
+REPLICA_PREFIX = "replica_"
+STICKY_SESSION_KEY = "_primary_until"
+
+
+def replica_keys(app: Flask):
+    """
+    Returns bind keys of the configured replicas
+    """
+    return [key for key in app.config.get("SQLALCHEMY_BINDS") or {} if key.startswith(REPLICA_PREFIX)]
+
+
+def _route(app: Flask) -> Optional[str]:
+    """Function for choosing replica for the current request, once per request
+
+    Parameters
+    ----------
+    app : Flask
+        Application
+
+    Returns
+    -------
+    Optional[str]
+        Replica bind key, None for the primary database
+    """
+    if not has_request_context():
+        return None
+
+    if "_db_route" not in g:
+        keys = replica_keys(app)
+        read_only = request.method in READ_METHODS and session.get(STICKY_SESSION_KEY, 0) < time.time()
+        g._db_route = random.choice(keys) if keys and read_only else None
+    return g._db_route
+
+
+@contextmanager
+def use_primary():
+    """
+    Context manager for sending the current request queries to the primary database
+    """
+    previous = g.get("_db_route")
+    g._db_route = None
+    try:
+        yield
+    finally:
+        g._db_route = previous
+
+
+class RoutingSession(SignallingSession):
+    """
+    Session sending queries of read-only requests to replicas
+    and everything else, including flushes, to the primary database
+    """
+    def __init__(self, db, *args, **kwargs):
+        self._routing_db = db
+        super().__init__(db, *args, **kwargs)
+
+    def get_bind(self, mapper=None, clause=None):
+        if not self._flushing:
+            bind_key = _route(self.app)
+            if bind_key is not None:
+                return self._routing_db.get_engine(self.app, bind=bind_key)
+        return super().get_bind(mapper, clause)
+
+
+class RoutingSQLAlchemy(SQLAlchemy):
+    """
+    SQLAlchemy extension with replica aware sessions
+    """
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+
+def init_routing(app: Flask) -> None:
+    """Function for enabling read-your-writes stickiness: after a successful
+    write request the user reads from the primary database for
+    DB_REPLICA_STICKY_SECONDS seconds
+
+    Parameters
+    ----------
+    app : Flask
+        Application
+    """
+    @app.after_request
+    def stick_to_primary(response: Response) -> Response:
+        if replica_keys(app) and request.method not in READ_METHODS and response.status_code < 400:
+            session[STICKY_SESSION_KEY] = time.time() + app.config["DB_REPLICA_STICKY_SECONDS"]
+        return response
@@ -4,7 +4,7 @@ Module with Event Schema
 
 from typing import Dict
 
-from marshmallow import fields, post_load
+from marshmallow import fields, post_load, validate
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 
 from flask_app.models.event import EventModel
@@ -37,6 +37,10 @@ class EventSchema(SQLAlchemyAutoSchema):
             'null': 'Sorry, End datetime field cannot be null',
             'invalid': 'Sorry, End datetime field must be in format YYYY-MM-DD HH:MM'})
 
+    capacity = fields.Integer(
+        allow_none=True,
+        validate=validate.Range(min=0, error="Sorry, Capacity field must be a non-negative number"))
+
     participants = fields.Nested(user_short_list_schema, many=True)
     guests = fields.Nested(user_short_list_schema, many=True)
     artifacts = fields.Nested(artifact_list_schema, many=True)
@@ -53,9 +57,10 @@ class EventSchema(SQLAlchemyAutoSchema):
         model = EventModel
         fields = ("id", "title", "summary", "status",
                   "dt_start", "dt_end",
+                  "capacity", "participant_count", "guest_count",
                   "owner", "participants", "guests",
                   "artifacts")
-        dump_only = ("id", "status", "participants", "guests", "owner")
+        dump_only = ("id", "status", "participant_count", "guest_count", "participants", "guests", "owner")
 
     @post_load
     def make_event(self, data: Dict, **kwargs) -> EventModel:
@@ -0,0 +1,144 @@
+"""
+Module with precompiled dump functions for marshmallow schemas
+"""
+from typing import Any, Callable, Dict, List, Tuple
+
+from marshmallow import Schema, fields
+
+from flask_app.metrics.instrumentation import timed
+
+Getter = Callable[[Any], Any]
+
+
+def _datetime(value):
+    return value.isoformat()
+
+
+def _boolean(field: fields.Boolean) -> Getter:
+    def serialize(value):
+        if value in field.truthy:
+            return True
+        if value in field.falsy:
+            return False
+        return bool(value)
+    return serialize
+
+
+def _field_serializer(name: str, field: fields.Field) -> Getter:
+    """Function for building specialized serializer of the field value,
+    fields without specialization fall back to the marshmallow implementation
+
+    Parameters
+    ----------
+    name : str
+        Field name in schema
+    field : fields.Field
+        Schema field
+
+    Returns
+    -------
+    Getter
+        Function which takes object and returns serialized attribute
+    """
+    attribute = field.attribute or name
+
+    if isinstance(field, fields.Nested):
+        dump = compile_schema(field.schema).dump_one
+        if field.many:
+            return lambda obj: [dump(item) for item in getattr(obj, attribute)]
+        return lambda obj: None if getattr(obj, attribute) is None else dump(getattr(obj, attribute))
+
+    if type(field) is fields.DateTime and field.format in (None, "iso", "iso8601"):
+        convert = _datetime
+    elif type(field) is fields.String:
+        convert = str
+    elif type(field) is fields.Integer and not field.as_string:
+        convert = int
+    elif type(field) is fields.Boolean:
+        convert = _boolean(field)
+    else:
+        return lambda obj: field.serialize(name, obj)
+
+    def serialize(obj):
+        value = getattr(obj, attribute)
+        return None if value is None else convert(value)
+    return serialize
+
+
+class CompiledSchema:
+    """
+    Schema replacement with dump compiled from the schema field set,
+    output is the same as of the marshmallow dump
+    """
+    def __init__(self, schema: Schema):
+        """
+        Compiles dump function of the schema
+        """
+        self.schema = schema
+        self.many = schema.many
+        self._fields: List[Tuple[str, Getter]] = [
+            (field.data_key or name, _field_serializer(name, field))
+            for name, field in schema.dump_fields.items()
+        ]
+
+    def dump_one(self, obj) -> Dict:
+        """Method for serializing a single object
+
+        Parameters
+        ----------
+        obj
+            Object for serialization
+
+        Returns
+        -------
+        Dict
+            Serialized object
+        """
+        return {key: serialize(obj) for key, serialize in self._fields}
+
+    def dump(self, obj, *, many: bool = None):
+        """Method for serializing an object or a collection,
+        same as Schema.dump
+
+        Parameters
+        ----------
+        obj
+            Object or collection for serialization
+        many : bool
+            Whether obj is a collection, schema default if not provided
+
+        Returns
+        -------
+        Dict or List[Dict]
+            Serialized data
+        """
+        many = self.many if many is None else many
+        if many:
+            # Lazy querysets are executed before timing, so SQL time is not counted twice
+            obj = list(obj)
+        with timed("serialization"):
+            if many:
+                return [self.dump_one(item) for item in obj]
+            return self.dump_one(obj)
+
+
+_compiled: Dict[int, CompiledSchema] = {}
+
+
+def compile_schema(schema: Schema) -> CompiledSchema:
+    """Function for getting compiled version of the schema,
+    every schema instance is compiled once
+
+    Parameters
+    ----------
+    schema : Schema
+        Marshmallow schema without pre/post dump hooks
+
+    Returns
+    -------
+    CompiledSchema
+    """
+    compiled = _compiled.get(id(schema))
+    if compiled is None:
+        compiled = _compiled[id(schema)] = CompiledSchema(schema)
+    return compiled
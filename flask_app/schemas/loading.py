@@ -0,0 +1,83 @@
+"""
+Module with ORM loading strategies derived from schemas
+"""
+from typing import List
+
+from marshmallow import Schema, fields
+from sqlalchemy.orm import ColumnProperty, RelationshipProperty, joinedload, load_only, selectinload
+from sqlalchemy.orm.attributes import InstrumentedAttribute
+from sqlalchemy.orm.strategy_options import Load
+
+
+def loaded_columns(schema: Schema, *extra: InstrumentedAttribute) -> List[str]:
+    """Function for getting names of the columns needed for dumping by the schema:
+    dumped columns, foreign keys of the dumped many-to-one relationships
+    and columns listed in LOAD_DEPENDENCIES of the model for computed fields
+
+    Parameters
+    ----------
+    schema : Schema
+        Model schema for serialization
+    extra : InstrumentedAttribute
+        Columns needed besides the schema, e.g. sort keys
+
+    Returns
+    -------
+    List[str]
+        Column attribute names, empty if some field can not be resolved
+    """
+    model = schema.opts.model
+    dependencies = getattr(model, "LOAD_DEPENDENCIES", {})
+    columns = [column.key for column in extra]
+
+    for name, field in schema.dump_fields.items():
+        attribute = field.attribute or name
+        if attribute in dependencies:
+            columns.extend(dependencies[attribute])
+            continue
+
+        prop = getattr(getattr(model, attribute, None), "property", None)
+        if isinstance(prop, ColumnProperty):
+            columns.append(attribute)
+        elif isinstance(prop, RelationshipProperty):
+            if not prop.uselist:
+                columns.extend(column.key for column in prop.local_columns)
+        else:
+            # Unknown property may read any column
+            return []
+    return list(dict.fromkeys(columns))
+
+
+def loader_options(schema: Schema, *extra: InstrumentedAttribute) -> List[Load]:
+    """Function for getting loading options for every column and relationship
+    dumped by the schema, so serialization runs a fixed number of queries
+    and the rest of columns is not selected.
+    Collections are loaded by one extra SELECT ... IN query,
+    single objects are joined to the main query
+
+    Parameters
+    ----------
+    schema : Schema
+        Model schema for serialization
+    extra : InstrumentedAttribute
+        Columns needed besides the schema, e.g. sort keys
+
+    Returns
+    -------
+    List[Load]
+        Options for Query.options
+    """
+    model = schema.opts.model
+    options = []
+
+    columns = loaded_columns(schema, *extra)
+    if columns:
+        options.append(load_only(*columns))
+
+    for name, field in schema.dump_fields.items():
+        if isinstance(field, fields.Nested):
+            relationship = getattr(model, field.attribute or name)
+            option = selectinload(relationship) if field.many else joinedload(relationship)
+            nested_columns = loaded_columns(field.schema)
+            options.append(option.load_only(*nested_columns) if nested_columns else option)
+    return options
@@ -0,0 +1,45 @@
+"""
+Module with sparse fieldsets of schemas requested by clients
+"""
+from typing import Dict, Optional, Tuple
+
+from marshmallow import Schema
+
+_sparse: Dict[Tuple[int, Tuple[str, ...]], Schema] = {}
+
+
+def sparse_schema(schema: Schema, fields: Optional[str] = None) -> Schema:
+    """Function for restricting schema to the requested fields,
+    every restriction is created once and kept for compile_schema
+
+    Parameters
+    ----------
+    schema : Schema
+        Schema with all allowed fields
+    fields : Optional[str]
+        Comma separated field names, all fields of the schema if not provided
+
+    Returns
+    -------
+    Schema
+        Schema dumping only the requested fields in the original order
+
+    Raises
+    ------
+    ValueError
+        If some of the fields is not dumped by the schema
+    """
+    if not fields:
+        return schema
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(schema.dump_fields)
+    if unknown:
+        raise ValueError("Unknown fields: {}".format(", ".join(sorted(unknown))))
+
+    only = tuple(name for name in schema.dump_fields if name in requested)
+    key = (id(schema), only)
+    restricted = _sparse.get(key)
+    if restricted is None:
+        restricted = _sparse[key] = schema.__class__(only=only, many=schema.many)
+    return restricted
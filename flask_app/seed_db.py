@@ -1,11 +1,20 @@
+import csv
+import io
+import random
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
 from faker import Faker
+from werkzeug.security import generate_password_hash
 
 from flask_app import db
-from flask_app.models.event import EventModel
+from flask_app.models.event import EventModel, EventGuestModel, EventParticipantModel
 from flask_app.models.user import UserModel
 from sqlalchemy.sql.expression import func
 from random import randint
 
+SEED_PASSWORD = "123456789"
+
 
 def seed_event(count: int = 10):
     fake = Faker()
@@ -18,12 +27,13 @@ def seed_event(count: int = 10):
                            dt_start=start_datetime,
                            dt_end=end_datetime,
                            owner=UserModel.query.order_by(func.random()).first())
+        event.save_to_db()
 
         for user in UserModel.query.order_by(func.random()).limit(randint(1, 4)):
             event.add_participant(user)
 
         for user in UserModel.query.order_by(func.random()).limit(randint(1, 8)):
-            if user not in event.participants:
+            if not event.is_participant(user):
                 event.add_guest(user)
 
         event.save_to_db()
@@ -31,11 +41,99 @@ def seed_event(count: int = 10):
 
 def seed_users(count: int = 50):
     fake = Faker()
+    password = generate_password_hash(SEED_PASSWORD)
     usernames = {fake.first_name().lower() for _ in range(count)}
     usernames.update({"kelly", "marie", "vincent"})
     for username in usernames:
         user = UserModel(username=username,
-                         password="123456789",
+                         _password=password,
                          first_name=fake.first_name(),
                          last_name=fake.first_name())
         user.save_to_db()
+
+
+def batches(rows: Iterable[Tuple], size: int) -> Iterator[List[Tuple]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def bulk_load(table, columns: Sequence[str], rows: Iterable[Tuple], batch_size: int = 10000):
+    """
+    Loads rows with COPY on PostgreSQL and batched inserts elsewhere
+    """
+    connection = db.session.connection()
+    if connection.dialect.name == "postgresql":
+        cursor = connection.connection.cursor()
+        statement = 'COPY "{}" ({}) FROM STDIN WITH (FORMAT csv)'.format(table.name, ", ".join(columns))
+        for batch in batches(rows, batch_size):
+            buffer = io.StringIO()
+            csv.writer(buffer).writerows(batch)
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+    else:
+        for batch in batches(rows, batch_size):
+            connection.execute(table.insert(), [dict(zip(columns, row)) for row in batch])
+
+
+def seed_bulk(users: int = 1000, events: int = 1000, participants: int = 4, guests: int = 8,
+              reserved: int = 0, seed: int = 42, batch_size: int = 10000):
+    """
+    Generates users, events and memberships in memory and loads them in batches.
+    The first generated user is admin, the first and the last `reserved` users
+    are never registered for events. All users have the SEED_PASSWORD password.
+    Raises ValueError if there are less registrable users than members per event
+    """
+    if users - 1 - reserved < participants + guests:
+        raise ValueError("{} members per event need at least {} users, {} given".format(
+            participants + guests, participants + guests + 1 + reserved, users))
+
+    rng = random.Random(seed)
+    password = generate_password_hash(SEED_PASSWORD)
+    now = datetime.now().replace(microsecond=0)
+
+    first_user = (db.session.query(func.max(UserModel.id)).scalar() or 0) + 1
+    first_event = (db.session.query(func.max(EventModel.id)).scalar() or 0) + 1
+    user_ids = range(first_user, first_user + users)
+    event_ids = range(first_event, first_event + events)
+
+    bulk_load(UserModel.__table__,
+              ("id", "username", "_password", "first_name", "last_name", "email", "is_admin"),
+              ((user_id, "user{}".format(user_id), password, "First{}".format(user_id),
+                "Last{}".format(user_id), "user{}@example.com".format(user_id), user_id == first_user)
+               for user_id in user_ids),
+              batch_size)
+
+    def event_rows():
+        for event_id in event_ids:
+            dt_start = now + timedelta(minutes=rng.randint(-525600, 525600))
+            yield (event_id, "Event {}".format(event_id), "Summary of event {}".format(event_id),
+                   dt_start, dt_start + timedelta(hours=rng.randint(1, 72)), rng.choice(user_ids),
+                   participants, guests)
+
+    # Every event gets exactly `participants` participants and `guests` guests below
+    bulk_load(EventModel.__table__, ("id", "title", "summary", "dt_start", "dt_end", "owner_id",
+                                     "participant_count", "guest_count"),
+              event_rows(), batch_size)
+
+    # Both tables are generated from the same random state to stay disjoint per event
+    members = user_ids[1:len(user_ids) - reserved]
+    state = rng.getstate()
+    for model, column, chosen in ((EventParticipantModel, "participant_id", slice(0, participants)),
+                                  (EventGuestModel, "guest_id", slice(participants, participants + guests))):
+        rng.setstate(state)
+        rows = ((event_id, user_id)
+                for event_id in event_ids
+                for user_id in rng.sample(members, participants + guests)[chosen])
+        bulk_load(model.__table__, ("event_id", column), rows, batch_size)
+
+    if db.session.get_bind().dialect.name == "postgresql":
+        for table in ("user", "event"):
+            db.session.execute("SELECT setval(pg_get_serial_sequence('\"{0}\"', 'id'), "
+                               "(SELECT MAX(id) FROM \"{0}\"))".format(table))
+    db.session.commit()
@@ -0,0 +1,71 @@
+"""
+Module with the startup profile: import time of every module
+loaded while the application is created
+"""
+import json
+import re
+import subprocess
+import sys
+from typing import List, NamedTuple, Tuple
+
+_IMPORT_TIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+_STARTUP_CODE = """
+import json, time
+started = time.perf_counter()
+from flask_app import create_app
+imported = time.perf_counter()
+create_app(resources={resources})
+print(json.dumps({{"import": imported - started, "create_app": time.perf_counter() - imported}}))
+"""
+
+
+class ImportTime(NamedTuple):
+    """
+    Import of a module, times are in microseconds
+    """
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_import_times(output: str) -> List[ImportTime]:
+    """Function for parsing output of python -X importtime
+
+    Parameters
+    ----------
+    output : str
+        Standard error of the interpreter
+
+    Returns
+    -------
+    List[ImportTime]
+        Imports in the order of completion
+    """
+    imports = []
+    for line in output.splitlines():
+        match = _IMPORT_TIME.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append(ImportTime(module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return imports
+
+
+def startup_profile(resources: bool = True) -> Tuple[List[ImportTime], dict]:
+    """Function for profiling the application startup in a fresh interpreter,
+    so modules cached by the current process are measured too
+
+    Parameters
+    ----------
+    resources : bool
+        Whether create_app registers the API resources
+
+    Returns
+    -------
+    Tuple[List[ImportTime], dict]
+        Import times of all modules and seconds spent in the package import and create_app
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", _STARTUP_CODE.format(resources=resources)],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    return parse_import_times(result.stderr), json.loads(result.stdout.splitlines()[-1])
@@ -1,27 +1,45 @@
-from flask_app.auth.login import Login, Logout, SignUp
-from flask_app.resources.event import UserEventsAsOwner, EventList, RetrieveUpdateDestroyEvent
-from flask_app.resources.guest import UserEventsAsGuest, UserAsGuest, EventGuests
-from flask_app.resources.participant import UserEventsAsParticipant, UserAsParticipant, EventParticipants
-from flask_app.resources.user import UserList, RetrieveUpdateDestroyUser
-from . import api
-
-# user login - post
-api.add_resource(Login, "/login")
-api.add_resource(SignUp, "/signup")
-api.add_resource(Logout, "/logout")
-
-api.add_resource(UserList, "/user")
-api.add_resource(RetrieveUpdateDestroyUser, "/user/<string:username>")
-
-api.add_resource(EventList, "/event")
-api.add_resource(RetrieveUpdateDestroyEvent, "/event/<int:event_id>")
-api.add_resource(EventParticipants, "/event/<int:event_id>/participants")
-api.add_resource(EventGuests, "/event/<int:event_id>/guests")
-
-# To take part in event
-api.add_resource(UserAsGuest, "/event/<int:event_id>/me_guest")
-api.add_resource(UserAsParticipant, "/event/<int:event_id>/me_participant")
-
-api.add_resource(UserEventsAsParticipant, "/where_i_participant")
-api.add_resource(UserEventsAsGuest, "/where_i_guest")
-api.add_resource(UserEventsAsOwner, "/my_events")
+"""
+Module with the API routes, resources are imported when registered
+"""
+from importlib import import_module
+
+from flask_restx import Api
+
+RESOURCES = [
+    # user login - post
+    ("flask_app.auth.login:Login", "/login"),
+    ("flask_app.auth.login:SignUp", "/signup"),
+    ("flask_app.auth.login:Logout", "/logout"),
+
+    ("flask_app.resources.user:UserList", "/user"),
+    ("flask_app.resources.user:RetrieveUpdateDestroyUser", "/user/<string:username>"),
+
+    ("flask_app.resources.event:EventList", "/event"),
+    ("flask_app.resources.event:EventImport", "/event/import"),
+    ("flask_app.resources.event:RetrieveUpdateDestroyEvent", "/event/<int:event_id>"),
+    ("flask_app.resources.participant:EventParticipants", "/event/<int:event_id>/participants"),
+    ("flask_app.resources.guest:EventGuests", "/event/<int:event_id>/guests"),
+
+    # To take part in event
+    ("flask_app.resources.guest:UserAsGuest", "/event/<int:event_id>/me_guest"),
+    ("flask_app.resources.participant:UserAsParticipant", "/event/<int:event_id>/me_participant"),
+
+    ("flask_app.resources.participant:UserEventsAsParticipant", "/where_i_participant"),
+    ("flask_app.resources.guest:UserEventsAsGuest", "/where_i_guest"),
+    ("flask_app.resources.event:UserEventsAsOwner", "/my_events"),
+
+    ("flask_app.resources.export:EventExport", "/export/<string:kind>"),
+]
+
+
+def register_resources(api: Api) -> None:
+    """Function for importing the resources and adding them to the API
+
+    Parameters
+    ----------
+    api : Api
+        API of the application
+    """
+    for path, url in RESOURCES:
+        module, name = path.split(":")
+        api.add_resource(getattr(import_module(module), name), url)
@@ -0,0 +1,128 @@
+"""
+Module with the production server configuration
+
+Usage:
+    gunicorn -c gunicorn.conf.py
+
+Every setting can be overridden with environment variables. By default
+the application is loaded once in the master process and forked into
+WEB_WORKERS processes with WEB_THREADS threads each.
+
+Threads per worker match the database pool (DB_POOL_SIZE + DB_MAX_OVERFLOW),
+so a request never waits for a connection. Workers are 2 * CPU + 1, limited
+by DB_MAX_CONNECTIONS: every worker has its own pool, and the pools of all
+workers must fit into the database connection limit minus
+DB_RESERVED_CONNECTIONS (artifact workers, migrations, admin sessions).
+
+Set WEB_WORKER_CLASS=uvicorn.workers.UvicornWorker and WEB_APP=flask_app.asgi:create_asgi_app()
+to serve the ASGI application with the same process model.
+
+Every worker has its own metrics registry. Workers write snapshots of it
+into METRICS_MULTIPROC_DIR, a directory per server in worker_tmp_dir by
+default, at most every METRICS_FLUSH_SECONDS and on every scrape, so
+/metrics served by any worker returns totals of all workers. Totals lag
+behind other workers by up to METRICS_FLUSH_SECONDS, gauges are reported
+per worker with the worker label.
+"""
+import multiprocessing
+import os
+from os import getenv
+
+pool_connections = int(getenv("DB_POOL_SIZE", 5)) + int(getenv("DB_MAX_OVERFLOW", 5))
+db_connections = int(getenv("DB_MAX_CONNECTIONS", 100)) - int(getenv("DB_RESERVED_CONNECTIONS", 10))
+
+wsgi_app = getenv("WEB_APP", "flask_app:create_app()")
+bind = getenv("WEB_BIND", "0.0.0.0:5000")
+
+worker_class = getenv("WEB_WORKER_CLASS", "gthread")
+threads = int(getenv("WEB_THREADS", pool_connections))
+workers = int(getenv("WEB_WORKERS", 0)) or max(1, min(2 * multiprocessing.cpu_count() + 1,
+                                                      db_connections // pool_connections))
+
+# Application is imported once and shared by the forked workers
+preload_app = True
+
+# Workers are replaced after a random amount of requests around WEB_MAX_REQUESTS,
+# so memory growth is bounded and workers do not restart at the same moment
+max_requests = int(getenv("WEB_MAX_REQUESTS", 1000))
+max_requests_jitter = int(getenv("WEB_MAX_REQUESTS_JITTER", max_requests // 10))
+
+# Stopped workers finish requests in progress within graceful_timeout
+timeout = int(getenv("WEB_TIMEOUT", 30))
+graceful_timeout = int(getenv("WEB_GRACEFUL_TIMEOUT", 30))
+keepalive = int(getenv("WEB_KEEPALIVE", 5))
+backlog = int(getenv("WEB_BACKLOG", 2048))
+
+# Heartbeat files in memory, container /tmp may be a slow overlay filesystem
+worker_tmp_dir = getenv("WEB_WORKER_TMP_DIR", "/dev/shm")
+
+# Set before the application is loaded, see flask_app.metrics.multiprocess
+metrics_dir = os.environ.setdefault("METRICS_MULTIPROC_DIR", os.path.join(
+    worker_tmp_dir, "flask_events_metrics_{}".format(os.getpid())))
+
+accesslog = getenv("WEB_ACCESS_LOG", "-")
+loglevel = getenv("WEB_LOG_LEVEL", "info")
+
+
+def dispose_engines(application) -> None:
+    """
+    Closes pooled connections of the primary database and replicas
+    """
+    from flask_app import db
+
+    # ASGI application keeps the Flask application in its state
+    app = getattr(getattr(application, "state", None), "flask_app", application)
+    for bind in [None, *(app.config.get("SQLALCHEMY_BINDS") or {})]:
+        db.get_engine(app, bind=bind).dispose()
+
+
+def remove_metrics_snapshots() -> None:
+    """
+    Removes snapshots of the worker metrics, other files of the directory are kept
+    """
+    for file_name in os.listdir(metrics_dir):
+        if file_name.endswith(".json"):
+            os.remove(os.path.join(metrics_dir, file_name))
+
+
+def on_starting(server):
+    # Snapshots of a previous server in the same directory must not be summed
+    os.makedirs(metrics_dir, exist_ok=True)
+    remove_metrics_snapshots()
+
+
+def pre_fork(server, worker):
+    # Connections opened while preloading must not be shared with workers
+    dispose_engines(server.app.wsgi())
+
+
+def post_fork(server, worker):
+    # Values observed by the master while preloading are not counted by every worker
+    from flask_app.metrics.prometheus import registry
+
+    registry.reset()
+
+
+def worker_exit(server, worker):
+    # Requests are finished, connections are returned to the database
+    from flask_app.books.client import books_client
+    from flask_app.metrics import multiprocess
+
+    dispose_engines(worker.wsgi)
+    books_client.close()
+    multiprocess.flush()
+
+
+def child_exit(server, worker):
+    from flask_app.metrics import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def on_exit(server):
+    remove_metrics_snapshots()
+    try:
+        os.rmdir(metrics_dir)
+    except OSError:
+        # Directory given by METRICS_MULTIPROC_DIR is not empty
+        pass
@@ -1,9 +1,22 @@
+import click
 from flask.cli import FlaskGroup
+from flask_migrate import stamp
 
-from flask_app import app, db
-from flask_app.seed_db import seed_django_user, seed_users, seed_event
+from flask_app import create_app, db
+from flask_app.export import EXPORT_FORMATS, EXPORT_KINDS
 
-cli = FlaskGroup(app)
+# Commands serving requests, the rest of commands skip resources and schemas
+SERVING_COMMANDS = {"run", "routes", "shell"}
+
+
+def create_cli_app():
+    # Application is loaded by the invoked command, global options do not matter.
+    # Without a command context (the reloader thread of run) resources are registered
+    ctx = click.get_current_context(silent=True)
+    return create_app(resources=ctx is None or ctx.info_name in SERVING_COMMANDS)
+
+
+cli = FlaskGroup(create_app=create_cli_app)
 
 
 @cli.command("create_db")
@@ -12,13 +25,32 @@ def create_db():
     db.drop_all()
     db.create_all()
     db.session.commit()
+    stamp()
 
 
 @cli.command("seed_db")
-def seed_db():
-    seed_django_user()
-    seed_users(5)
-    seed_event(50)
+@click.option("--bulk", is_flag=True, help="Generate data in memory and load it with COPY or batched inserts")
+@click.option("--users", default=None, type=int,
+              help="Amount of users, 5 by default, in bulk mode enough users for members of an event")
+@click.option("--events", default=50, help="Amount of events")
+@click.option("--participants", default=4, help="Participants per event, bulk mode only")
+@click.option("--guests", default=8, help="Guests per event, bulk mode only")
+@click.option("--seed", default=42, help="Random seed, bulk mode only")
+@click.option("--batch-size", default=10000, help="Rows per batch, bulk mode only")
+def seed_db(bulk, users, events, participants, guests, seed, batch_size):
+    from flask_app.seed_db import seed_bulk, seed_users, seed_event
+
+    if bulk:
+        # Admin is never registered for events
+        users = users or participants + guests + 1
+        try:
+            seed_bulk(users=users, events=events, participants=participants, guests=guests,
+                      seed=seed, batch_size=batch_size)
+        except ValueError as error:
+            raise click.BadParameter(str(error), param_hint="--users")
+    else:
+        seed_users(users or 5)
+        seed_event(events)
 
 
 @cli.command("drop_db")
@@ -27,5 +59,71 @@ def drop_db():
     db.session.commit()
 
 
+@cli.command("artifact_workers")
+@click.option("--workers", default=4, help="Amount of worker threads")
+@click.option("--batch-size", default=50, help="Maximal amount of jobs per transaction")
+@click.option("--poll-interval", default=1.0, help="Seconds to wait when there are no pending jobs")
+@click.option("--once", is_flag=True, help="Process pending jobs and exit")
+def artifact_workers(workers, batch_size, poll_interval, once):
+    from flask_app.books.artifacts import process_batch, run_workers
+
+    if once:
+        while process_batch(batch_size):
+            pass
+    else:
+        run_workers(workers, batch_size, poll_interval)
+
+
+@cli.command("rebuild_counters")
+def rebuild_counters():
+    from flask_app.models.event import EventModel
+
+    fixed = EventModel.rebuild_counters()
+    db.session.commit()
+    click.echo("Fixed counters of {} events".format(fixed))
+
+
+@cli.command("run_asgi")
+@click.option("-h", "--host", default="127.0.0.1", help="The interface to bind to")
+@click.option("-p", "--port", default=5000, help="The port to bind to")
+def run_asgi(host, port):
+    import uvicorn
+
+    uvicorn.run("flask_app.asgi:create_asgi_app", factory=True, host=host, port=port)
+
+
+@cli.command("export")
+@click.argument("kind", type=click.Choice(EXPORT_KINDS))
+@click.option("--format", "export_format", default="ndjson", type=click.Choice(list(EXPORT_FORMATS)))
+@click.option("--output", default="-", type=click.File("w"), help="Output file, stdout by default")
+@click.option("--status", default="future", help="Events status: past, current or future")
+@click.option("--title", default=None, help="Events title")
+@click.option("--q", default=None, help="Full-text search query")
+def export(kind, export_format, output, status, title, q):
+    from flask_app.export import export_query, stream_rows
+
+    query_params = {"status": status, "title": title, "q": q}
+    columns, rows = export_query(kind, {key: value for key, value in query_params.items() if value})
+    for chunk in stream_rows(columns, rows, export_format):
+        output.write(chunk)
+
+
+@cli.command("profile_startup", with_appcontext=False)
+@click.option("--top", default=30, help="Amount of the slowest modules")
+@click.option("--sort", "sort_by", default="cumulative", type=click.Choice(["cumulative", "self"]),
+              help="Sort by import time including or excluding nested imports")
+@click.option("--no-resources", is_flag=True, help="Create the application without API resources")
+def profile_startup(top, sort_by, no_resources):
+    from flask_app.startup import startup_profile
+
+    imports, seconds = startup_profile(resources=not no_resources)
+    click.echo("flask_app import: {:.1f}ms, create_app: {:.1f}ms, modules: {}".format(
+        seconds["import"] * 1000, seconds["create_app"] * 1000, len(imports)))
+    click.echo("{:>12} {:>12}  module".format("self ms", "cumulative ms"))
+    for item in sorted(imports, key=lambda item: getattr(item, "{}_us".format(sort_by)), reverse=True)[:top]:
+        click.echo("{:>12.1f} {:>12.1f}  {}{}".format(item.self_us / 1000, item.cumulative_us / 1000,
+                                                     "  " * item.depth, item.module))
+
+
 if __name__ == "__main__":
     cli()
@@ -0,0 +1,25 @@
+"""event time indexes
+
+Revision ID: 3f1c2a7d9b10
+Revises: 
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2a7d9b10'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_event_dt_start_id', 'event', ['dt_start', 'id'], unique=False)
+    op.create_index('ix_event_dt_end_id', 'event', ['dt_end', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_event_dt_end_id', table_name='event')
+    op.drop_index('ix_event_dt_start_id', table_name='event')
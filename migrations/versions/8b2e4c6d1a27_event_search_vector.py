@@ -0,0 +1,30 @@
+"""event search vector
+
+Revision ID: 8b2e4c6d1a27
+Revises: 3f1c2a7d9b10
+Create Date: 2026-10-17 13:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4c6d1a27'
+down_revision = '3f1c2a7d9b10'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("ALTER TABLE event ADD COLUMN search_vector tsvector GENERATED ALWAYS AS "
+               "(to_tsvector('english', coalesce(title, '') || ' ' || coalesce(summary, ''))) STORED")
+    op.execute("CREATE INDEX ix_event_search_vector ON event USING GIN (search_vector)")
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute("DROP INDEX ix_event_search_vector")
+    op.execute("ALTER TABLE event DROP COLUMN search_vector")
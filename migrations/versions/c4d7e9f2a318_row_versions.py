@@ -0,0 +1,28 @@
+"""row versions
+
+Revision ID: c4d7e9f2a318
+Revises: 8b2e4c6d1a27
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d7e9f2a318'
+down_revision = '8b2e4c6d1a27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('event', 'user'):
+        op.add_column(table, sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+        op.add_column(table, sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=False))
+
+
+def downgrade():
+    for table in ('user', 'event'):
+        op.drop_column(table, 'updated_at')
+        op.drop_column(table, 'version')
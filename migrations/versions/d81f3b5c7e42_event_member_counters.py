@@ -0,0 +1,34 @@
+"""event member counters
+
+Revision ID: d81f3b5c7e42
+Revises: c4d7e9f2a318
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd81f3b5c7e42'
+down_revision = 'c4d7e9f2a318'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('event', sa.Column('guest_count', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('event', sa.Column('participant_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute("UPDATE event SET "
+               "guest_count = (SELECT COUNT(*) FROM event_guest WHERE event_guest.event_id = event.id), "
+               "participant_count = (SELECT COUNT(*) FROM event_participant "
+               "WHERE event_participant.event_id = event.id)")
+    op.create_index('ix_event_guest_count_id', 'event', ['guest_count', 'id'], unique=False)
+    op.create_index('ix_event_participant_count_id', 'event', ['participant_count', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_event_participant_count_id', table_name='event')
+    op.drop_index('ix_event_guest_count_id', table_name='event')
+    op.drop_column('event', 'participant_count')
+    op.drop_column('event', 'guest_count')
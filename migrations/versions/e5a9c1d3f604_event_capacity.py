@@ -0,0 +1,28 @@
+"""event capacity
+
+Revision ID: e5a9c1d3f604
+Revises: d81f3b5c7e42
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5a9c1d3f604'
+down_revision = 'd81f3b5c7e42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('event') as batch_op:
+        batch_op.add_column(sa.Column('capacity', sa.Integer(), nullable=True))
+        batch_op.create_check_constraint('capacity_not_negative_constraint', 'capacity IS NULL OR capacity >= 0')
+
+
+def downgrade():
+    with op.batch_alter_table('event') as batch_op:
+        batch_op.drop_constraint('capacity_not_negative_constraint', type_='check')
+        batch_op.drop_column('capacity')
@@ -0,0 +1,41 @@
+"""artifact job
+
+Revision ID: f6b2d8e4a715
+Revises: e5a9c1d3f604
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6b2d8e4a715'
+down_revision = 'e5a9c1d3f604'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Databases made by create_db already have the table
+    if 'artifact_job' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        'artifact_job',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('event_id', sa.Integer(), nullable=False),
+        sa.Column('participant_id', sa.Integer(), nullable=False),
+        sa.Column('attempts', sa.Integer(), nullable=False),
+        sa.Column('failed', sa.Boolean(), nullable=False),
+        sa.Column('last_error', sa.String(length=256), nullable=True),
+        sa.Column('dt_next_try', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['event_id'], ['event.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['participant_id'], ['user.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_artifact_job_dt_next_try'), 'artifact_job', ['dt_next_try'], unique=False)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_artifact_job_dt_next_try'), table_name='artifact_job')
+    op.drop_table('artifact_job')
@@ -0,0 +1,47 @@
+"""
+Module with the test fixtures. Tests of PostgreSQL specific behaviour
+run against the TEST_DATABASE_URI database, which is recreated for
+the test session, and are skipped if it is not set. Fallbacks for
+other databases are tested with in-memory SQLite
+"""
+import os
+
+import pytest
+
+from flask_app import create_app, db
+from flask_app.seed_db import seed_bulk
+
+
+@pytest.fixture(scope="session")
+def postgres_app():
+    """
+    Returns application connected to the seeded test database
+    """
+    database_uri = os.getenv("TEST_DATABASE_URI")
+    if not database_uri:
+        pytest.skip("TEST_DATABASE_URI is not set")
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": database_uri, "SQLALCHEMY_BINDS": {},
+                      "SECRET_KEY": "test", "TESTING": True})
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed_bulk(users=50, events=200, participants=4, guests=8)
+        db.session.execute("ANALYZE")
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def sqlite_app():
+    """
+    Returns application connected to an empty in-memory SQLite database
+    """
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", "SQLALCHEMY_BINDS": {},
+                      "SECRET_KEY": "test", "TESTING": True})
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
@@ -0,0 +1,54 @@
+"""
+Module with tests of the coalesced lookups of the async books client
+"""
+import asyncio
+
+from flask_app.books.async_client import AsyncBooksClient
+from flask_app.cache.backends import TTLCache
+
+
+def test_cancelled_leader_does_not_block_waiters():
+    async def scenario():
+        client = AsyncBooksClient(cache=TTLCache())
+        started, release, calls = asyncio.Event(), asyncio.Event(), []
+
+        async def fetch_user(username):
+            calls.append(username)
+            started.set()
+            await release.wait()
+            return {"username": username, "books": []}
+
+        client._fetch_user = fetch_user
+        leader = asyncio.ensure_future(client.get_user("author"))
+        await started.wait()
+        waiter = asyncio.ensure_future(client.get_user("author"))
+        await asyncio.sleep(0)
+
+        leader.cancel()
+        await asyncio.sleep(0)
+        release.set()
+        return leader, await asyncio.wait_for(waiter, timeout=1), calls, client
+
+    leader, result, calls, client = asyncio.run(scenario())
+    assert leader.cancelled()
+    assert result == {"username": "author", "books": []}
+    assert calls == ["author", "author"]
+    assert not client._in_flight
+
+
+def test_waiters_share_result_of_leader():
+    async def scenario():
+        client = AsyncBooksClient(cache=TTLCache())
+        calls = []
+
+        async def fetch_user(username):
+            calls.append(username)
+            await asyncio.sleep(0.01)
+            return None
+
+        client._fetch_user = fetch_user
+        return await asyncio.gather(*[client.user_exists("reader") for _ in range(5)]), calls
+
+    results, calls = asyncio.run(scenario())
+    assert results == [False] * 5
+    assert calls == ["reader"]
@@ -0,0 +1,53 @@
+"""
+Module with tests of the streaming bulk import
+"""
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from flask_app import bulk_import
+from flask_app.bulk_import import import_events, iter_json_array
+
+ITEMS = [{"title": "Café", "capacity": 12345, "public": True}, 123456, None, {"rate": -1.5e10}]
+
+
+def parse(body: str):
+    return [item for item, _ in iter_json_array(io.BytesIO(body.encode()))]
+
+
+@pytest.mark.parametrize("read_size", [1, 2, 3, 7, 64])
+def test_items_split_between_chunks(monkeypatch, read_size):
+    monkeypatch.setattr(bulk_import, "READ_SIZE", read_size)
+    assert parse(json.dumps(ITEMS)) == ITEMS
+
+
+@pytest.mark.parametrize("read_size", [1, 7, 64 * 1024])
+def test_malformed_item_is_reported_with_position(monkeypatch, read_size):
+    monkeypatch.setattr(bulk_import, "READ_SIZE", read_size)
+    body = '[{"title": "a"}, {"title": x}, ' + '{"title": "b"}, ' * 100 + '{}]'
+
+    with pytest.raises(ValueError, match="character 27: Expecting value"):
+        parse(body)
+
+
+def test_unterminated_array():
+    with pytest.raises(ValueError, match="Unexpected end of JSON array"):
+        parse('[{"title": "a"}, {"title": "b"}')
+
+
+def test_items_before_parsing_error_are_reported(sqlite_app):
+    dt_start = datetime.now() + timedelta(days=1)
+
+    def items():
+        for number in range(3):
+            yield {"title": "Event {}".format(number), "dt_start": dt_start.isoformat(),
+                   "dt_end": (dt_start + timedelta(hours=1)).isoformat()}, None
+        raise ValueError("Invalid JSON array item at character 100: Expecting value")
+
+    report = import_events(items(), owner_id=None, batch_size=2)
+
+    assert report["created"] == 3
+    assert [row["status"] for row in report["rows"]] == ["created"] * 3
+    assert report["message"] == "Invalid JSON array item at character 100: Expecting value"
@@ -0,0 +1,67 @@
+"""
+Module with tests of the cursor pagination of events
+"""
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from flask_app import db
+from flask_app.models.event import EventModel
+
+
+@pytest.fixture
+def events(sqlite_app):
+    """
+    Returns titles of future events in the ascending dt_end order,
+    events without dt_end are the last ones, their status is not defined
+    """
+    dt_start = datetime.now() + timedelta(days=1)
+    dt_ends = [dt_start + timedelta(days=2), None, dt_start + timedelta(days=1), None,
+               dt_start + timedelta(days=1), dt_start + timedelta(days=3), None]
+    for number, dt_end in enumerate(dt_ends):
+        db.session.add(EventModel(title="Event {}".format(number), dt_start=dt_start, dt_end=dt_end or dt_start))
+    db.session.flush()
+    # Default of the column replaces the missing value on insert
+    EventModel.query.filter(EventModel.title.in_(["Event {}".format(number) for number, dt_end
+                                                  in enumerate(dt_ends) if dt_end is None])).\
+        update({"dt_end": None}, synchronize_session=False)
+    db.session.commit()
+    return ["Event 2", "Event 4", "Event 0", "Event 5", "Event 1", "Event 3", "Event 6"]
+
+
+def walk(client, url: str, direction: str):
+    pages, data = [], None
+    while url:
+        data = client.get(url).get_json()
+        pages.append([event["title"] for event in data["results"]])
+        url = data[direction]
+        assert len(pages) <= 10
+    return pages, data
+
+
+@pytest.mark.parametrize("order", ["asc", "desc"])
+def test_cursor_pages_with_null_sort_keys(sqlite_app, events, order):
+    client = sqlite_app.test_client()
+    expected = events if order == "asc" else events[::-1]
+
+    pages, last_page = walk(client, "/event?pagination=cursor&limit=2&fields=id,title&order_by=dt_end&order=" + order, "next")
+    assert [title for page in pages for title in page] == expected
+
+    # Walk back from the last page to the first one
+    previous_pages, _ = walk(client, last_page["prev"], "prev")
+    assert previous_pages == pages[-2::-1]
+
+
+def test_cursor_links_keep_total(sqlite_app, events):
+    data = sqlite_app.test_client().get("/event?pagination=cursor&limit=2&total=exact").get_json()
+
+    assert data["total"] == len(events)
+    assert parse_qs(urlsplit(data["next"]).query)["total"] == ["exact"]
+
+
+def test_cursor_search_is_rejected(sqlite_app, events):
+    response = sqlite_app.test_client().get("/event?pagination=cursor&q=event")
+
+    assert response.status_code == 400
+    assert "cursor" in response.get_json()["message"]
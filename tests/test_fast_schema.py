@@ -0,0 +1,71 @@
+"""
+Module with tests of the compiled schemas, output must be
+the same as of the marshmallow dump
+"""
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from flask_app import db
+from flask_app.models.artifact import ArtifactModel
+from flask_app.models.event import EventModel
+from flask_app.models.user import UserModel
+from flask_app.schemas.event import event_full_list_schema, event_full_schema, event_short_list_schema
+from flask_app.schemas.fast import compile_schema
+from flask_app.schemas.sparse import sparse_schema
+from flask_app.schemas.user import user_full_list_schema, user_full_schema, user_short_list_schema
+
+
+@pytest.fixture
+def objects(sqlite_app):
+    """
+    Returns users and events with filled and empty relationships and optional values
+    """
+    now = datetime.now()
+    users = [UserModel(username="admin", first_name="First", last_name="Last", email="admin@example.com",
+                       is_admin=True)]
+    users += [UserModel(username="user{}".format(number)) for number in range(4)]
+    db.session.add_all(users)
+    db.session.add_all([
+        EventModel(title="Full event", summary="Summary", dt_start=now + timedelta(days=1),
+                   dt_end=now + timedelta(days=2), capacity=10, owner=users[0],
+                   participants=users[1:3], guests=users[3:],
+                   artifacts=[ArtifactModel(url="/books/1/"), ArtifactModel(url="/books/2/")]),
+        EventModel(title="Empty event", dt_start=now - timedelta(days=2), dt_end=now - timedelta(days=1)),
+    ])
+    db.session.commit()
+    # Instances are loaded from the database as in the endpoints
+    db.session.expunge_all()
+    return UserModel.query.order_by(UserModel.id).all(), EventModel.query.order_by(EventModel.id).all()
+
+
+def assert_same_dump(schema, data, **kwargs):
+    assert json.dumps(compile_schema(schema).dump(data, **kwargs)) == json.dumps(schema.dump(data, **kwargs))
+
+
+@pytest.mark.parametrize("schema", [event_short_list_schema, event_full_list_schema])
+def test_event_list_schemas(objects, schema):
+    assert_same_dump(schema, objects[1])
+
+
+def test_event_schema_without_relationships(objects):
+    assert_same_dump(event_full_schema, objects[1][1])
+    assert_same_dump(event_full_schema, objects[1], many=True)
+
+
+@pytest.mark.parametrize("schema", [user_short_list_schema, user_full_list_schema])
+def test_user_list_schemas(objects, schema):
+    assert_same_dump(schema, objects[0])
+
+
+def test_user_schema_with_empty_values(objects):
+    assert_same_dump(user_full_schema, objects[0][1])
+
+
+def test_sparse_schema_with_empty_datetimes(objects):
+    event = objects[1][1]
+    event.dt_start = event.dt_end = None
+    schema = sparse_schema(event_short_list_schema, "title,dt_start,dt_end,capacity,owner,participant_count")
+    assert_same_dump(schema, [event])
+    assert_same_dump(sparse_schema(event_full_list_schema, "summary,guests,artifacts"), objects[1])
@@ -0,0 +1,25 @@
+"""
+Module with tests of the management commands
+"""
+from flask_app import db
+from flask_app.models.event import EventModel
+from flask_app.models.user import UserModel
+from manage import seed_db
+
+
+def test_seed_db_bulk_defaults(sqlite_app):
+    result = sqlite_app.test_cli_runner().invoke(seed_db, ["--bulk", "--events", "3"])
+
+    assert result.exit_code == 0, result.output
+    assert db.session.query(UserModel).count() == 4 + 8 + 1
+    assert db.session.query(EventModel).count() == 3
+    for event in EventModel.query:
+        assert len(event.participants) == 4
+        assert len(event.guests) == 8
+
+
+def test_seed_db_bulk_too_few_users(sqlite_app):
+    result = sqlite_app.test_cli_runner().invoke(seed_db, ["--bulk", "--users", "5", "--events", "3"])
+
+    assert result.exit_code == 2
+    assert "--users" in result.output
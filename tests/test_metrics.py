@@ -0,0 +1,43 @@
+"""
+Module with tests of the metrics combined from several worker processes
+"""
+import os
+
+from flask_app.metrics import multiprocess
+from flask_app.metrics.prometheus import Registry
+
+
+def worker_registry(requests: int, checked_out: int) -> Registry:
+    registry = Registry()
+    counter = registry.counter("requests_total", "Requests")
+    histogram = registry.histogram("duration_seconds", "Duration", buckets=(1, ))
+    registry.gauge("checked_out", "Connections", lambda: checked_out)
+    for _ in range(requests):
+        counter.inc(endpoint="/event")
+        histogram.observe(0.5, endpoint="/event")
+    return registry
+
+
+def test_render_sums_snapshots_of_workers():
+    snapshots = {"1-1": worker_registry(2, 1).snapshot(), "2-2": worker_registry(3, 4).snapshot()}
+    lines = worker_registry(0, 0).render(snapshots).splitlines()
+
+    assert 'requests_total{endpoint="/event"} 5.0' in lines
+    assert 'duration_seconds_bucket{endpoint="/event",le="1.0"} 5' in lines
+    assert 'duration_seconds_count{endpoint="/event"} 5' in lines
+    assert 'checked_out{worker="1-1"} 1.0' in lines
+    assert 'checked_out{worker="2-2"} 4.0' in lines
+
+
+def test_exited_worker_keeps_counters_without_gauges(tmp_path, monkeypatch):
+    monkeypatch.setattr(multiprocess, "registry", worker_registry(2, 1))
+    monkeypatch.setattr(multiprocess, "METRICS_DIR", str(tmp_path))
+    exited = worker_registry(3, 4)
+    multiprocess._write(str(tmp_path / "999999-1.json"), exited.snapshot())
+
+    multiprocess.mark_process_dead(999999)
+    lines = multiprocess.render().splitlines()
+
+    assert 'requests_total{endpoint="/event"} 5.0' in lines
+    assert ['checked_out{{worker="{}"}} 1.0'.format(multiprocess._process_name())] == \
+        [line for line in lines if line.startswith("checked_out{")]
@@ -0,0 +1,147 @@
+"""
+Module with tests of the amount of queries per request, related
+collections are loaded in bulk, so the amount does not depend
+on the page size or the amount of event members
+"""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Iterator, List
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+
+from flask_app import db
+from flask_app.cache.events import event_cache
+from flask_app.models.event import EventModel
+from flask_app.models.user import UserModel
+from flask_app.seed_db import SEED_PASSWORD
+
+# Members of the small fixtures, large fixtures have twice more
+MEMBERS = 3
+
+
+@contextmanager
+def count_queries(app: Flask) -> Iterator[List[str]]:
+    """
+    Collects statements executed by the application engine
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_engine(app)
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def request_queries(app: Flask, client, url: str) -> int:
+    """
+    Returns amount of statements executed by the successful GET request
+    """
+    with count_queries(app) as statements:
+        response = client.get(url)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return len(statements)
+
+
+@pytest.fixture(scope="module")
+def members(postgres_app):
+    """
+    Creates users owning, visiting and taking part in N and 2N events,
+    and events with N and 2N guests and participants. Returns usernames
+    and event ids of the small and the large fixture
+    """
+    seeded = UserModel.query.filter(UserModel.username.like("user%")).order_by(UserModel.id).\
+        offset(1).limit(4 * MEMBERS).all()
+    dt_start = datetime.now() + timedelta(days=1)
+    fixtures = []
+    for size in (MEMBERS, 2 * MEMBERS):
+        user = UserModel(username="member{}".format(size))
+        user.password = SEED_PASSWORD
+        user.save_to_db()
+
+        events = []
+        for number in range(2 * size + 1):
+            events.append(EventModel(title="Member {} event {}".format(size, number), dt_start=dt_start,
+                                     dt_end=dt_start + timedelta(days=1), owner_id=user.id))
+            events[-1].save_to_db()
+        for event in events[:size]:
+            event.add_guests([user])
+        for event in events[size:2 * size]:
+            event.add_participants([user])
+        events[-1].add_guests(seeded[:size])
+        events[-1].add_participants(seeded[size:2 * size])
+        fixtures.append((user.username, events[-1].id))
+
+    yield fixtures
+
+    for username, _ in fixtures:
+        UserModel.find_by_username(username).delete_from_db()
+
+
+@pytest.mark.parametrize("url", ["/my_events", "/where_i_guest?limit=100", "/where_i_participant?limit=100"])
+def test_user_event_lists_queries_do_not_depend_on_events(postgres_app, members, url):
+    counts = []
+    for username, _ in members:
+        client = postgres_app.test_client()
+        response = client.post("/login", json={"username": username, "password": SEED_PASSWORD})
+        assert response.get_json()["status"] == 200
+        counts.append(request_queries(postgres_app, client, url))
+
+    assert counts[0] == counts[1], counts
+
+
+@pytest.mark.parametrize("kind", ["guests", "participants"])
+def test_event_members_queries_do_not_depend_on_members(postgres_app, members, kind):
+    client = postgres_app.test_client()
+    counts = [request_queries(postgres_app, client, "/event/{}/{}".format(event_id, kind))
+              for _, event_id in members]
+
+    assert counts[0] == counts[1], counts
+
+
+def test_user_list_queries_do_not_depend_on_page_size(postgres_app, members):
+    client = postgres_app.test_client()
+    counts = [request_queries(postgres_app, client, "/user?limit={}".format(limit))
+              for limit in (MEMBERS, 2 * MEMBERS)]
+
+    assert counts[0] == counts[1], counts
+
+
+@pytest.mark.parametrize("pagination", ["", "&pagination=cursor", "&pagination=cursor&total=estimate"])
+def test_event_list_queries_do_not_depend_on_page_size(postgres_app, pagination):
+    client = postgres_app.test_client()
+    counts = []
+    for limit in (1, 5, 25):
+        with count_queries(postgres_app) as statements:
+            response = client.get("/event?status=future&limit={}{}".format(limit, pagination))
+        assert response.status_code == 200
+        assert len(response.get_json()["results"]) == limit
+        counts.append(len(statements))
+
+    assert len(set(counts)) == 1, counts
+
+
+def test_event_detail_queries_do_not_depend_on_members(postgres_app):
+    seeded = EventModel.query.order_by(EventModel.id).first()
+    empty = EventModel(title="Event without members", dt_start=datetime.now() + timedelta(days=1),
+                       dt_end=datetime.now() + timedelta(days=2), owner_id=seeded.owner_id)
+    empty.save_to_db()
+    assert seeded.participant_count and seeded.guest_count
+
+    client = postgres_app.test_client()
+    event_cache.clear()
+    counts = []
+    for event_id in (seeded.id, empty.id):
+        with count_queries(postgres_app) as statements:
+            response = client.get("/event/{}".format(event_id))
+        assert response.status_code == 200
+        counts.append(len(statements))
+
+    empty.delete_from_db()
+    assert counts[0] == counts[1], counts
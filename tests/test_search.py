@@ -0,0 +1,55 @@
+"""
+Module with tests of the event search fallback for databases
+without full-text search and of the search links
+"""
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from flask_app import db
+from flask_app.models.event import EventModel
+
+TITLES = {
+    "Open air music": "Concert in the park",
+    "Music in the open": None,
+    "Jazz night": "Live MUSIC and drinks",
+    "Art house": "Open studio",
+}
+
+
+@pytest.fixture
+def events(sqlite_app):
+    dt_start = datetime.now() + timedelta(days=1)
+    for number, (title, summary) in enumerate(TITLES.items()):
+        db.session.add(EventModel(title=title, summary=summary, dt_start=dt_start + timedelta(hours=number),
+                                  dt_end=dt_start + timedelta(days=1)))
+    db.session.commit()
+
+
+def search_titles(text: str):
+    query, rank = EventModel.search(text)
+    return {event.title for event in query}, rank
+
+
+def test_search_fallback_matches_title_and_summary(events):
+    titles, rank = search_titles("music")
+    assert titles == {"Open air music", "Music in the open", "Jazz night"}
+    assert rank is None
+
+
+def test_search_fallback_requires_every_word(events):
+    assert search_titles("open music")[0] == {"Open air music", "Music in the open"}
+    assert search_titles("OPEN studio")[0] == {"Art house"}
+    assert search_titles("open jazz")[0] == set()
+
+
+def test_search_link_keeps_query(sqlite_app, events):
+    response = sqlite_app.test_client().get("/event?q=open music&limit=1")
+    data = response.get_json()
+
+    assert response.status_code == 200
+    assert data["total"] == 2
+    assert [event["title"] for event in data["results"]] == ["Open air music"]
+    assert "&q=open%20music" in data["next"]
+    assert parse_qs(urlsplit(data["next"]).query)["q"] == ["open music"]
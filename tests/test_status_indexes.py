@@ -0,0 +1,52 @@
+"""
+Module with tests of the indexes used by the event status filters
+"""
+from typing import Dict, Iterator, List
+
+import pytest
+
+from flask_app import db
+from flask_app.models.event import EventModel
+
+STATUS_INDEXES = {"ix_event_dt_start_id", "ix_event_dt_end_id"}
+
+
+def plan_nodes(plan: Dict) -> Iterator[Dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+def explain(query) -> List[Dict]:
+    """
+    Returns all nodes of the query plan
+    """
+    compiled = query.statement.compile(dialect=db.session.get_bind().dialect)
+    plan = db.session.connection().exec_driver_sql("EXPLAIN (FORMAT JSON) " + str(compiled),
+                                                   compiled.params).scalar()
+    return list(plan_nodes(plan[0]["Plan"]))
+
+
+@pytest.mark.parametrize("status", ["past", "current", "future"])
+def test_status_filter_uses_time_index(postgres_app, status):
+    # The seeded table is small, sequential scans are disabled
+    # so the plan shows whether an index can serve the filter
+    db.session.execute("SET LOCAL enable_seqscan = off")
+    try:
+        nodes = explain(EventModel.get_list({"status": status}).limit(20))
+    finally:
+        db.session.rollback()
+
+    assert STATUS_INDEXES.intersection(node.get("Index Name") for node in nodes)
+    assert "Seq Scan" not in {node["Node Type"] for node in nodes}
+
+
+def test_future_filter_is_index_condition(postgres_app):
+    db.session.execute("SET LOCAL enable_seqscan = off")
+    try:
+        nodes = explain(EventModel.get_list({"status": "future"}).limit(20))
+    finally:
+        db.session.rollback()
+
+    conditions = [node.get("Index Cond", "") for node in nodes if node.get("Index Name") == "ix_event_dt_start_id"]
+    assert any("dt_start" in condition for condition in conditions)